@@ -0,0 +1,63 @@
+"""Micro-benchmark for `_levenshtein_distance` against the previous row-DP.
+
+Run with: python bench_levenshtein.py
+"""
+import random
+import timeit
+
+from test_sync_report import MAIN
+
+
+def _levenshtein_distance_dp(a: str, b: str) -> int:
+    if a == b:
+        return 0
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        curr = [i]
+        for j, cb in enumerate(b, start=1):
+            insert_cost = curr[j - 1] + 1
+            delete_cost = prev[j] + 1
+            replace_cost = prev[j - 1] + (0 if ca == cb else 1)
+            curr.append(min(insert_cost, delete_cost, replace_cost))
+        prev = curr
+    return prev[-1]
+
+
+def _random_text(rng: random.Random, length: int) -> str:
+    words = ["so", "reality", "check", "i", "remember", "back", "when", "we", "started", "50", "percent"]
+    out: list[str] = []
+    while sum(len(w) + 1 for w in out) < length:
+        out.append(rng.choice(words))
+    return " ".join(out)[:length]
+
+
+def main():
+    rng = random.Random(0)
+    for length in (20, 60, 200, 600):
+        pairs = [(_random_text(rng, length), _random_text(rng, length)) for _ in range(50)]
+        for a, b in pairs:
+            assert MAIN._levenshtein_distance(a, b) == _levenshtein_distance_dp(a, b)
+
+        number = 3
+        dp = timeit.timeit(lambda: [_levenshtein_distance_dp(a, b) for a, b in pairs], number=number)
+        bit = timeit.timeit(lambda: [MAIN._levenshtein_distance(a, b) for a, b in pairs], number=number)
+        bounded = timeit.timeit(
+            lambda: [MAIN._levenshtein_distance(a, b, max_distance=length // 10) for a, b in pairs],
+            number=number,
+        )
+        per_call = number * len(pairs)
+        print(
+            f"len={length:4d} dp={dp / per_call * 1e6:9.1f}us "
+            f"bitparallel={bit / per_call * 1e6:8.1f}us "
+            f"bounded={bounded / per_call * 1e6:8.1f}us "
+            f"speedup={dp / max(bit, 1e-9):6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,27 @@
+import asyncio
 import os
 import re
+import mmap
+import zlib
 import stat
+import sys
+import types
 import tarfile
 import time
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import concurrent.futures
 import traceback
 import uuid
 import json
+import hashlib
+import sqlite3
 import subprocess
 import tempfile
+import threading
+import bisect
+import heapq
+from array import array
+from collections import OrderedDict
 from functools import cmp_to_key
 from urllib.parse import urlparse, parse_qs
 
@@ -27,10 +39,19 @@ _FFPROBE_PATH = os.path.join(_FFMPEG_DIR, "ffprobe")
 _FFMPEG_URL = "https://johnvansickle.com/ffmpeg/releases/ffmpeg-release-amd64-static.tar.xz"
 
 
+_ffmpeg_lock = threading.Lock()
+
+
 def _ensure_ffmpeg():
     """Download a static ffmpeg/ffprobe build if not already cached in /tmp."""
     if os.path.isfile(_FFMPEG_PATH) and os.path.isfile(_FFPROBE_PATH):
         return
+    with _ffmpeg_lock:
+        if not (os.path.isfile(_FFMPEG_PATH) and os.path.isfile(_FFPROBE_PATH)):
+            _download_ffmpeg()
+
+
+def _download_ffmpeg():
     os.makedirs(_FFMPEG_DIR, exist_ok=True)
     print("Downloading static ffmpeg build...", flush=True)
     archive_path = os.path.join(_FFMPEG_DIR, "ffmpeg.tar.xz")
@@ -90,18 +111,109 @@ SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
 SPELLCHECK_API_URL = os.environ.get("SPELLCHECK_API_URL", "https://api.api-ninjas.com/v1/spellcheck")
 SPELLCHECK_API_KEY = os.environ.get("SPELLCHECK_API_KEY")
 SPELLCHECK_MAX_WORKERS = max(1, int(os.environ.get("SPELLCHECK_MAX_WORKERS", "6")))
-SPELLCHECK_MAX_SEGMENTS = max(1, int(os.environ.get("SPELLCHECK_MAX_SEGMENTS", "120")))
-MISMATCH_MAX_SUBTITLES = max(1, int(os.environ.get("MISMATCH_MAX_SUBTITLES", "500")))
+SPELLCHECK_ADAPTIVE_CONCURRENCY = _env_bool("SPELLCHECK_ADAPTIVE_CONCURRENCY", True)
+SPELLCHECK_MAX_CONCURRENCY = _env_int("SPELLCHECK_MAX_CONCURRENCY", SPELLCHECK_MAX_WORKERS * 4, min_value=SPELLCHECK_MAX_WORKERS)
+SPELLCHECK_LATENCY_TARGET_SECONDS = _env_float("SPELLCHECK_LATENCY_TARGET_SECONDS", 2.0, min_value=0.1)
+SPELLCHECK_THROTTLE_RETRIES = _env_int("SPELLCHECK_THROTTLE_RETRIES", 3, min_value=0, max_value=10)
+SPELLCHECK_STAGE_BUDGET_SECONDS = _env_float("SPELLCHECK_STAGE_BUDGET_SECONDS", 150.0, min_value=1.0)
+MISMATCH_STAGE_BUDGET_SECONDS = _env_float("MISMATCH_STAGE_BUDGET_SECONDS", 60.0, min_value=1.0)
+INCREMENTAL_ANALYSIS_ENABLED = _env_bool("INCREMENTAL_ANALYSIS_ENABLED", True)
+JOB_QUEUE_BACKEND = (os.environ.get("JOB_QUEUE_BACKEND", "supabase").strip().lower() or "supabase")
+JOB_QUEUE_SQLITE_PATH = os.environ.get("JOB_QUEUE_SQLITE_PATH", ":memory:")
+JOB_LEASE_SECONDS = _env_int("JOB_LEASE_SECONDS", 180, min_value=30)
+JOB_HEARTBEAT_SECONDS = _env_int("JOB_HEARTBEAT_SECONDS", 45, min_value=5)
+JOB_MAX_ATTEMPTS = _env_int("JOB_MAX_ATTEMPTS", 3, min_value=1, max_value=10)
+JOB_LEASE_EXPIRED_ERROR = "lease expired"
+JOB_RETRY_BACKOFF_SECONDS = _env_float("JOB_RETRY_BACKOFF_SECONDS", 30.0, min_value=0.0)
+BATCH_MAX_CONCURRENT_PROJECTS = _env_int("BATCH_MAX_CONCURRENT_PROJECTS", 3, min_value=1, max_value=16)
+BATCH_MAX_PROJECTS = _env_int("BATCH_MAX_PROJECTS", 50, min_value=1)
+# The invocation is killed at the 540 s function timeout; projects only start while one more fits.
+BATCH_TIME_BUDGET_SECONDS = _env_float("BATCH_TIME_BUDGET_SECONDS", 500.0, min_value=1.0)
+BATCH_ESTIMATED_PROJECT_SECONDS = _env_float("BATCH_ESTIMATED_PROJECT_SECONDS", 240.0, min_value=1.0)
+TRANSCODE_MAX_CONCURRENCY = _env_int("TRANSCODE_MAX_CONCURRENCY", 1, min_value=1, max_value=16)
+WORKER_MAX_JOBS_LIMIT = 50
+WORKER_MAX_JOBS = _env_int("WORKER_MAX_JOBS", 1, min_value=1, max_value=WORKER_MAX_JOBS_LIMIT)
+# Set once something invokes mode "worker" (see schedule_worker.sh); until then "enqueue" is refused.
+JOB_WORKER_ENABLED = _env_bool("JOB_WORKER_ENABLED", False)
+WORKER_TIME_BUDGET_SECONDS = _env_float("WORKER_TIME_BUDGET_SECONDS", 300.0, min_value=1.0)
+INCREMENTAL_MATCH_TOLERANCE_SECONDS = _env_float("INCREMENTAL_MATCH_TOLERANCE_SECONDS", 0.5, min_value=0.0, max_value=10.0)
+SPELLCHECK_PROVIDER = (os.environ.get("SPELLCHECK_PROVIDER", "api_ninjas").strip().lower() or "api_ninjas")
+SPELLCHECK_LOCAL_FILTER_ENABLED = _env_bool("SPELLCHECK_LOCAL_FILTER_ENABLED", True)
+# Bundled word list: SymSpell's frequency_dictionary_en_82_765, unmodified as
+# shipped in symspellpy 6.10.0 (MIT, see spellcheck_dictionary_en.LICENSE).
+# Project-specific words go in the overrides file, which is merged on load.
+SPELLCHECK_DICTIONARY_PATH = os.environ.get("SPELLCHECK_DICTIONARY_PATH") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "spellcheck_dictionary_en.txt",
+)
+SPELLCHECK_DICTIONARY_OVERRIDES_PATH = os.environ.get("SPELLCHECK_DICTIONARY_OVERRIDES_PATH") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "spellcheck_dictionary_overrides.txt",
+)
+SPELLCHECK_LOCAL_MAX_EDIT_DISTANCE = _env_int("SPELLCHECK_LOCAL_MAX_EDIT_DISTANCE", 2, min_value=1, max_value=3)
+SPELLCHECK_LOCAL_INDEX_DIR = "/tmp/spellcheck-index"
+SPELLCHECK_BATCH_ENABLED = _env_bool("SPELLCHECK_BATCH_ENABLED", True)
+SPELLCHECK_BATCH_MAX_CHARS = _env_int("SPELLCHECK_BATCH_MAX_CHARS", 1000, min_value=50)
+SPELLCHECK_BATCH_SEPARATOR = " ||| "
+SPELLCHECK_CACHE_MAX_ENTRIES = _env_int("SPELLCHECK_CACHE_MAX_ENTRIES", 5000, min_value=0)
+SPELLCHECK_CACHE_PERSISTENT = _env_bool("SPELLCHECK_CACHE_PERSISTENT", True)
+HTTP_POOL_MAXSIZE = _env_int("HTTP_POOL_MAXSIZE", max(10, SPELLCHECK_MAX_WORKERS), min_value=1, max_value=256)
+HTTP_MAX_RETRIES = _env_int("HTTP_MAX_RETRIES", 3, min_value=0, max_value=10)
+HTTP_RETRY_BACKOFF_SECONDS = _env_float("HTTP_RETRY_BACKOFF_SECONDS", 0.5, min_value=0.0, max_value=30.0)
+OUTBOUND_IO_MODE = (os.environ.get("OUTBOUND_IO_MODE", "threads").strip().lower() or "threads")
+ASYNC_IO_MAX_CONCURRENCY = _env_int("ASYNC_IO_MAX_CONCURRENCY", 32, min_value=1, max_value=512)
+SPELLCHECK_RATE_LIMIT_PER_SECOND = _env_float("SPELLCHECK_RATE_LIMIT_PER_SECOND", 0.0, min_value=0.0)
+SPELLCHECK_RATE_LIMIT_BURST = _env_int("SPELLCHECK_RATE_LIMIT_BURST", 10, min_value=1)
 CLOUD_FUNCTION_SECRET = os.environ.get("CLOUD_FUNCTION_SECRET")
 MIN_SUBTITLE_CONFIDENCE = float(os.environ.get("MIN_SUBTITLE_CONFIDENCE", "0.9"))
 GCP_PROJECT_ID = os.environ.get("GCP_PROJECT_ID", "")
 VI_OPERATION_TIMEOUT_SECONDS = int(os.environ.get("VI_OPERATION_TIMEOUT_SECONDS", "480"))
 VI_POLL_INTERVAL_SECONDS = int(os.environ.get("VI_POLL_INTERVAL_SECONDS", "15"))
+OPERATIONS_POLL_MIN_SECONDS = _env_float("OPERATIONS_POLL_MIN_SECONDS", 2.0, min_value=0.1)
+OPERATIONS_POLL_BACKOFF = _env_float("OPERATIONS_POLL_BACKOFF", 1.5, min_value=1.0, max_value=4.0)
+STT_AUDIO_ENCODING = (os.environ.get("STT_AUDIO_ENCODING", "flac").strip().lower() or "flac")
+STT_OPUS_BITRATE = os.environ.get("STT_OPUS_BITRATE", "32k").strip() or "32k"
+STT_LONG_AUDIO_MODE = (os.environ.get("STT_LONG_AUDIO_MODE", "batch").strip().lower() or "batch")
+STT_CHUNK_MAX_SECONDS = _env_float("STT_CHUNK_MAX_SECONDS", 55.0, min_value=10.0, max_value=59.0)
+STT_CHUNK_MAX_WORKERS = _env_int("STT_CHUNK_MAX_WORKERS", 4, min_value=1, max_value=16)
+STT_CHUNK_RETRIES = _env_int("STT_CHUNK_RETRIES", 1, min_value=0, max_value=5)
+STT_SILENCE_NOISE_DB = _env_float("STT_SILENCE_NOISE_DB", -35.0, min_value=-90.0, max_value=0.0)
+STT_SILENCE_MIN_SECONDS = _env_float("STT_SILENCE_MIN_SECONDS", 0.3, min_value=0.05)
+# Opt-in: voice-over on a continuous music bed can sit under the energy margin.
+VAD_ENABLED = _env_bool("VAD_ENABLED", False)
+VAD_FRAME_MS = _env_int("VAD_FRAME_MS", 30, min_value=10, max_value=100)
+VAD_ENERGY_MARGIN_DB = _env_float("VAD_ENERGY_MARGIN_DB", 10.0, min_value=0.0)
+VAD_MIN_ENERGY_DB = _env_float("VAD_MIN_ENERGY_DB", -50.0, max_value=0.0)
+VAD_MAX_ZCR = _env_float("VAD_MAX_ZCR", 0.35, min_value=0.0, max_value=1.0)
+VAD_MIN_MODULATION_DB = _env_float("VAD_MIN_MODULATION_DB", 3.0, min_value=0.0)
+VAD_MIN_SPEECH_SECONDS = _env_float("VAD_MIN_SPEECH_SECONDS", 0.25, min_value=0.0)
+VAD_MERGE_GAP_SECONDS = _env_float("VAD_MERGE_GAP_SECONDS", 0.6, min_value=0.0)
+VAD_PADDING_SECONDS = _env_float("VAD_PADDING_SECONDS", 0.3, min_value=0.0)
+VAD_JOIN_SILENCE_SECONDS = 0.25
+# Below this share of detected speech the detector is not trusted and the full audio is sent.
+VAD_MIN_SPEECH_RATIO = _env_float("VAD_MIN_SPEECH_RATIO", 0.1, min_value=0.0, max_value=1.0)
+STT_OPERATION_TIMEOUT_SECONDS = _env_int("STT_OPERATION_TIMEOUT_SECONDS", 600, min_value=30)
+DOWNLOAD_PARALLEL_ENABLED = _env_bool("DOWNLOAD_PARALLEL_ENABLED", True)
+DOWNLOAD_RANGE_CONNECTIONS = _env_int("DOWNLOAD_RANGE_CONNECTIONS", 8, min_value=1, max_value=32)
+DOWNLOAD_RANGE_CHUNK_MB = _env_int("DOWNLOAD_RANGE_CHUNK_MB", 32, min_value=1, max_value=1024)
+DOWNLOAD_PARALLEL_MIN_MB = _env_int("DOWNLOAD_PARALLEL_MIN_MB", 64, min_value=1)
+DOWNLOAD_RANGE_RETRIES = _env_int("DOWNLOAD_RANGE_RETRIES", 3, min_value=0, max_value=10)
+DOWNLOAD_BUFFER_KB = _env_int("DOWNLOAD_BUFFER_KB", 1024, min_value=8, max_value=16384)
+DOWNLOAD_SNIFF_BYTES = _env_int("DOWNLOAD_SNIFF_BYTES", 65536, min_value=64, max_value=1048576)
+DOWNLOAD_SIZE_TOLERANCE = _env_float("DOWNLOAD_SIZE_TOLERANCE", 0.01, min_value=0.0, max_value=1.0)
 OCR_PROXY_ENABLED = _env_bool("OCR_PROXY_ENABLED", True)
 OCR_PROXY_FPS = _env_float("OCR_PROXY_FPS", 6.0, min_value=1.0, max_value=30.0)
 OCR_PROXY_MAX_WIDTH = _env_int("OCR_PROXY_MAX_WIDTH", 1280, min_value=320, max_value=3840)
 OCR_PROXY_CRF = _env_int("OCR_PROXY_CRF", 29, min_value=0, max_value=51)
+OCR_RENDITIONS_ENABLED = _env_bool("OCR_RENDITIONS_ENABLED", True)
 OCR_PROXY_PRESET = os.environ.get("OCR_PROXY_PRESET", "veryfast").strip() or "veryfast"
+FRAME_IO_CACHE_TTL_SECONDS = _env_int("FRAME_IO_CACHE_TTL_SECONDS", 300, min_value=0)
+FRAME_IO_ACCOUNT_CACHE_TTL_SECONDS = _env_int("FRAME_IO_ACCOUNT_CACHE_TTL_SECONDS", 3600, min_value=0)
+FRAME_IO_URL_EXPIRY_MARGIN_SECONDS = _env_int("FRAME_IO_URL_EXPIRY_MARGIN_SECONDS", 300, min_value=0)
+CLASSIFY_CACHE_ENABLED = _env_bool("CLASSIFY_CACHE_ENABLED", True)
+CLASSIFY_CACHE_MAX_ENTRIES = _env_int("CLASSIFY_CACHE_MAX_ENTRIES", 32, min_value=0)
+CLASSIFY_CACHE_PERSISTENT = _env_bool("CLASSIFY_CACHE_PERSISTENT", True)
+CLASSIFY_CACHE_TTL_SECONDS = _env_int("CLASSIFY_CACHE_TTL_SECONDS", 86400, min_value=0)
 DEBUG_LOG_MAX_LINES = int(os.environ.get("DEBUG_LOG_MAX_LINES", "50"))
 FRAME_IO_TOKEN = os.environ.get("FRAME_IO_TOKEN") or os.environ.get("FRAME_IO_V4_TOKEN")
 FRAME_IO_V4_API = "https://api.frame.io/v4"
@@ -114,6 +226,9 @@ FRAME_MEDIA_LINK_INCLUDES = ",".join((
     "media_links.efficient",
     "media_links.scrub_sheet",
 ))
+# Frame.io transcodes, narrowest first. Their media links rarely carry
+# dimensions; those are read from the MP4 header before any download.
+FRAME_RENDITION_KEYS = ("video_h264_180", "efficient", "high_quality")
 VIDEO_EXT_RE = re.compile(r"\.(mp4|mov|m4v|webm|avi|mkv|mxf)(\?|$)", re.IGNORECASE)
 IMAGE_EXT_RE = re.compile(r"\.(jpg|jpeg|png|webp|gif|svg|avif)(\?|$)", re.IGNORECASE)
 POSITIVE_URL_HINTS = ("video", "download", "source", "original", "proxy", "stream", "transcode", "playback")
@@ -124,6 +239,389 @@ def get_supabase():
     return create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 
 
+_shared_clients: dict[str, object] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def _shared_client(key: str, factory):
+    """Return a process-wide Google API client, creating it on first use.
+
+    Client construction (credentials, channel setup) is paid once per instance
+    instead of once per call, and concurrent batch runs share the channels.
+    """
+    client = _shared_clients.get(key)
+    if client is None:
+        with _shared_clients_lock:
+            client = _shared_clients.get(key)
+            if client is None:
+                client = factory()
+                _shared_clients[key] = client
+    return client
+
+
+class _LruCache:
+    """Small thread-safe LRU map used for in-process result caches."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(0, int(max_entries))
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _stable_repr(value) -> str:
+    """repr() that does not depend on set ordering or hash randomization."""
+    if isinstance(value, (set, frozenset)):
+        return "{" + ",".join(sorted(_stable_repr(item) for item in value)) + "}"
+    if isinstance(value, dict):
+        return "{" + ",".join(sorted(f"{_stable_repr(k)}:{_stable_repr(v)}" for k, v in value.items())) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_stable_repr(item) for item in value) + "]"
+    if isinstance(value, re.Pattern):
+        return f"re({value.pattern!r},{value.flags})"
+    return repr(value)
+
+
+_FINGERPRINT_CONSTANT_TYPES = (int, float, str, bool, bytes, tuple, list, set, frozenset, dict, re.Pattern)
+
+
+def _fingerprint_code(code, digest, seen: set[str], constant_names: set[str]):
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _fingerprint_code(const, digest, seen, constant_names)
+        else:
+            digest.update(_stable_repr(const).encode("utf-8"))
+    module_globals = globals()
+    for name in code.co_names:
+        value = module_globals.get(name)
+        if isinstance(value, types.FunctionType) and value.__module__ == __name__:
+            if name not in seen:
+                seen.add(name)
+                _fingerprint_code(value.__code__, digest, seen, constant_names)
+        elif isinstance(value, type) and value.__module__ == __name__:
+            if name not in seen:
+                seen.add(name)
+                _fingerprint_class(value, digest, seen, constant_names)
+        elif name.isupper() and isinstance(value, _FINGERPRINT_CONSTANT_TYPES):
+            constant_names.add(name)
+
+
+def _fingerprint_class(cls: type, digest, seen: set[str], constant_names: set[str]):
+    """Hash a module class: its methods (static/class methods and properties too) and class constants."""
+    for attribute, value in sorted(vars(cls).items()):
+        if attribute.startswith("__") and attribute not in ("__init__", "__call__"):
+            continue
+        if isinstance(value, (staticmethod, classmethod)):
+            value = value.__func__
+        elif isinstance(value, property):
+            value = value.fget
+        digest.update(attribute.encode("utf-8"))
+        if isinstance(value, types.FunctionType):
+            _fingerprint_code(value.__code__, digest, seen, constant_names)
+        elif isinstance(value, _FINGERPRINT_CONSTANT_TYPES):
+            digest.update(_stable_repr(value).encode("utf-8"))
+
+
+_behaviour_fingerprint_lock = threading.Lock()
+_behaviour_code_fingerprints: dict[tuple[str, ...], tuple[str, tuple[str, ...]]] = {}
+
+
+def behaviour_fingerprint(*function_names: str) -> str:
+    """Hash of the named module functions, everything they call, and the constants they read.
+
+    Bytecode and literals are hashed once per process (memoized by name);
+    referenced upper-case constants are read on every call so that a changed
+    setting yields a new fingerprint.
+    """
+    key = tuple(function_names)
+    fingerprint = _behaviour_code_fingerprints.get(key)
+    if fingerprint is None:
+        with _behaviour_fingerprint_lock:
+            fingerprint = _behaviour_code_fingerprints.get(key)
+            if fingerprint is None:
+                digest = hashlib.sha256()
+                seen = set(function_names)
+                constant_names: set[str] = set()
+                module_globals = globals()
+                for name in function_names:
+                    _fingerprint_code(module_globals[name].__code__, digest, seen, constant_names)
+                fingerprint = (digest.hexdigest(), tuple(sorted(constant_names)))
+                _behaviour_code_fingerprints[key] = fingerprint
+    code_hash, constant_names = fingerprint
+    module_globals = globals()
+    constants = ";".join(f"{name}={_stable_repr(module_globals.get(name))}" for name in constant_names)
+    return hashlib.sha256(f"{code_hash}|{constants}".encode("utf-8")).hexdigest()
+
+
+# ffmpeg transcodes are CPU-bound; batch runs overlap them with remote waits instead of with each other.
+_transcode_slots = threading.BoundedSemaphore(TRANSCODE_MAX_CONCURRENCY)
+
+
+# --- Shared HTTP session ---
+HTTP_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+HTTP_LATENCY_BUCKETS_SECONDS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_http_sessions: dict[bool, object] = {}
+_http_session_lock = threading.Lock()
+_http_latency_lock = threading.Lock()
+_http_latency_by_host: dict[str, list[int]] = {}
+
+
+def get_http_session(retry_status: bool = True):
+    """Return the process-wide pooled `requests.Session` (created on first use).
+
+    Each host gets its own keep-alive pool of `HTTP_POOL_MAXSIZE` connections, and
+    429/5xx responses are retried with exponential backoff (honouring Retry-After).
+    With `retry_status=False` the session only retries connection errors, for
+    callers that react to throttling themselves.
+    """
+    session = _http_sessions.get(retry_status)
+    if session is not None:
+        return session
+
+    with _http_session_lock:
+        if retry_status not in _http_sessions:
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=HTTP_MAX_RETRIES,
+                connect=HTTP_MAX_RETRIES,
+                read=0,
+                status=HTTP_MAX_RETRIES if retry_status else 0,
+                backoff_factor=HTTP_RETRY_BACKOFF_SECONDS,
+                status_forcelist=HTTP_RETRY_STATUS_CODES if retry_status else (),
+                allowed_methods=None,
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_sessions[retry_status] = session
+    return _http_sessions[retry_status]
+
+
+def _record_http_latency(url: str, elapsed: float):
+    host = (urlparse(url).hostname or "unknown").lower()
+    bucket = bisect.bisect_left(HTTP_LATENCY_BUCKETS_SECONDS, elapsed)
+    with _http_latency_lock:
+        counts = _http_latency_by_host.get(host)
+        if counts is None:
+            counts = [0] * (len(HTTP_LATENCY_BUCKETS_SECONDS) + 1)
+            _http_latency_by_host[host] = counts
+        counts[bucket] += 1
+
+
+def http_request(method: str, url: str, retry_status: bool = True, **kwargs):
+    """Send a request through the shared session and record its latency per host."""
+    started_at = time.time()
+    try:
+        return get_http_session(retry_status).request(method, url, **kwargs)
+    finally:
+        _record_http_latency(url, time.time() - started_at)
+
+
+def http_get(url: str, **kwargs):
+    return http_request("GET", url, **kwargs)
+
+
+def http_post(url: str, **kwargs):
+    return http_request("POST", url, **kwargs)
+
+
+class _AsyncTokenBucket:
+    """Token bucket for provider quotas: `rate` tokens/s, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = float(rate)
+        self.capacity = float(max(1, capacity))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+class AsyncOutboundEngine:
+    """One background event loop for outbound HTTP, shared by every caller.
+
+    Synchronous code hands coroutines to `run` / `submit`; requests go through a
+    single `httpx.AsyncClient`, an in-flight semaphore of `max_concurrency`, and an
+    optional per-host token bucket (see `set_rate_limit`). 429/5xx responses are
+    retried with the same backoff settings as the pooled sync session.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._rate_limits: dict[str, tuple[float, int]] = {}
+        self._buckets: dict[str, _AsyncTokenBucket] = {}
+        self._start_lock = threading.Lock()
+
+    def set_rate_limit(self, host: str, rate_per_second: float, burst: int):
+        if rate_per_second > 0:
+            self._rate_limits[host.lower()] = (rate_per_second, burst)
+        else:
+            self._rate_limits.pop(host.lower(), None)
+        self._buckets.pop(host.lower(), None)
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        if self._loop is not None:
+            return self._loop
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="outbound-io-loop", daemon=True)
+                thread.start()
+                self._loop = loop
+        return self._loop
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Schedule a coroutine on the engine loop and return a thread-safe future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+
+    def run(self, coro, timeout: float | None = None):
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def _get_client(self):
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def request(self, method: str, url: str, retry_status: bool = True, **kwargs):
+        client = self._get_client()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        host = (urlparse(url).hostname or "unknown").lower()
+        bucket = self._buckets.get(host)
+        if bucket is None and host in self._rate_limits:
+            bucket = _AsyncTokenBucket(*self._rate_limits[host])
+            self._buckets[host] = bucket
+
+        async with self._semaphore:
+            attempt = 0
+            while True:
+                if bucket is not None:
+                    await bucket.acquire()
+                started_at = time.time()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                finally:
+                    _record_http_latency(url, time.time() - started_at)
+                if (
+                    not retry_status
+                    or response.status_code not in HTTP_RETRY_STATUS_CODES
+                    or attempt >= HTTP_MAX_RETRIES
+                ):
+                    return response
+                retry_after = _to_float(response.headers.get("Retry-After"), 0.0)
+                delay = retry_after if retry_after > 0 else HTTP_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+
+_async_engine: AsyncOutboundEngine | None = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncOutboundEngine:
+    global _async_engine
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                engine = AsyncOutboundEngine(ASYNC_IO_MAX_CONCURRENCY)
+                spellcheck_host = urlparse(SPELLCHECK_API_URL).hostname
+                if spellcheck_host:
+                    engine.set_rate_limit(spellcheck_host, SPELLCHECK_RATE_LIMIT_PER_SECOND, SPELLCHECK_RATE_LIMIT_BURST)
+                _async_engine = engine
+    return _async_engine
+
+
+def reset_http_latency_stats():
+    with _http_latency_lock:
+        _http_latency_by_host.clear()
+
+
+def http_latency_summary() -> str:
+    """One-line per-host latency histogram summary: count and bucketed p50/p95."""
+    with _http_latency_lock:
+        snapshot = {host: list(counts) for host, counts in _http_latency_by_host.items()}
+
+    def _percentile(counts: list[int], fraction: float) -> str:
+        total = sum(counts)
+        threshold = fraction * total
+        running = 0
+        for index, count in enumerate(counts):
+            running += count
+            if running >= threshold:
+                if index < len(HTTP_LATENCY_BUCKETS_SECONDS):
+                    return f"<={HTTP_LATENCY_BUCKETS_SECONDS[index]:g}s"
+                return f">{HTTP_LATENCY_BUCKETS_SECONDS[-1]:g}s"
+        return "n/a"
+
+    parts = []
+    for host in sorted(snapshot):
+        counts = snapshot[host]
+        parts.append(
+            f"{host} n={sum(counts)} p50{_percentile(counts, 0.5)} p95{_percentile(counts, 0.95)}"
+        )
+    return "; ".join(parts)
+
+
 class FrameIoV4Error(Exception):
     def __init__(self, message: str, endpoint: str, status: int | None = None, detail: str | None = None):
         super().__init__(message)
@@ -180,32 +678,126 @@ def is_frame_view_url(url: str) -> bool:
     return False
 
 
-def fetch_video_from_frame_io(frame_io_url: str) -> dict:
-    if not FRAME_IO_TOKEN:
+# Resolved accounts and assets, keyed by a hash of the token so entries never
+# leak across credentials: key -> (expires_at, value).
+_frame_io_cache = _LruCache(256)
+# Per-key load locks with a count of threads using them; dropped when the last one leaves.
+_frame_io_key_locks: dict[tuple, list] = {}
+_frame_io_key_locks_guard = threading.Lock()
+
+
+def _frame_token_identity(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+def signed_url_expiry(url: str | None) -> float | None:
+    """Return the epoch expiry of a signed URL (CloudFront/S3, SigV4, Azure SAS, GCS), if any."""
+    if not url:
+        return None
+    try:
+        query = {key.lower(): values[0] for key, values in parse_qs(urlparse(url).query).items() if values}
+    except Exception:
+        return None
+    for key in ("expires", "exp", "x-expires"):
+        value = query.get(key)
+        if value and value.isdigit():
+            return float(value)
+    amz_date = query.get("x-amz-date") or query.get("x-goog-date")
+    amz_expires = query.get("x-amz-expires") or query.get("x-goog-expires")
+    if amz_date and amz_expires and amz_expires.isdigit():
+        try:
+            signed_at = datetime.strptime(amz_date, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+        return signed_at.timestamp() + int(amz_expires)
+    sas_expiry = query.get("se")
+    if sas_expiry:
+        try:
+            return datetime.fromisoformat(sas_expiry.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _frame_metadata_ttl(metadata: dict) -> float:
+    """Cache TTL for resolved metadata: capped so no signed link is served near expiry."""
+    urls = [metadata.get("video_url"), metadata.get("thumbnail_url")]
+    urls.extend(rendition.get("url") for rendition in metadata.get("renditions") or [])
+    ttl = float(FRAME_IO_CACHE_TTL_SECONDS)
+    now = time.time()
+    for url in urls:
+        expiry = signed_url_expiry(url)
+        if expiry is not None:
+            ttl = min(ttl, expiry - now - FRAME_IO_URL_EXPIRY_MARGIN_SECONDS)
+    return ttl
+
+
+def _frame_io_cached(key: tuple, loader, ttl_for):
+    """Return a cached Frame.io value, loading it once per key even under concurrency."""
+    entry = _frame_io_cache.get(key)
+    if entry and entry[0] > time.time():
+        return entry[1]
+    with _frame_io_key_locks_guard:
+        key_lock = _frame_io_key_locks.setdefault(key, [threading.Lock(), 0])
+        key_lock[1] += 1
+    try:
+        with key_lock[0]:
+            entry = _frame_io_cache.get(key)
+            if entry and entry[0] > time.time():
+                return entry[1]
+            value = loader()
+            ttl = ttl_for(value)
+            if ttl > 0:
+                _frame_io_cache.put(key, (time.time() + ttl, value))
+            return value
+    finally:
+        with _frame_io_key_locks_guard:
+            key_lock[1] -= 1
+            if key_lock[1] == 0:
+                del _frame_io_key_locks[key]
+
+
+def fetch_video_from_frame_io(frame_io_url: str, token: str | None = None) -> dict:
+    """Resolve a Frame.io review link to file metadata, with a download URL.
+
+    The account id and the resolved metadata are cached per token. Metadata
+    entries expire before the signed media links they contain.
+    """
+    token = token or FRAME_IO_TOKEN
+    if not token:
         raise ValueError("FRAME_IO_TOKEN is not configured")
 
     asset_id = parse_frame_io_asset_id(frame_io_url)
     if not asset_id:
         raise ValueError("Invalid Frame.io URL")
 
-    account_id = get_frame_account_id(FRAME_IO_TOKEN)
-    try:
-        file_data = get_file_by_id(account_id, asset_id, FRAME_IO_TOKEN)
-    except FrameIoV4Error as error:
-        if error.status in (404, 422):
-            version_stack = get_version_stack_by_id(account_id, asset_id, FRAME_IO_TOKEN)
-            file_data = resolve_head_version_file(account_id, version_stack, FRAME_IO_TOKEN)
-        else:
-            raise
+    token_id = _frame_token_identity(token)
 
-    metadata = extract_frame_metadata(file_data)
-    video_url = metadata.get("video_url")
-    if not video_url:
-        raise ValueError("Frame.io resource does not expose a downloadable video URL")
+    def _load() -> dict:
+        account_id = _frame_io_cached(
+            ("account", token_id),
+            lambda: get_frame_account_id(token),
+            lambda _account_id: FRAME_IO_ACCOUNT_CACHE_TTL_SECONDS,
+        )
+        try:
+            file_data = get_file_by_id(account_id, asset_id, token)
+        except FrameIoV4Error as error:
+            if error.status in (404, 422):
+                version_stack = get_version_stack_by_id(account_id, asset_id, token)
+                file_data = resolve_head_version_file(account_id, version_stack, token)
+            else:
+                raise
 
-    metadata["asset_id"] = asset_id
-    metadata["account_id"] = account_id
-    return metadata
+        metadata = extract_frame_metadata(file_data)
+        if not metadata.get("video_url"):
+            raise ValueError("Frame.io resource does not expose a downloadable video URL")
+
+        metadata["asset_id"] = asset_id
+        metadata["account_id"] = account_id
+        return metadata
+
+    metadata = _frame_io_cached(("asset", token_id, asset_id), _load, _frame_metadata_ttl)
+    return dict(metadata)
 
 
 def get_frame_account_id(token: str) -> str:
@@ -279,11 +871,19 @@ def extract_frame_metadata(file_data: dict) -> dict:
             flush=True,
         )
 
+    # Frame.io reports the size of the original upload; it only describes the
+    # download when the picked link is the original rather than a transcode.
+    original_urls = {
+        media_link_to_url(media_links.get("original")),
+        pick_top_level_video_link(file_data),
+    }
     return {
         "name": read_string(file_data.get("name")),
         "duration": pick_duration(file_data),
         "thumbnail_url": thumbnail_url,
         "video_url": video_url,
+        "file_size": pick_file_size(file_data) if video_url and video_url in original_urls else None,
+        "renditions": pick_video_renditions(media_links),
     }
 
 
@@ -302,6 +902,61 @@ def pick_duration(file_data: dict) -> float | None:
     return None
 
 
+def _read_link_dimension(value, name: str) -> int | None:
+    if not isinstance(value, dict):
+        return None
+    dimension = read_number(value.get(name))
+    resolution = value.get("resolution")
+    if dimension is None and isinstance(resolution, dict):
+        dimension = read_number(resolution.get(name))
+    return int(dimension) if dimension else None
+
+
+def pick_video_renditions(media_links: dict) -> list[dict]:
+    """List Frame.io transcodes as {key, url, width, height}, narrowest first.
+
+    Dimensions are None when the media link does not report them.
+    """
+    renditions = []
+    for key in FRAME_RENDITION_KEYS:
+        value = media_links.get(key)
+        url = media_link_to_url(value)
+        if not url or is_frame_view_url(url):
+            continue
+        renditions.append({
+            "key": key,
+            "url": url,
+            "width": _read_link_dimension(value, "width"),
+            "height": _read_link_dimension(value, "height"),
+        })
+    return renditions
+
+
+def pick_file_size(file_data: dict) -> int | None:
+    for key in ("file_size", "filesize", "size"):
+        value = read_number(file_data.get(key))
+        if value:
+            return int(value)
+    return None
+
+
+def _read_bounded_int(value, default: int, min_value: int, max_value: int) -> int:
+    """Parse an optional integer request field and clamp it; raises ValueError when it is not an integer."""
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).strip().lstrip("-").isdigit():
+        raise ValueError(f"expected an integer, got {value!r}")
+    return min(max(int(value), min_value), max_value)
+
+
+def _read_size_bytes(value) -> int | None:
+    """Parse an optional byte count from a request payload."""
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    number = read_number(value)
+    return int(number) if number and number > 0 else None
+
+
 def find_thumbnail_link(media_links: dict) -> str | None:
     for key, value in media_links.items():
         if "thumb" in key.lower() or "thumbnail" in key.lower() or "poster" in key.lower():
@@ -415,7 +1070,23 @@ def media_link_to_url(value) -> str | None:
 
 
 def frame_v4_get(path: str, token: str) -> dict:
-    response = requests.get(
+    if OUTBOUND_IO_MODE == "async":
+        return get_async_engine().run(frame_v4_get_async(path, token))
+
+    response = http_get(
+        f"{FRAME_IO_V4_API}{path}",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+        },
+        timeout=30,
+    )
+    return _parse_frame_v4_response(path, response)
+
+
+async def frame_v4_get_async(path: str, token: str) -> dict:
+    response = await get_async_engine().request(
+        "GET",
         f"{FRAME_IO_V4_API}{path}",
         headers={
             "Authorization": f"Bearer {token}",
@@ -423,7 +1094,10 @@ def frame_v4_get(path: str, token: str) -> dict:
         },
         timeout=30,
     )
+    return _parse_frame_v4_response(path, response)
 
+
+def _parse_frame_v4_response(path: str, response) -> dict:
     try:
         payload = response.json()
     except ValueError:
@@ -478,8 +1152,11 @@ def read_number(value) -> float | None:
     return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
 
 
-def _utc_timestamp_iso() -> str:
-    return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+def _utc_timestamp_iso(with_microseconds: bool = False) -> str:
+    now = datetime.now(timezone.utc)
+    if not with_microseconds:
+        now = now.replace(microsecond=0)
+    return now.isoformat().replace("+00:00", "Z")
 
 
 def append_debug_log_line(
@@ -535,138 +1212,841 @@ def update_status(
         print(f"[{_utc_timestamp_iso()}] [DEBUG] [{status} {progress}%]", flush=True)
 
 
-def clear_previous_results(supabase, project_id: str):
-    """Delete previous analysis artifacts so reruns do not duplicate rows."""
-    for table_name in ("text_detections", "transcriptions", "spelling_errors", "mismatches"):
-        supabase.table(table_name).delete().eq("project_id", project_id).execute()
+RESULT_TABLES = ("text_detections", "transcriptions", "spelling_errors", "mismatches")
+
+
+def get_active_run_id(supabase, project_id: str) -> str | None:
+    """Return the run whose result rows readers should see (None = legacy unversioned rows)."""
+    response = supabase.table("projects").select("active_run_id").eq("id", project_id).limit(1).execute()
+    rows = response.data if hasattr(response, "data") else []
+    if isinstance(rows, list) and rows and isinstance(rows[0], dict):
+        return read_string(rows[0].get("active_run_id"))
+    return None
+
+
+def scope_to_run(query, run_id: str | None):
+    """Filter a result-table query to one run's rows."""
+    return query.eq("run_id", run_id) if run_id else query.is_("run_id", "null")
+
+
+def register_run(supabase, project_id: str, run_id: str, started_at_iso: str):
+    """Record a run's start time; activation and garbage collection order runs by it."""
+    supabase.table("analysis_runs").insert({
+        "id": run_id,
+        "project_id": project_id,
+        "started_at": started_at_iso,
+    }).execute()
+
+
+def activate_run(
+    supabase,
+    project_id: str,
+    run_id: str,
+    started_at_iso: str,
+    coverage: dict | None = None,
+) -> bool:
+    """Point the project at a finished run unless a run that started later is already active.
+
+    The `activate_analysis_run` RPC compares start times and switches
+    active_run_id in one row update, so readers switch atomically and an older
+    run finishing late cannot replace a newer one. Returns False when the run
+    was superseded. `coverage` (see `build_run_coverage`) records which lines
+    the run could not check, so the next incremental run re-checks them.
+    """
+    response = supabase.rpc("activate_analysis_run", {
+        "p_project_id": project_id,
+        "p_run_id": run_id,
+        "p_started_at": started_at_iso,
+        "p_coverage": coverage,
+    }).execute()
+    return getattr(response, "data", None) is True
+
+
+def _delete_runs(supabase, project_id: str, run_ids: list[str]):
+    if not run_ids:
+        return
+    for table_name in RESULT_TABLES:
+        supabase.table(table_name).delete().eq("project_id", project_id).in_("run_id", run_ids).execute()
+    supabase.table("analysis_runs").delete().eq("project_id", project_id).in_("id", run_ids).execute()
+
+
+def discard_run(supabase, project_id: str, run_id: str):
+    """Delete the rows of a run that was superseded before it could be activated."""
+    _delete_runs(supabase, project_id, [run_id])
+
+
+def garbage_collect_runs(supabase, project_id: str, keep_run_id: str, started_before_iso: str):
+    """Delete result rows of superseded, aborted and legacy runs, and the project's stored classify results.
+
+    Only runs registered in `analysis_runs` as started before `started_before_iso`
+    (the kept run's start) are touched, so a run that started later and is still
+    writing is left alone whatever its rows' created_at.
+    """
+    response = (
+        supabase.table("analysis_runs")
+        .select("id")
+        .eq("project_id", project_id)
+        .lt("started_at", started_before_iso)
+        .execute()
+    )
+    rows = response.data if hasattr(response, "data") else []
+    older_run_ids = [
+        str(row["id"]) for row in (rows if isinstance(rows, list) else [])
+        if isinstance(row, dict) and row.get("id") and str(row["id"]) != keep_run_id
+    ]
+    _delete_runs(supabase, project_id, older_run_ids)
+    for table_name in RESULT_TABLES:
+        supabase.table(table_name).delete().eq("project_id", project_id).is_("run_id", "null").execute()
+    # Stored classify results are keyed on the active run, so none survives a new one.
+    delete_classify_cache(project_id)
+
+
+def start_run_garbage_collection(supabase, project_id: str, keep_run_id: str, started_before_iso: str):
+    """Run `garbage_collect_runs` off the request path."""
+    def _collect():
+        try:
+            garbage_collect_runs(supabase, project_id, keep_run_id, started_before_iso)
+            print(f"Old result runs collected (project_id={project_id}, kept={keep_run_id})", flush=True)
+        except Exception as gc_error:
+            print(f"WARNING: result run garbage collection failed (project_id={project_id}): {gc_error}", flush=True)
+
+    thread = threading.Thread(target=_collect, name=f"run-gc-{project_id}", daemon=True)
+    thread.start()
+    return thread
+
+
+# --- Long-running Google operations ---
+def _operation_progress_percent(metadata) -> float | None:
+    """Read completion percent from VI (`annotation_progress`) or STT V2 (`progress_percent`) metadata."""
+    if metadata is None:
+        return None
+    annotation_progress = getattr(metadata, "annotation_progress", None)
+    if annotation_progress:
+        percents = [
+            float(progress.progress_percent)
+            for progress in annotation_progress
+            if hasattr(progress, "progress_percent")
+        ]
+        if percents:
+            return max(percents)
+    percent = getattr(metadata, "progress_percent", None)
+    if isinstance(percent, (int, float)):
+        return float(percent)
+    return None
+
+
+class _TrackedOperation:
+    def __init__(self, operation, kind: str, label: str, timeout: float | None, on_done, on_progress):
+        self.operation = operation
+        self.kind = kind
+        self.label = label
+        self.timeout = timeout
+        self.on_done = on_done
+        self.on_progress = on_progress
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.started_at = time.time()
+        self.interval = OPERATIONS_POLL_MIN_SECONDS
+        self.percent: float | None = None
+        self.polls = 0
+
+
+class OperationsManager:
+    """Poll many google.api_core long-running operations from one timer thread.
+
+    Each tracked operation is checked with a non-blocking `done()` on its own
+    schedule, starting at OPERATIONS_POLL_MIN_SECONDS and backing off by
+    OPERATIONS_POLL_BACKOFF up to `max_interval`. Completion resolves the future
+    returned by `track` and fires `on_done(result, error)`; every unfinished poll
+    fires `on_progress(percent, elapsed)`. Callbacks run on the timer thread and
+    must return quickly.
+    """
+
+    def __init__(self, max_interval: float = VI_POLL_INTERVAL_SECONDS):
+        self.max_interval = max(OPERATIONS_POLL_MIN_SECONDS, float(max_interval))
+        self._heap: list[tuple[float, int, _TrackedOperation]] = []
+        self._active: dict[int, _TrackedOperation] = {}
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def track(
+        self,
+        operation,
+        kind: str,
+        label: str | None = None,
+        timeout: float | None = None,
+        on_done=None,
+        on_progress=None,
+    ) -> concurrent.futures.Future:
+        tracked = _TrackedOperation(operation, kind, label or kind, timeout, on_done, on_progress)
+        with self._cond:
+            self._seq += 1
+            self._active[self._seq] = tracked
+            heapq.heappush(self._heap, (time.monotonic() + tracked.interval, self._seq, tracked))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="operations-manager", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return tracked.future
+
+    def progress_hint(self) -> str:
+        """Short " ops_in_flight=N overall=P%" suffix for log lines when more than one operation is pending."""
+        snapshot = self.progress()
+        if snapshot["in_flight"] <= 1:
+            return ""
+        return f" ops_in_flight={snapshot['in_flight']} overall={snapshot['overall_percent']:g}%"
+
+    def progress(self) -> dict:
+        """Unified progress across in-flight operations (unknown percents count as 0)."""
+        with self._cond:
+            operations = [
+                {
+                    "label": tracked.label,
+                    "kind": tracked.kind,
+                    "percent": tracked.percent,
+                    "elapsed_seconds": round(time.time() - tracked.started_at, 1),
+                }
+                for tracked in self._active.values()
+            ]
+        overall = (
+            sum(op["percent"] or 0.0 for op in operations) / len(operations)
+            if operations else 100.0
+        )
+        return {"in_flight": len(operations), "overall_percent": round(overall, 1), "operations": operations}
+
+    def _finish(self, seq: int, tracked: _TrackedOperation, result=None, error: BaseException | None = None):
+        with self._cond:
+            self._active.pop(seq, None)
+        if error is not None:
+            tracked.future.set_exception(error)
+        else:
+            tracked.future.set_result(result)
+        if tracked.on_done:
+            try:
+                tracked.on_done(result, error)
+            except Exception as callback_error:
+                print(f"WARNING: operation callback failed ({tracked.label}): {callback_error}", flush=True)
+
+    def _poll(self, seq: int, tracked: _TrackedOperation):
+        tracked.polls += 1
+        try:
+            done = tracked.operation.done()
+        except Exception as poll_error:
+            # Transient polling errors are retried on the next tick.
+            print(f"WARNING: polling {tracked.label} failed: {poll_error}", flush=True)
+            done = False
+        if done:
+            try:
+                self._finish(seq, tracked, result=tracked.operation.result())
+            except Exception as operation_error:
+                self._finish(seq, tracked, error=operation_error)
+            return False
+
+        elapsed = time.time() - tracked.started_at
+        try:
+            tracked.percent = _operation_progress_percent(tracked.operation.metadata)
+        except Exception:
+            pass
+        if tracked.timeout is not None and elapsed >= tracked.timeout:
+            self._finish(seq, tracked, error=TimeoutError(
+                f"{tracked.label} did not complete within {tracked.timeout:g}s"
+            ))
+            return False
+        if tracked.on_progress:
+            try:
+                tracked.on_progress(tracked.percent, elapsed)
+            except Exception as callback_error:
+                print(f"WARNING: progress callback failed ({tracked.label}): {callback_error}", flush=True)
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    if not self._cond.wait(timeout=60):
+                        if not self._heap:
+                            self._thread = None
+                            return
+                due_at, seq, tracked = self._heap[0]
+                wait_for = due_at - time.monotonic()
+                if wait_for > 0:
+                    self._cond.wait(timeout=wait_for)
+                    continue
+                heapq.heappop(self._heap)
+
+            if self._poll(seq, tracked):
+                tracked.interval = min(self.max_interval, tracked.interval * OPERATIONS_POLL_BACKOFF)
+                with self._cond:
+                    heapq.heappush(self._heap, (time.monotonic() + tracked.interval, seq, tracked))
+
+
+_operations_manager: OperationsManager | None = None
+_operations_manager_lock = threading.Lock()
+
+
+def get_operations_manager() -> OperationsManager:
+    global _operations_manager
+    if _operations_manager is None:
+        with _operations_manager_lock:
+            if _operations_manager is None:
+                _operations_manager = OperationsManager()
+    return _operations_manager
 
 
 # --- 1. Video Download ---
-def download_video(video_url: str, tmp_dir: str) -> str:
-    video_path = os.path.join(tmp_dir, "video.mp4")
-    print(f"Downloading video from: {video_url[:120]}...", flush=True)
-    response = requests.get(video_url, stream=True, timeout=600)
-    response.raise_for_status()
-    content_type = response.headers.get("Content-Type", "unknown")
-    print(f"Response Content-Type: {content_type}", flush=True)
-    total = 0
-    with open(video_path, "wb") as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
-            total += len(chunk)
-    size_mb = total / (1024 * 1024)
-    print(f"Downloaded {size_mb:.1f} MB to {video_path}", flush=True)
-    if "text/html" in content_type.lower() or total < 1000:
-        with open(video_path, "rb") as f:
-            raw_preview = f.read(500)
-        preview = raw_preview.decode("utf-8", errors="replace")
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)", re.IGNORECASE)
+
+
+# Content types that are never media; anything else is judged by its magic bytes.
+_TEXT_CONTENT_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/problem+json",
+    "application/xhtml+xml",
+    "application/xml",
+}
+_ISO_BMFF_BOX_TYPES = (b"ftyp", b"moov", b"mdat", b"free", b"wide", b"skip", b"pnot")
+_MXF_PARTITION_KEY = bytes.fromhex("060e2b34020501010d010201")
+
+
+def sniff_media_container(head: bytes) -> str | None:
+    """Identify the container from the first bytes of a file (None if unrecognised)."""
+    if len(head) >= 8 and head[4:8] in _ISO_BMFF_BOX_TYPES:
+        return "mov" if head[4:8] == b"ftyp" and head[8:12] == b"qt  " else "mp4"
+    if head[:4] == b"\x1aE\xdf\xa3":
+        return "mkv"
+    if head[:4] == b"RIFF" and head[8:12] == b"AVI ":
+        return "avi"
+    # MXF files may start with a run-in of up to 64 KB before the header partition.
+    if _MXF_PARTITION_KEY in head[:65536 + len(_MXF_PARTITION_KEY)]:
+        return "mxf"
+    return None
+
+
+def validate_media_head(
+    head: bytes,
+    content_type: str,
+    content_length: int | None,
+    expected_size_bytes: int | None = None,
+) -> str:
+    """Fail fast on a download that is not a video; returns the sniffed container.
+
+    Rejects known text content types (HTML error pages, JSON/XML API errors),
+    then trusts the container magic bytes over the declared type, since storage
+    serves valid video as application/mp4, application/x-mxf, octet-stream...
+    When Frame.io reported a file size, the response length must match it.
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    container = sniff_media_container(head)
+    preview = head[:300].decode("utf-8", errors="replace")
+    if media_type.startswith("text/") or media_type in _TEXT_CONTENT_TYPES or (
+        container is None and head.lstrip()[:1] in (b"<", b"{")
+    ):
         raise ValueError(
             "Video download did not return a valid media file "
-            f"(content_type={content_type}, bytes={total}). "
+            f"(content_type={content_type}, bytes={content_length}). "
             "The URL is likely a Frame.io page link or an expired temporary URL. "
             f"Preview: {preview}"
         )
-    return video_path
+    if container is None or not VIDEO_EXT_RE.search(f".{container}"):
+        raise ValueError(
+            "Video download is not a supported container (expected MP4/MOV/MXF/Matroska/AVI; "
+            f"content_type={content_type}, first_bytes={head[:16].hex()})"
+        )
+    if content_length is not None and content_length < 1000:
+        raise ValueError(f"Video download is too small to be a video ({content_length} bytes)")
+    if content_length and expected_size_bytes:
+        drift = abs(content_length - expected_size_bytes) / float(expected_size_bytes)
+        if drift > DOWNLOAD_SIZE_TOLERANCE:
+            raise ValueError(
+                "Video download size does not match Frame.io "
+                f"(content_length={content_length}, expected={expected_size_bytes}); "
+                "the link may point at a different asset or rendition"
+            )
+    return container
 
 
-# --- 2. Text Detection (Google Video Intelligence) ---
-def detect_text_in_video(video_path: str) -> list[dict]:
-    """Use Google Video Intelligence to detect text in video frames."""
-    client = vi.VideoIntelligenceServiceClient()
+def plan_byte_ranges(total_bytes: int, chunk_bytes: int, start: int = 0) -> list[tuple[int, int]]:
+    """Split [start, total) into inclusive (start, end) ranges of at most `chunk_bytes`."""
+    chunk_bytes = max(1, chunk_bytes)
+    return [(offset, min(total_bytes, offset + chunk_bytes) - 1) for offset in range(start, total_bytes, chunk_bytes)]
 
-    with open(video_path, "rb") as f:
-        input_content = f.read()
 
-    features = [vi.Feature.TEXT_DETECTION]
-    operation = client.annotate_video(
-        request={"input_content": input_content, "features": features}
-    )
-    result = operation.result(timeout=600)
+def _download_range(video_url: str, fd: int, start: int, end: int) -> dict:
+    """Fetch one byte range into `fd` with pwrite, resuming from the last written byte on errors."""
+    offset = start
+    attempts = 0
+    started_at = time.time()
+    buffer_bytes = DOWNLOAD_BUFFER_KB * 1024
+    while True:
+        try:
+            response = http_request(
+                "GET",
+                video_url,
+                headers={"Range": f"bytes={offset}-{end}"},
+                stream=True,
+                timeout=(15, 120),
+            )
+            try:
+                if response.status_code != 206:
+                    raise RuntimeError(f"range {offset}-{end} returned HTTP {response.status_code}")
+                for chunk in response.iter_content(chunk_size=buffer_bytes):
+                    if chunk:
+                        os.pwrite(fd, chunk, offset)
+                        offset += len(chunk)
+            finally:
+                response.close()
+            if offset <= end:
+                raise RuntimeError(f"range {start}-{end} ended early at byte {offset}")
+            break
+        except Exception:
+            attempts += 1
+            if attempts > DOWNLOAD_RANGE_RETRIES:
+                raise
+            time.sleep(min(8.0, HTTP_RETRY_BACKOFF_SECONDS * (2 ** (attempts - 1))))
+    return {
+        "start": start,
+        "end": end,
+        "seconds": time.time() - started_at,
+        "retries": attempts,
+    }
 
-    return extract_detections_from_vi_result(result)
+
+def _download_ranges_parallel(video_url: str, fd: int, total_bytes: int, start: int, debug_logger):
+    """Fill bytes [start, total) of the preallocated file behind `fd` with concurrent range requests."""
+    if total_bytes >= DOWNLOAD_PARALLEL_MIN_MB * 1024 * 1024:
+        ranges = plan_byte_ranges(total_bytes, DOWNLOAD_RANGE_CHUNK_MB * 1024 * 1024, start)
+    else:
+        ranges = [(start, total_bytes - 1)] if start < total_bytes else []
+    if not ranges:
+        return
+    workers = min(DOWNLOAD_RANGE_CONNECTIONS, len(ranges))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="range-dl") as executor:
+        futures = [executor.submit(_download_range, video_url, fd, range_start, range_end) for range_start, range_end in ranges]
+        for future in concurrent.futures.as_completed(futures):
+            timing = future.result()
+            size_mb = (timing["end"] - timing["start"] + 1) / (1024 * 1024)
+            debug_logger(
+                "Download range "
+                f"bytes={timing['start']}-{timing['end']} size={size_mb:.1f}MB "
+                f"time={timing['seconds']:.2f}s retries={timing['retries']}",
+                level="DEBUG",
+            )
 
 
-def detect_text_in_video_with_raw(
-    video_path: str,
-    debug_logger=None,
-    input_source: str = "original",
-) -> tuple[list[dict], dict]:
-    """Detect text and return both flattened detections and raw VI payload."""
-    client = vi.VideoIntelligenceServiceClient()
-    video_size_bytes = os.path.getsize(video_path)
-    video_size_mb = video_size_bytes / (1024 * 1024)
+def _read_head(chunks, size: int) -> bytes:
+    """Read at least `size` bytes from a chunk iterator (less if it ends first)."""
+    head = bytearray()
+    for chunk in chunks:
+        head.extend(chunk)
+        if len(head) >= size:
+            break
+    return bytes(head)
 
-    with open(video_path, "rb") as f:
-        input_content = f.read()
 
-    features = [vi.Feature.TEXT_DETECTION]
+def _write_stream(path: str, head: bytes, chunks) -> int:
+    """Write an already-read head plus the rest of a chunk iterator; returns the byte count."""
+    total = len(head)
+    with open(path, "wb") as f:
+        f.write(head)
+        for chunk in chunks:
+            f.write(chunk)
+            total += len(chunk)
+    return total
+
+
+def download_video(
+    video_url: str,
+    tmp_dir: str,
+    debug_logger=None,
+    expected_size_bytes: int | None = None,
+    filename: str = "video.mp4",
+) -> str:
+    """Download the source video, validating it from the first bytes and using parallel ranges.
+
+    The first request asks for DOWNLOAD_SNIFF_BYTES only, so expired links, HTML
+    pages and wrong asset types are rejected before the transfer starts. When
+    the server honours ranges, the rest of the file is fetched over up to
+    DOWNLOAD_RANGE_CONNECTIONS connections into a preallocated file (split into
+    DOWNLOAD_RANGE_CHUNK_MB ranges from DOWNLOAD_PARALLEL_MIN_MB up); otherwise
+    the same response is streamed to disk.
+    """
     def _log(message: str, level: str = "DEBUG"):
         if debug_logger:
             debug_logger(message, level=level)
             return
         print(message, flush=True)
 
+    video_path = os.path.join(tmp_dir, filename)
+    print(f"Downloading video from: {video_url[:120]}...", flush=True)
+    started_at = time.time()
+    use_ranges = DOWNLOAD_PARALLEL_ENABLED and DOWNLOAD_RANGE_CONNECTIONS > 1
+    headers = {"Range": f"bytes=0-{DOWNLOAD_SNIFF_BYTES - 1}"} if use_ranges else {}
+    buffer_bytes = DOWNLOAD_BUFFER_KB * 1024
+    mode = "single"
+    range_failed = False
+    response = http_request("GET", video_url, headers=headers, stream=True, timeout=(15, 600))
+    try:
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "unknown")
+        print(f"Response Content-Type: {content_type}", flush=True)
+        total_bytes = None
+        if response.status_code == 206:
+            match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+            if match and match.group(3) != "*":
+                total_bytes = int(match.group(3))
+                mode = "ranges"
+        if total_bytes is None:
+            content_length = response.headers.get("Content-Length")
+            total_bytes = int(content_length) if content_length and content_length.isdigit() else None
+        if response.status_code == 206 and mode != "ranges":
+            raise ValueError("Video URL returned a partial response without a usable Content-Range")
+
+        chunks = response.iter_content(chunk_size=min(buffer_bytes, DOWNLOAD_SNIFF_BYTES))
+        head = _read_head(chunks, DOWNLOAD_SNIFF_BYTES)
+        container = validate_media_head(head, content_type, total_bytes, expected_size_bytes)
+        _log(
+            f"Download sniffed container={container} content_type={content_type} "
+            f"size={(total_bytes or 0) / (1024 * 1024):.1f}MB ranges={mode == 'ranges'}",
+            level="DEBUG",
+        )
+
+        if mode == "ranges":
+            response.close()
+            head = head[:total_bytes]
+            fd = os.open(video_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.ftruncate(fd, total_bytes)
+                os.pwrite(fd, head, 0)
+                try:
+                    _download_ranges_parallel(video_url, fd, total_bytes, len(head), _log)
+                except Exception as range_error:
+                    _log(f"Parallel range download failed, retrying as a single stream: {range_error}", level="ERROR")
+                    range_failed = True
+            finally:
+                os.close(fd)
+            total = total_bytes
+        else:
+            total = _write_stream(video_path, head, chunks)
+    finally:
+        response.close()
+
+    if range_failed:
+        # A new response can differ from the sniffed one (expired link, error page): validate it again.
+        mode = "single"
+        retry = http_request("GET", video_url, stream=True, timeout=(15, 600))
+        try:
+            retry.raise_for_status()
+            retry_chunks = retry.iter_content(chunk_size=buffer_bytes)
+            retry_head = _read_head(retry_chunks, DOWNLOAD_SNIFF_BYTES)
+            validate_media_head(
+                retry_head,
+                retry.headers.get("Content-Type", "unknown"),
+                _read_size_bytes(retry.headers.get("Content-Length")),
+                expected_size_bytes,
+            )
+            total = _write_stream(video_path, retry_head, retry_chunks)
+        finally:
+            retry.close()
+
+    elapsed = max(time.time() - started_at, 1e-6)
+    size_mb = total / (1024 * 1024)
+    print(f"Downloaded {size_mb:.1f} MB to {video_path}", flush=True)
     _log(
-        "VI request OUT annotate_video "
-        f"payload_size={video_size_mb:.1f}MB "
-        f"source={input_source} "
-        f"timeout={VI_OPERATION_TIMEOUT_SECONDS}s poll={VI_POLL_INTERVAL_SECONDS}s",
+        f"Download complete mode={mode} size={size_mb:.1f}MB "
+        f"time={elapsed:.1f}s throughput={size_mb / elapsed:.1f}MB/s",
         level="DEBUG",
     )
-    operation = client.annotate_video(
-        request={"input_content": input_content, "features": features}
-    )
-    operation_name = getattr(getattr(operation, "operation", None), "name", "") or "unknown"
-    _log(f"VI response IN operation_created name={operation_name}", level="DEBUG")
+    if total < 1000:
+        raise ValueError(f"Video download is too small to be a video ({total} bytes)")
+    return video_path
 
-    started_at = time.time()
-    while True:
+
+# MP4/MOV durations and frame sizes come from the movie header (moov/mvhd and
+# trak/tkhd); a few range reads find it without downloading the file, even
+# when moov sits after mdat.
+_MP4_HEADER_READ_BYTES = 4096
+_MP4_MOOV_MAX_READ_BYTES = 8 * 1024 * 1024
+_MP4_MAX_TOP_LEVEL_BOXES = 64
+
+
+def parse_mvhd_duration(moov_body: bytes) -> float | None:
+    """Return the duration in seconds from the mvhd box inside a moov payload."""
+    offset = 0
+    while offset + 8 <= len(moov_body):
+        size = int.from_bytes(moov_body[offset:offset + 4], "big")
+        box_type = moov_body[offset + 4:offset + 8]
+        header = 8
+        if size == 1:
+            size = int.from_bytes(moov_body[offset + 8:offset + 16], "big")
+            header = 16
+        if box_type == b"mvhd":
+            body = moov_body[offset + header:]
+            version = body[0] if body else 0
+            if version == 1 and len(body) >= 32:
+                timescale = int.from_bytes(body[20:24], "big")
+                duration = int.from_bytes(body[24:32], "big")
+            elif len(body) >= 20:
+                timescale = int.from_bytes(body[12:16], "big")
+                duration = int.from_bytes(body[16:20], "big")
+            else:
+                return None
+            return duration / timescale if timescale and duration else None
+        if size < header:
+            return None
+        offset += size
+    return None
+
+
+def _iter_mp4_boxes(body: bytes):
+    """Yield (type, payload) for the boxes in `body`; the last payload may be truncated."""
+    offset = 0
+    while offset + 8 <= len(body):
+        size = int.from_bytes(body[offset:offset + 4], "big")
+        header = 8
+        if size == 1:
+            size = int.from_bytes(body[offset + 8:offset + 16], "big")
+            header = 16
+        if size < header:
+            return
+        yield body[offset + 4:offset + 8], body[offset + header:offset + size]
+        offset += size
+
+
+def parse_video_dimensions(moov_body: bytes) -> tuple[int, int] | None:
+    """Return the displayed (width, height) of the first video track in a moov payload.
+
+    Reads trak/tkhd; a 90/270 degree rotation matrix swaps the two, as ffmpeg's
+    autorotate does before the proxy scale filter sees the frame.
+    """
+    for box_type, trak in _iter_mp4_boxes(moov_body):
+        if box_type != b"trak":
+            continue
+        for child_type, tkhd in _iter_mp4_boxes(trak):
+            if child_type != b"tkhd" or not tkhd:
+                continue
+            matrix_offset = 40 if tkhd[0] == 0 else 52
+            if len(tkhd) < matrix_offset + 44:
+                break
+            width = int.from_bytes(tkhd[matrix_offset + 36:matrix_offset + 40], "big") >> 16
+            height = int.from_bytes(tkhd[matrix_offset + 40:matrix_offset + 44], "big") >> 16
+            if not width or not height:
+                break  # audio and other non-visual tracks
+            matrix_a = int.from_bytes(tkhd[matrix_offset:matrix_offset + 4], "big", signed=True)
+            matrix_b = int.from_bytes(tkhd[matrix_offset + 4:matrix_offset + 8], "big", signed=True)
+            if matrix_a == 0 and matrix_b != 0:
+                width, height = height, width
+            return width, height
+    return None
+
+
+def find_mp4_moov(read_at, max_bytes: int = _MP4_HEADER_READ_BYTES) -> bytes | None:
+    """Walk top-level MP4 boxes with `read_at(offset, size) -> bytes`; return up to `max_bytes` of moov."""
+    offset = 0
+    for _ in range(_MP4_MAX_TOP_LEVEL_BOXES):
+        header = read_at(offset, 16)
+        if len(header) < 8:
+            return None
+        size = int.from_bytes(header[:4], "big")
+        box_type = header[4:8]
+        header_size = 8
+        if size == 1:
+            if len(header) < 16:
+                return None
+            size = int.from_bytes(header[8:16], "big")
+            header_size = 16
+        if box_type == b"moov":
+            body_size = size - header_size if size >= header_size else max_bytes
+            return read_at(offset + header_size, max(1, min(body_size, max_bytes)))
+        if size < header_size:
+            # size 0 means "to end of file": nothing can follow it.
+            return None
+        offset += size
+    return None
+
+
+def find_mp4_duration(read_at) -> float | None:
+    moov_body = find_mp4_moov(read_at)
+    return parse_mvhd_duration(moov_body) if moov_body else None
+
+
+def find_mp4_video_dimensions(read_at) -> tuple[int, int] | None:
+    moov_body = find_mp4_moov(read_at, _MP4_MOOV_MAX_READ_BYTES)
+    return parse_video_dimensions(moov_body) if moov_body else None
+
+
+def _remote_range_reader(video_url: str):
+    def _read_at(offset: int, size: int) -> bytes:
+        response = http_request(
+            "GET",
+            video_url,
+            headers={"Range": f"bytes={offset}-{offset + size - 1}"},
+            stream=True,
+            timeout=(15, 30),
+        )
         try:
-            result = operation.result(timeout=VI_POLL_INTERVAL_SECONDS)
-            elapsed = time.time() - started_at
-            _log(
-                "VI response IN_DONE "
-                f"name={operation_name} elapsed={elapsed:.1f}s source={input_source}",
-                level="DEBUG",
-            )
-            break
-        except concurrent.futures.TimeoutError:
-            elapsed = time.time() - started_at
-            progress_hint = ""
-            progress_value = None
-            try:
-                metadata = operation.metadata
-                if metadata and getattr(metadata, "annotation_progress", None):
-                    percents = [
-                        progress.progress_percent
-                        for progress in metadata.annotation_progress
-                        if hasattr(progress, "progress_percent")
-                    ]
-                    if percents:
-                        progress_value = max(percents)
-                        progress_hint = f" vi_progress={progress_value}%"
-            except Exception:
-                progress_hint = ""
+            if response.status_code == 416:
+                return b""
+            if response.status_code != 206:
+                raise RuntimeError(f"range reads not supported (HTTP {response.status_code})")
+            return _read_head(response.iter_content(chunk_size=min(size, 1024 * 1024)), size)[:size]
+        finally:
+            response.close()
 
-            _log(
-                "VI poll IN_PROGRESS "
-                f"name={operation_name} elapsed={elapsed:.1f}s{progress_hint}",
-                level="DEBUG",
-            )
-            if elapsed >= VI_OPERATION_TIMEOUT_SECONDS:
-                _log(
-                    "VI timeout ERROR "
-                    f"name={operation_name} elapsed={elapsed:.1f}s payload={video_size_mb:.1f}MB "
-                    f"source={input_source} "
-                    f"configured_timeout={VI_OPERATION_TIMEOUT_SECONDS}s "
-                    f"last_progress={progress_value if progress_value is not None else 'unknown'}",
-                    level="ERROR",
-                )
-                raise TimeoutError(
-                    "Video Intelligence did not complete within "
-                    f"{VI_OPERATION_TIMEOUT_SECONDS}s "
-                    f"(operation={operation_name}, payload={video_size_mb:.1f}MB)"
-                )
+    return _read_at
+
+
+def probe_remote_mp4_duration(video_url: str) -> float | None:
+    """Read the MP4/MOV duration from the container header over HTTP range requests."""
+    return find_mp4_duration(_remote_range_reader(video_url))
+
+
+def probe_remote_mp4_dimensions(video_url: str) -> tuple[int, int] | None:
+    """Read the displayed frame size of an MP4/MOV over HTTP range requests."""
+    return find_mp4_video_dimensions(_remote_range_reader(video_url))
+
+
+def ffprobe_duration(video_path: str) -> float:
+    _ensure_ffmpeg()
+    probe = subprocess.run(
+        [_FFPROBE_PATH, "-v", "error", "-show_entries", "format=duration",
+         "-of", "default=noprint_wrappers=1:nokey=1", video_path],
+        capture_output=True, text=True,
+    )
+    return float(probe.stdout.strip()) if probe.stdout.strip() else 0
+
+
+def get_project_duration(supabase, project_id: str) -> float | None:
+    """Return the duration stored from Frame.io metadata when the project was resolved."""
+    response = supabase.table("projects").select("duration_seconds").eq("id", project_id).limit(1).execute()
+    rows = response.data if hasattr(response, "data") else []
+    if isinstance(rows, list) and rows and isinstance(rows[0], dict):
+        value = rows[0].get("duration_seconds")
+        try:
+            duration = float(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+        return duration if duration and duration > 0 else None
+    return None
+
+
+def resolve_video_duration(
+    video_url: str | None,
+    metadata_duration: float | None = None,
+    video_path: str | None = None,
+) -> tuple[float, str]:
+    """Resolve the video duration as cheaply as possible; returns (seconds, source).
+
+    Tries the Frame.io metadata, then the MP4/MOV header over HTTP range reads,
+    then ffprobe on the downloaded file. Returns (0, "unknown") if all fail.
+    """
+    if metadata_duration and metadata_duration > 0:
+        return float(metadata_duration), "frame_io"
+    if video_url:
+        try:
+            duration = probe_remote_mp4_duration(video_url)
+            if duration:
+                return duration, "container_header"
+        except Exception as probe_error:
+            print(f"WARNING: container header duration probe failed: {probe_error}", flush=True)
+    if video_path:
+        duration = ffprobe_duration(video_path)
+        if duration:
+            return duration, "ffprobe"
+    return 0.0, "unknown"
+
+
+# --- 2. Text Detection (Google Video Intelligence) ---
+def detect_text_in_video(video_path: str) -> list[dict]:
+    """Use Google Video Intelligence to detect text in video frames."""
+    client = _shared_client("video_intelligence", vi.VideoIntelligenceServiceClient)
+
+    with open(video_path, "rb") as f:
+        input_content = f.read()
+
+    features = [vi.Feature.TEXT_DETECTION]
+    operation = client.annotate_video(
+        request={"input_content": input_content, "features": features}
+    )
+    result = get_operations_manager().track(operation, "vi", timeout=600).result()
+
+    return extract_detections_from_vi_result(result)
+
+
+def detect_text_in_video_with_raw(
+    video_path: str,
+    debug_logger=None,
+    input_source: str = "original",
+) -> tuple[list[dict], dict]:
+    """Detect text and return both flattened detections and raw VI payload."""
+    client = _shared_client("video_intelligence", vi.VideoIntelligenceServiceClient)
+    video_size_bytes = os.path.getsize(video_path)
+    video_size_mb = video_size_bytes / (1024 * 1024)
+
+    with open(video_path, "rb") as f:
+        input_content = f.read()
+
+    features = [vi.Feature.TEXT_DETECTION]
+    def _log(message: str, level: str = "DEBUG"):
+        if debug_logger:
+            debug_logger(message, level=level)
+            return
+        print(message, flush=True)
+
+    _log(
+        "VI request OUT annotate_video "
+        f"payload_size={video_size_mb:.1f}MB "
+        f"source={input_source} "
+        f"timeout={VI_OPERATION_TIMEOUT_SECONDS}s poll={VI_POLL_INTERVAL_SECONDS}s",
+        level="DEBUG",
+    )
+    operation = client.annotate_video(
+        request={"input_content": input_content, "features": features}
+    )
+    operation_name = getattr(getattr(operation, "operation", None), "name", "") or "unknown"
+    _log(f"VI response IN operation_created name={operation_name}", level="DEBUG")
+
+    def _on_progress(percent: float | None, elapsed: float):
+        progress_hint = f" vi_progress={percent:g}%" if percent is not None else ""
+        _log(
+            "VI poll IN_PROGRESS "
+            f"name={operation_name} elapsed={elapsed:.1f}s{progress_hint}{manager.progress_hint()}",
+            level="DEBUG",
+        )
+
+    manager = get_operations_manager()
+    started_at = time.time()
+    future = manager.track(
+        operation,
+        "vi",
+        label=f"vi:{operation_name}",
+        timeout=VI_OPERATION_TIMEOUT_SECONDS,
+        on_progress=_on_progress,
+    )
+    try:
+        result = future.result()
+    except TimeoutError:
+        elapsed = time.time() - started_at
+        last_progress = _operation_progress_percent(getattr(operation, "metadata", None))
+        _log(
+            "VI timeout ERROR "
+            f"name={operation_name} elapsed={elapsed:.1f}s payload={video_size_mb:.1f}MB "
+            f"source={input_source} "
+            f"configured_timeout={VI_OPERATION_TIMEOUT_SECONDS}s "
+            f"last_progress={last_progress if last_progress is not None else 'unknown'}",
+            level="ERROR",
+        )
+        raise TimeoutError(
+            "Video Intelligence did not complete within "
+            f"{VI_OPERATION_TIMEOUT_SECONDS}s "
+            f"(operation={operation_name}, payload={video_size_mb:.1f}MB)"
+        )
+    elapsed = time.time() - started_at
+    _log(
+        "VI response IN_DONE "
+        f"name={operation_name} elapsed={elapsed:.1f}s source={input_source}",
+        level="DEBUG",
+    )
     detections = extract_detections_from_vi_result(result)
 
     raw_payload = MessageToDict(
@@ -766,6 +2146,111 @@ def build_ocr_proxy_video(video_path: str, tmp_dir: str, debug_logger=None) -> s
     return proxy_path
 
 
+def ocr_proxy_target_width(master_width: int | None) -> int:
+    """Width the local OCR proxy would have: the scale filter never upscales the master."""
+    return min(OCR_PROXY_MAX_WIDTH, master_width) if master_width else OCR_PROXY_MAX_WIDTH
+
+
+def pick_ocr_rendition(
+    renditions: list[dict] | None,
+    min_width: int = OCR_PROXY_MAX_WIDTH,
+    probe_dimensions=None,
+) -> dict | None:
+    """Pick the narrowest rendition at least `min_width` wide (the OCR proxy target).
+
+    Renditions without known dimensions are measured with `probe_dimensions(url)`
+    (a range read of the MP4 header) and skipped when it is not given or fails;
+    no rendition is downloaded on a guessed width.
+    """
+    candidates = []
+    for rendition in renditions or []:
+        if not isinstance(rendition, dict) or not read_string(rendition.get("url")):
+            continue
+        width = read_number(rendition.get("width"))
+        if width is None and probe_dimensions is not None:
+            try:
+                dimensions = probe_dimensions(rendition["url"])
+            except Exception as probe_error:
+                print(f"WARNING: could not probe rendition {rendition.get('key')}: {probe_error}", flush=True)
+                dimensions = None
+            if dimensions:
+                rendition = {**rendition, "width": dimensions[0], "height": dimensions[1]}
+                width = dimensions[0]
+        if width is not None and width >= min_width:
+            candidates.append(rendition)
+    return min(candidates, key=lambda rendition: rendition["width"]) if candidates else None
+
+
+def probe_master_width(video_url: str | None) -> int | None:
+    """Displayed width of the master from its MP4 header; None when it cannot be read."""
+    if not video_url:
+        return None
+    try:
+        dimensions = probe_remote_mp4_dimensions(video_url)
+    except Exception as probe_error:
+        print(f"WARNING: could not probe master dimensions: {probe_error}", flush=True)
+        return None
+    return dimensions[0] if dimensions else None
+
+
+def probe_media_streams(video_path: str) -> dict:
+    """Return {"width", "height", "has_audio"} for the first video stream of a file."""
+    _ensure_ffmpeg()
+    result = subprocess.run(
+        [_FFPROBE_PATH, "-v", "error", "-show_entries", "stream=codec_type,width,height",
+         "-of", "json", video_path],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {(result.stderr or '').strip()[-300:]}")
+    streams = (json.loads(result.stdout or "{}") or {}).get("streams") or []
+    video = next((stream for stream in streams if stream.get("codec_type") == "video"), {})
+    return {
+        "width": int(video.get("width") or 0),
+        "height": int(video.get("height") or 0),
+        "has_audio": any(stream.get("codec_type") == "audio" for stream in streams),
+    }
+
+
+def fetch_ocr_rendition(
+    rendition: dict,
+    tmp_dir: str,
+    debug_logger=None,
+    min_width: int = OCR_PROXY_MAX_WIDTH,
+) -> tuple[str | None, bool]:
+    """Download a Frame.io transcode for OCR; returns (path, has_audio) or (None, False).
+
+    The rendition is rejected when ffprobe finds it narrower than `min_width`
+    (the width the local proxy would have).
+    """
+    def _log(message: str, level: str = "DEBUG"):
+        if debug_logger:
+            debug_logger(message, level=level)
+            return
+        print(message, flush=True)
+
+    key = rendition.get("key") or "rendition"
+    try:
+        path = download_video(rendition["url"], tmp_dir, debug_logger=debug_logger, filename=f"rendition_{key}.mp4")
+        streams = probe_media_streams(path)
+    except Exception as rendition_error:
+        _log(f"OCR rendition ERROR key={key}: {rendition_error}", level="ERROR")
+        return None, False
+    if streams["width"] < min_width:
+        _log(
+            f"OCR rendition skipped key={key} width={streams['width']} < {min_width}",
+            level="DEBUG",
+        )
+        os.remove(path)
+        return None, False
+    _log(
+        f"OCR rendition selected key={key} size={streams['width']}x{streams['height']} "
+        f"has_audio={streams['has_audio']}",
+        level="DEBUG",
+    )
+    return path, streams["has_audio"]
+
+
 def extract_detections_from_vi_result(result) -> list[dict]:
     detections = []
     for annotation in result.annotation_results:
@@ -1152,6 +2637,52 @@ def extract_audio(video_path: str, tmp_dir: str) -> str:
     return audio_path
 
 
+_STT_AUDIO_CODECS = {
+    "wav": (".wav", ["-acodec", "pcm_s16le"]),
+    "flac": (".flac", ["-c:a", "flac", "-compression_level", "5"]),
+    "opus": (".ogg", ["-c:a", "libopus", "-b:a", STT_OPUS_BITRATE, "-application", "voip"]),
+}
+
+
+def _stt_codec(encoding: str = STT_AUDIO_ENCODING) -> tuple[str, list[str]]:
+    """Return (file extension, ffmpeg codec args) for an STT_AUDIO_ENCODING value (unknown -> wav)."""
+    return _STT_AUDIO_CODECS.get(encoding, _STT_AUDIO_CODECS["wav"])
+
+
+def encode_audio_for_stt(audio_path: str, encoding: str = STT_AUDIO_ENCODING, debug_logger=None) -> str:
+    """Re-encode the 16 kHz mono WAV for upload; returns the WAV itself for "wav" or on failure.
+
+    FLAC is lossless and roughly halves speech audio; Opus is lossy but 5-10x
+    smaller. STT detects either through AutoDetectDecodingConfig.
+    """
+    extension, codec_args = _stt_codec(encoding)
+    if extension == ".wav":
+        return audio_path
+    encoded_path = os.path.splitext(audio_path)[0] + extension
+    started_at = time.time()
+    result = subprocess.run(
+        [_FFMPEG_PATH, "-v", "error", "-i", audio_path, *codec_args, "-ar", "16000", "-ac", "1", encoded_path, "-y"],
+        capture_output=True, text=True,
+    )
+    message_level = "DEBUG"
+    if result.returncode != 0:
+        message = f"STT audio encode ERROR encoding={encoding}, using wav: {result.stderr[-300:]}"
+        message_level = "ERROR"
+        encoded_path = audio_path
+    else:
+        message = (
+            f"STT audio encoded encoding={encoding} "
+            f"size={os.path.getsize(encoded_path) / (1024 * 1024):.2f}MB "
+            f"wav_size={os.path.getsize(audio_path) / (1024 * 1024):.2f}MB "
+            f"in {time.time() - started_at:.1f}s"
+        )
+    if debug_logger:
+        debug_logger(message, level=message_level)
+    else:
+        print(message, flush=True)
+    return encoded_path
+
+
 def _group_words_by_second(words: list[dict]) -> list[dict]:
     """Group word-level transcription into 1-second buckets by word start_time.
 
@@ -1229,11 +2760,134 @@ def _extract_words_from_v2_results(results) -> list[dict]:
     return words
 
 
+def _stt_raw_word_row(word_info) -> dict | None:
+    """Normalize one raw STT word dict (snake_case or camelCase) to a word timing row."""
+    if not isinstance(word_info, dict):
+        return None
+    token = read_string(word_info.get("word")) or ""
+    if not token:
+        return None
+
+    start = _parse_transcription_time_seconds(
+        word_info.get("start_offset", word_info.get("startOffset")),
+        0.0,
+    )
+    end = _parse_transcription_time_seconds(
+        word_info.get("end_offset", word_info.get("endOffset")),
+        start,
+    )
+    if start is None:
+        start = 0.0
+    if end is None or end < start:
+        end = start
+
+    speaker_raw = (
+        word_info.get("speaker_label")
+        or word_info.get("speakerLabel")
+        or word_info.get("speaker_tag")
+        or word_info.get("speakerTag")
+    )
+    speaker_value = None
+    if isinstance(speaker_raw, (int, float)):
+        speaker_num = int(speaker_raw)
+        if speaker_num > 0:
+            speaker_value = f"Speaker {speaker_num}"
+    elif isinstance(speaker_raw, str):
+        cleaned = speaker_raw.strip()
+        if cleaned:
+            speaker_value = cleaned
+
+    confidence = word_info.get("confidence")
+    if not isinstance(confidence, (int, float)):
+        confidence = None
+
+    return {
+        "word": token,
+        "start_time": float(start),
+        "end_time": float(end),
+        "speaker": speaker_value,
+        "confidence": confidence,
+    }
+
+
+def _stt_raw_result_lists(raw_response: dict) -> list[list] | None:
+    """Return the V2 result lists of a known raw STT payload shape, or None if unrecognised.
+
+    Known shapes: recognize (`results` list), batch_recognize (`results` keyed by
+    URI, transcript under `inline_result` or the legacy `transcript`) and the
+    chunked payload (`chunks[].response` recognize responses).
+    """
+    if raw_response.get("chunked"):
+        chunks = raw_response.get("chunks")
+        if not isinstance(chunks, list):
+            return None
+        result_lists = []
+        for chunk in chunks:
+            response = chunk.get("response") if isinstance(chunk, dict) else None
+            if not isinstance(response, dict):
+                return None
+            results = response.get("results", [])
+            if not isinstance(results, list):
+                return None
+            result_lists.append(results)
+        return result_lists
+
+    results = raw_response.get("results")
+    if isinstance(results, list):
+        return [results]
+    if isinstance(results, dict):
+        result_lists = []
+        for file_result in results.values():
+            if not isinstance(file_result, dict):
+                return None
+            inline = file_result.get("inline_result") or file_result.get("inlineResult") or {}
+            transcript = (inline.get("transcript") if isinstance(inline, dict) else None) or file_result.get("transcript") or {}
+            file_results = transcript.get("results", []) if isinstance(transcript, dict) else None
+            if not isinstance(file_results, list):
+                return None
+            result_lists.append(file_results)
+        return result_lists
+    return None
+
+
+def _iter_stt_raw_words(result_lists: list[list]):
+    """Yield word rows from the first alternative of each result, in payload order."""
+    for results in result_lists:
+        for result in results:
+            alternatives = result.get("alternatives") if isinstance(result, dict) else None
+            if not alternatives or not isinstance(alternatives[0], dict):
+                continue
+            for word_info in alternatives[0].get("words") or []:
+                row = _stt_raw_word_row(word_info)
+                if row is not None:
+                    yield row
+
+
 def _extract_words_from_stt_raw_response(raw_response: dict) -> list[dict]:
-    """Extract normalized word timing rows from STT raw JSON payload."""
+    """Extract normalized word timing rows from STT raw JSON payload.
+
+    Payloads written by this function (see `_stt_raw_result_lists`) are parsed
+    directly; they are already in time order with no duplicates, so the sort
+    only runs if an out-of-order word shows up. Unknown shapes fall back to a
+    recursive walk over every `words` list with dedupe.
+    """
     if not isinstance(raw_response, dict):
         return []
 
+    result_lists = _stt_raw_result_lists(raw_response)
+    if result_lists is not None:
+        words = []
+        in_order = True
+        last_start = float("-inf")
+        for row in _iter_stt_raw_words(result_lists):
+            if row["start_time"] < last_start:
+                in_order = False
+            last_start = row["start_time"]
+            words.append(row)
+        if not in_order:
+            words.sort(key=lambda w: (w["start_time"], w["end_time"]))
+        return words
+
     extracted: list[dict] = []
 
     def _visit(node):
@@ -1241,52 +2895,9 @@ def _extract_words_from_stt_raw_response(raw_response: dict) -> list[dict]:
             words_node = node.get("words")
             if isinstance(words_node, list):
                 for word_info in words_node:
-                    if not isinstance(word_info, dict):
-                        continue
-                    token = read_string(word_info.get("word")) or ""
-                    if not token:
-                        continue
-
-                    start = _parse_transcription_time_seconds(
-                        word_info.get("start_offset", word_info.get("startOffset")),
-                        0.0,
-                    )
-                    end = _parse_transcription_time_seconds(
-                        word_info.get("end_offset", word_info.get("endOffset")),
-                        start,
-                    )
-                    if start is None:
-                        start = 0.0
-                    if end is None or end < start:
-                        end = start
-
-                    speaker_raw = (
-                        word_info.get("speaker_label")
-                        or word_info.get("speakerLabel")
-                        or word_info.get("speaker_tag")
-                        or word_info.get("speakerTag")
-                    )
-                    speaker_value = None
-                    if isinstance(speaker_raw, (int, float)):
-                        speaker_num = int(speaker_raw)
-                        if speaker_num > 0:
-                            speaker_value = f"Speaker {speaker_num}"
-                    elif isinstance(speaker_raw, str):
-                        cleaned = speaker_raw.strip()
-                        if cleaned:
-                            speaker_value = cleaned
-
-                    confidence = word_info.get("confidence")
-                    if not isinstance(confidence, (int, float)):
-                        confidence = None
-
-                    extracted.append({
-                        "word": token,
-                        "start_time": float(start),
-                        "end_time": float(end),
-                        "speaker": speaker_value,
-                        "confidence": confidence,
-                    })
+                    row = _stt_raw_word_row(word_info)
+                    if row is not None:
+                        extracted.append(row)
 
             for value in node.values():
                 _visit(value)
@@ -1310,6 +2921,286 @@ def _extract_words_from_stt_raw_response(raw_response: dict) -> list[dict]:
     return words
 
 
+def _read_pcm16_wav(path: str):
+    """Memory-map a 16-bit PCM WAV; returns (mmap, samples int16 view, sample_rate, channels).
+
+    The caller must delete the sample view before closing the mmap.
+    """
+    import numpy as np
+
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:4] != b"RIFF" or mapped[8:12] != b"WAVE":
+        mapped.close()
+        raise ValueError(f"Not a RIFF/WAVE file: {path}")
+
+    sample_rate = channels = bits = None
+    offset = 12
+    while offset + 8 <= len(mapped):
+        chunk_id = mapped[offset:offset + 4]
+        chunk_size = int.from_bytes(mapped[offset + 4:offset + 8], "little")
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            audio_format = int.from_bytes(mapped[body:body + 2], "little")
+            channels = int.from_bytes(mapped[body + 2:body + 4], "little")
+            sample_rate = int.from_bytes(mapped[body + 4:body + 8], "little")
+            bits = int.from_bytes(mapped[body + 14:body + 16], "little")
+            if audio_format not in (1, 0xFFFE) or bits != 16:
+                mapped.close()
+                raise ValueError(f"Unsupported WAV format (format={audio_format}, bits={bits})")
+        elif chunk_id == b"data" and sample_rate:
+            # ffmpeg may leave the size at 0xFFFFFFFF when streaming; clamp to the file.
+            data_size = min(chunk_size, len(mapped) - body)
+            samples = np.frombuffer(mapped, dtype="<i2", count=data_size // 2, offset=body)
+            return mapped, samples, sample_rate, channels or 1
+        offset = body + chunk_size + (chunk_size & 1)
+    mapped.close()
+    raise ValueError(f"WAV has no data chunk: {path}")
+
+
+def detect_speech_regions(wav_path: str) -> tuple[list[tuple[float, float]], dict]:
+    """Find speech in a 16-bit PCM WAV with frame energy, zero-crossing rate and energy modulation.
+
+    A frame counts as speech when it is VAD_ENERGY_MARGIN_DB above the noise
+    floor (10th percentile), its ZCR is below VAD_MAX_ZCR (hiss, cymbals) and the
+    energy around it fluctuates by at least VAD_MIN_MODULATION_DB, which syllabic
+    speech does and sustained music beds mostly do not. Regions are merged across
+    short gaps, filtered by length and padded.
+    Returns (regions in seconds, stats).
+    """
+    import numpy as np
+
+    mapped, samples, sample_rate, channels = _read_pcm16_wav(wav_path)
+    try:
+        frame_len = max(1, int(sample_rate * VAD_FRAME_MS / 1000)) * channels
+        frame_count = len(samples) // frame_len
+        energy_db = np.empty(frame_count, dtype=np.float32)
+        zcr = np.empty(frame_count, dtype=np.float32)
+        block_frames = 2000
+        for block_start in range(0, frame_count, block_frames):
+            block_end = min(frame_count, block_start + block_frames)
+            block = samples[block_start * frame_len:block_end * frame_len].reshape(block_end - block_start, frame_len)
+            block = block.astype(np.float32) / 32768.0
+            rms = np.sqrt(np.mean(block * block, axis=1))
+            energy_db[block_start:block_end] = 20.0 * np.log10(np.maximum(rms, 1e-6))
+            signs = np.signbit(block)
+            zcr[block_start:block_end] = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+        duration = len(samples) / float(sample_rate * channels)
+    finally:
+        del samples
+        mapped.close()
+
+    stats = {"duration_seconds": round(duration, 3), "frames": frame_count}
+    if frame_count == 0:
+        return [], {**stats, "speech_seconds": 0.0}
+
+    noise_floor = float(np.percentile(energy_db, 10))
+    threshold = max(noise_floor + VAD_ENERGY_MARGIN_DB, VAD_MIN_ENERGY_DB)
+    window = max(1, int(round(500 / VAD_FRAME_MS)))
+    padded = np.pad(energy_db, (window // 2, window - 1 - window // 2), mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    modulation = windows.std(axis=1)
+    speech = (energy_db > threshold) & (zcr < VAD_MAX_ZCR) & (modulation >= VAD_MIN_MODULATION_DB)
+
+    frame_seconds = VAD_FRAME_MS / 1000.0
+    regions: list[tuple[float, float]] = []
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], speech.astype(np.int8), [0]))))
+    for start_frame, end_frame in zip(edges[0::2], edges[1::2]):
+        start = start_frame * frame_seconds
+        end = end_frame * frame_seconds
+        if regions and start - regions[-1][1] <= VAD_MERGE_GAP_SECONDS:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+
+    padded_regions: list[tuple[float, float]] = []
+    for start, end in regions:
+        if end - start < VAD_MIN_SPEECH_SECONDS:
+            continue
+        start = max(0.0, start - VAD_PADDING_SECONDS)
+        end = min(duration, end + VAD_PADDING_SECONDS)
+        if padded_regions and start <= padded_regions[-1][1]:
+            padded_regions[-1] = (padded_regions[-1][0], end)
+        else:
+            padded_regions.append((start, end))
+
+    stats.update({
+        "noise_floor_db": round(noise_floor, 1),
+        "threshold_db": round(threshold, 1),
+        "regions": len(padded_regions),
+        "speech_seconds": round(sum(end - start for start, end in padded_regions), 3),
+    })
+    return padded_regions, stats
+
+
+class SpeechTimeMap:
+    """Map times on the condensed speech-only audio back to the original timeline."""
+
+    def __init__(self, pieces: list[tuple[float, float, float]]):
+        # (condensed_start, original_start, length)
+        self.pieces = pieces
+        self._starts = [piece[0] for piece in pieces]
+
+    def __call__(self, condensed_time: float) -> float:
+        if not self.pieces:
+            return condensed_time
+        index = max(0, bisect.bisect_right(self._starts, condensed_time) - 1)
+        condensed_start, original_start, length = self.pieces[index]
+        # Times inside the joining silence snap to the end of the piece before it.
+        return original_start + min(max(0.0, condensed_time - condensed_start), length)
+
+
+def build_speech_only_audio(
+    wav_path: str,
+    regions: list[tuple[float, float]],
+    output_path: str,
+) -> tuple[float, SpeechTimeMap]:
+    """Write the speech regions of `wav_path` back to back into a new WAV.
+
+    Regions are separated by VAD_JOIN_SILENCE_SECONDS of silence so STT does not
+    run words from different regions together. Returns (duration, time map).
+    """
+    import numpy as np
+    import wave
+
+    mapped, samples, sample_rate, channels = _read_pcm16_wav(wav_path)
+    pieces: list[tuple[float, float, float]] = []
+    try:
+        gap = np.zeros(int(VAD_JOIN_SILENCE_SECONDS * sample_rate) * channels, dtype="<i2")
+        cursor = 0.0
+        with wave.open(output_path, "wb") as out:
+            out.setnchannels(channels)
+            out.setsampwidth(2)
+            out.setframerate(sample_rate)
+            for index, (start, end) in enumerate(regions):
+                first = int(start * sample_rate) * channels
+                last = int(end * sample_rate) * channels
+                if index:
+                    out.writeframes(gap.tobytes())
+                    cursor += VAD_JOIN_SILENCE_SECONDS
+                out.writeframes(samples[first:last].tobytes())
+                length = (last - first) / float(sample_rate * channels)
+                pieces.append((cursor, start, length))
+                cursor += length
+    finally:
+        del samples
+        mapped.close()
+    return cursor, SpeechTimeMap(pieces)
+
+
+_SILENCE_START_RE = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END_RE = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+def detect_silences(
+    audio_path: str,
+    noise_db: float = STT_SILENCE_NOISE_DB,
+    min_silence_seconds: float = STT_SILENCE_MIN_SECONDS,
+) -> list[tuple[float, float]]:
+    """Return (start, end) silence intervals from ffmpeg `silencedetect`."""
+    _ensure_ffmpeg()
+    result = subprocess.run(
+        [_FFMPEG_PATH, "-i", audio_path, "-af", f"silencedetect=noise={noise_db:g}dB:d={min_silence_seconds:g}",
+         "-f", "null", "-"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg silencedetect failed: {result.stderr[-500:]}")
+
+    silences: list[tuple[float, float]] = []
+    pending_start: float | None = None
+    for line in result.stderr.splitlines():
+        start_match = _SILENCE_START_RE.search(line)
+        if start_match:
+            pending_start = max(0.0, float(start_match.group(1)))
+            continue
+        end_match = _SILENCE_END_RE.search(line)
+        if end_match and pending_start is not None:
+            silences.append((pending_start, float(end_match.group(1))))
+            pending_start = None
+    return silences
+
+
+def plan_audio_chunks(
+    duration_seconds: float,
+    silences: list[tuple[float, float]],
+    max_chunk_seconds: float = STT_CHUNK_MAX_SECONDS,
+) -> list[tuple[float, float]]:
+    """Split [0, duration) into chunks no longer than `max_chunk_seconds`.
+
+    Each chunk ends at the midpoint of the last silence that fits, so words are
+    not cut in half; with no usable silence the chunk is cut hard at the limit.
+    """
+    cut_points = sorted((start + end) / 2 for start, end in silences if end > start)
+    chunks: list[tuple[float, float]] = []
+    cursor = 0.0
+    while duration_seconds - cursor > max_chunk_seconds:
+        limit = cursor + max_chunk_seconds
+        index = bisect.bisect_right(cut_points, limit) - 1
+        cut = cut_points[index] if index >= 0 and cut_points[index] > cursor + 1.0 else limit
+        chunks.append((cursor, cut))
+        cursor = cut
+    if duration_seconds > cursor:
+        chunks.append((cursor, duration_seconds))
+    return chunks
+
+
+def _cut_audio_chunk(audio_path: str, start: float, end: float, index: int) -> str:
+    """Cut [start, end) from the WAV and encode it with STT_AUDIO_ENCODING in one ffmpeg pass."""
+    extension, codec_args = _stt_codec()
+    chunk_path = f"{os.path.splitext(audio_path)[0]}.chunk{index:03d}{extension}"
+    result = subprocess.run(
+        [_FFMPEG_PATH, "-v", "error", "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", audio_path,
+         *codec_args, chunk_path, "-y"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg chunk cut failed: {result.stderr[-500:]}")
+    return chunk_path
+
+
+def _remap_raw_word_offsets(node, remap):
+    """Rewrite word offsets in a raw STT dict through `remap(seconds) -> seconds`, in place."""
+    if isinstance(node, dict):
+        words_node = node.get("words")
+        if isinstance(words_node, list):
+            for word_info in words_node:
+                if not isinstance(word_info, dict):
+                    continue
+                for key in ("start_offset", "end_offset"):
+                    value = _parse_transcription_time_seconds(word_info.get(key), 0.0) or 0.0
+                    word_info[key] = f"{remap(value):.3f}s"
+        for value in node.values():
+            if value is not words_node:
+                _remap_raw_word_offsets(value, remap)
+    elif isinstance(node, list):
+        for item in node:
+            _remap_raw_word_offsets(item, remap)
+
+
+def _reconcile_chunk_speakers(chunk_words: list[list[dict]]) -> list[dict]:
+    """Stitch per-chunk words, carrying diarization labels across chunk boundaries.
+
+    Diarization labels are only consistent within one request. Chunks are cut
+    at pauses, so we assume the first voice of a chunk continues the last voice
+    of the previous one and swap that pair of labels; other labels are kept.
+    """
+    stitched: list[dict] = []
+    previous_last: str | None = None
+    for words in chunk_words:
+        mapping: dict[str, str] = {}
+        first = next((w.get("speaker") for w in words if w.get("speaker")), None)
+        if previous_last and first and first != previous_last:
+            mapping = {first: previous_last, previous_last: first}
+        for word in words:
+            speaker = word.get("speaker")
+            if speaker:
+                word["speaker"] = mapping.get(speaker, speaker)
+            stitched.append(word)
+        previous_last = next((w.get("speaker") for w in reversed(stitched) if w.get("speaker")), previous_last)
+    return stitched
+
+
 def transcribe_with_speech_to_text(
     audio_path: str,
     duration_seconds: float = 0,
@@ -1317,8 +3208,12 @@ def transcribe_with_speech_to_text(
 ) -> tuple[list[dict], dict, list[dict]]:
     """Transcribe audio using Google Cloud Speech-to-Text V2 (chirp_3).
 
-    Uses synchronous `recognize` for audio ≤60s and
-    `batch_recognize` with GCS upload for longer audio.
+    Uses synchronous `recognize` for audio ≤60s. Longer audio goes through
+    `batch_recognize` with a GCS upload, or with STT_LONG_AUDIO_MODE=chunked is
+    split at silences into <60s chunks recognized concurrently (a chunk that
+    still fails after STT_CHUNK_RETRIES falls back to `batch_recognize`). With VAD_ENABLED
+    only the detected speech regions are sent and word times are mapped back;
+    when VAD finds less than VAD_MIN_SPEECH_RATIO speech the full audio is sent.
     """
     from google.cloud.speech_v2 import SpeechClient
     from google.cloud.speech_v2.types import cloud_speech
@@ -1329,11 +3224,11 @@ def transcribe_with_speech_to_text(
     if not project_id:
         raise ValueError("GCP_PROJECT_ID is not configured")
 
-    client = SpeechClient(
+    client = _shared_client(f"speech:{region}", lambda: SpeechClient(
         client_options=ClientOptions(
             api_endpoint=f"{region}-speech.googleapis.com",
         )
-    )
+    ))
 
     recognizer = f"projects/{project_id}/locations/{region}/recognizers/_"
     def _log(message: str, level: str = "DEBUG"):
@@ -1360,20 +3255,122 @@ def transcribe_with_speech_to_text(
     )
 
     raw_payload: dict = {}
+    time_map: SpeechTimeMap | None = None
+    vad_meta: dict | None = None
+    if VAD_ENABLED and audio_path.lower().endswith(".wav"):
+        try:
+            regions, vad_meta = detect_speech_regions(audio_path)
+        except ImportError:
+            _log("STT VAD skipped: numpy is not installed", level="DEBUG")
+        except Exception as vad_error:
+            _log(f"STT VAD ERROR sending full audio: {vad_error}", level="ERROR")
+        else:
+            _log(
+                "STT VAD "
+                f"regions={vad_meta.get('regions', 0)} speech={vad_meta.get('speech_seconds', 0):.1f}s "
+                f"of {vad_meta.get('duration_seconds', 0):.1f}s "
+                f"noise_floor={vad_meta.get('noise_floor_db', 'n/a')}dB",
+                level="DEBUG",
+            )
+            if not regions or vad_meta["speech_seconds"] < vad_meta["duration_seconds"] * VAD_MIN_SPEECH_RATIO:
+                # Missing real speech drops every mismatch check downstream; STT on silence is cheap.
+                _log("STT VAD found little or no speech; sending the full audio", level="DEBUG")
+                vad_meta = {**vad_meta, "fallback": "full_audio"}
+            elif vad_meta["speech_seconds"] < vad_meta["duration_seconds"] * 0.95:
+                speech_path = os.path.splitext(audio_path)[0] + ".speech.wav"
+                duration_seconds, time_map = build_speech_only_audio(audio_path, regions, speech_path)
+                audio_path = speech_path
+                _log(f"STT VAD condensed audio to {duration_seconds:.1f}s", level="DEBUG")
+
+    words: list[dict] | None = None
+    chunks: list[tuple[float, float]] = []
+    if duration_seconds > 60 and STT_LONG_AUDIO_MODE == "chunked":
+        try:
+            silences = detect_silences(audio_path)
+            chunks = plan_audio_chunks(duration_seconds, silences)
+            _log(
+                f"STT chunk plan silences={len(silences)} chunks={len(chunks)} "
+                f"longest={max(end - start for start, end in chunks):.1f}s",
+                level="DEBUG",
+            )
+        except Exception as chunk_error:
+            _log(f"STT chunk plan ERROR falling back to batch_recognize: {chunk_error}", level="ERROR")
+            chunks = []
 
-    if duration_seconds > 60:
-        # batch_recognize requires audio via GCS URI
-        from google.cloud import storage as gcs
+    if chunks:
+        def _recognize_chunk(index: int, start: float, end: float) -> tuple[list[dict], dict]:
+            chunk_path = _cut_audio_chunk(audio_path, start, end, index)
+            try:
+                with open(chunk_path, "rb") as f:
+                    chunk_content = f.read()
+            finally:
+                os.remove(chunk_path)
+            chunk_response = client.recognize(request=cloud_speech.RecognizeRequest(
+                recognizer=recognizer,
+                config=config,
+                content=chunk_content,
+            ))
+            chunk_words = _extract_words_from_v2_results(chunk_response.results)
+            for word in chunk_words:
+                word["start_time"] += start
+                word["end_time"] += start
+            chunk_raw = MessageToDict(
+                chunk_response._pb,
+                preserving_proto_field_name=True,
+            ) if hasattr(chunk_response, "_pb") else {}
+            _remap_raw_word_offsets(chunk_raw, lambda seconds, offset=start: seconds + offset)
+            return chunk_words, {"offset_seconds": start, "end_seconds": end, "response": chunk_raw}
 
-        bucket_name = f"{project_id}-vqa-tmp"
-        blob_name = f"speech-tmp/{uuid.uuid4()}.wav"
-        gcs_uri = f"gs://{bucket_name}/{blob_name}"
+        def _recognize_chunk_with_retry(index: int, start: float, end: float) -> tuple[list[dict], dict]:
+            attempt = 0
+            while True:
+                try:
+                    return _recognize_chunk(index, start, end)
+                except Exception as chunk_error:
+                    attempt += 1
+                    if attempt > STT_CHUNK_RETRIES:
+                        raise
+                    _log(f"STT chunk {index} ERROR retrying ({attempt}/{STT_CHUNK_RETRIES}): {chunk_error}",
+                         level="ERROR")
+
+        _log(
+            f"STT request OUT recognize mode=chunked chunks={len(chunks)} workers={STT_CHUNK_MAX_WORKERS}",
+            level="DEBUG",
+        )
+        started_at = time.time()
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(STT_CHUNK_MAX_WORKERS, len(chunks)),
+            thread_name_prefix="stt-chunk",
+        )
+        try:
+            futures = [
+                executor.submit(_recognize_chunk_with_retry, index, start, end)
+                for index, (start, end) in enumerate(chunks)
+            ]
+            chunk_results = [future.result() for future in futures]
+        except Exception as chunk_error:
+            _log(f"STT chunked ERROR falling back to batch_recognize: {chunk_error}", level="ERROR")
+        else:
+            _log(f"STT response IN recognize chunked completed in {time.time() - started_at:.1f}s", level="DEBUG")
+            words = _reconcile_chunk_speakers([chunk_words for chunk_words, _ in chunk_results])
+            raw_payload = {"chunked": True, "chunks": [chunk_raw for _, chunk_raw in chunk_results]}
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    if words is None and duration_seconds > 60:
+        # batch_recognize requires audio via GCS URI
+        from google.cloud import storage as gcs
+
+        upload_path = encode_audio_for_stt(audio_path, debug_logger=debug_logger)
+        bucket_name = f"{project_id}-vqa-tmp"
+        blob_name = f"speech-tmp/{uuid.uuid4()}{os.path.splitext(upload_path)[1]}"
+        gcs_uri = f"gs://{bucket_name}/{blob_name}"
 
         _log(f"STT request OUT upload_to_gcs uri={gcs_uri}", level="DEBUG")
-        storage_client = gcs.Client()
+        storage_client = _shared_client("storage", gcs.Client)
         bucket = storage_client.bucket(bucket_name)
         blob = bucket.blob(blob_name)
-        blob.upload_from_filename(audio_path)
+        blob.upload_from_filename(upload_path)
 
         try:
             file_metadata = cloud_speech.BatchRecognizeFileMetadata(uri=gcs_uri)
@@ -1387,7 +3384,22 @@ def transcribe_with_speech_to_text(
             )
             _log("STT request OUT batch_recognize mode=batch", level="DEBUG")
             operation = client.batch_recognize(request=request)
-            response = operation.result(timeout=600)
+
+            def _on_stt_progress(percent: float | None, elapsed: float):
+                progress_hint = f" stt_progress={percent:g}%" if percent is not None else ""
+                _log(
+                    f"STT poll IN_PROGRESS elapsed={elapsed:.1f}s{progress_hint}"
+                    f"{get_operations_manager().progress_hint()}",
+                    level="DEBUG",
+                )
+
+            response = get_operations_manager().track(
+                operation,
+                "stt",
+                label=f"stt:{blob_name}",
+                timeout=STT_OPERATION_TIMEOUT_SECONDS,
+                on_progress=_on_stt_progress,
+            ).result()
             _log("STT response IN batch_recognize completed", level="DEBUG")
             raw_payload = MessageToDict(
                 response._pb,
@@ -1403,8 +3415,8 @@ def transcribe_with_speech_to_text(
                 _log(f"STT cleanup IN deleted_gcs_temp uri={gcs_uri}", level="DEBUG")
             except Exception:
                 pass
-    else:
-        with open(audio_path, "rb") as f:
+    elif words is None:
+        with open(encode_audio_for_stt(audio_path, debug_logger=debug_logger), "rb") as f:
             audio_content = f.read()
 
         request = cloud_speech.RecognizeRequest(
@@ -1423,6 +3435,14 @@ def transcribe_with_speech_to_text(
 
     _log(f"STT response IN words={len(words)}", level="DEBUG")
 
+    if time_map is not None:
+        for word in words:
+            word["start_time"] = time_map(word["start_time"])
+            word["end_time"] = max(word["start_time"], time_map(word["end_time"]))
+        _remap_raw_word_offsets(raw_payload, time_map)
+    if vad_meta is not None:
+        raw_payload = {**raw_payload, "vad": vad_meta}
+
     # Group words into 1-second buckets for transcription panel sections.
     segments = _group_words_by_second(words)
     _log(f"STT response IN grouped_by_second_segments={len(segments)}", level="DEBUG")
@@ -1502,25 +3522,340 @@ def _prepare_spellcheck_text(text: str) -> str:
     return value
 
 
-def _check_spelling_item(item: dict) -> tuple[list[dict], str | None, dict | None]:
-    raw_text = item.get("text", "")
-    timestamp = item.get("start_time", 0)
-    detection_id = item.get("detection_id")
-    if not raw_text or not raw_text.strip():
-        return [], detection_id, None
+_spellcheck_memory_cache = _LruCache(SPELLCHECK_CACHE_MAX_ENTRIES)
+
+
+def _spellcheck_cache_key(text: str) -> str:
+    """Cache key for a prepared spellcheck text; includes the provider URL."""
+    return hashlib.sha256(f"{SPELLCHECK_API_URL}\n{text}".encode("utf-8")).hexdigest()
+
+
+def _cached_spellcheck_debug_entry(text: str, corrections: list[dict], cache_level: str) -> dict:
+    return {
+        "provider": "api_ninjas",
+        "request_text": text,
+        "status_code": 200,
+        "response_json": {"corrections": corrections},
+        "correction_count": len(corrections),
+        "cache": cache_level,
+    }
+
+
+def load_spellcheck_cache(supabase, keys: list[str]) -> dict[str, list[dict]]:
+    """Fetch persisted spellcheck corrections by cache key."""
+    found: dict[str, list[dict]] = {}
+    if supabase is None or not keys:
+        return found
+
+    chunk_size = 200
+    for offset in range(0, len(keys), chunk_size):
+        chunk = keys[offset:offset + chunk_size]
+        try:
+            response = (
+                supabase.table("spellcheck_cache")
+                .select("cache_key,corrections")
+                .in_("cache_key", chunk)
+                .execute()
+            )
+        except Exception as error:
+            print(f"WARNING: spellcheck cache lookup failed: {error}", flush=True)
+            return found
+
+        rows = response.data if hasattr(response, "data") else []
+        for row in rows if isinstance(rows, list) else []:
+            if not isinstance(row, dict):
+                continue
+            key = read_string(row.get("cache_key"))
+            corrections = row.get("corrections")
+            if key and isinstance(corrections, list):
+                found[key] = corrections
+    return found
+
+
+def save_spellcheck_cache(supabase, entries: dict[str, tuple[str, list[dict]]]):
+    """Upsert spellcheck corrections keyed by cache key: {key: (text, corrections)}."""
+    if supabase is None or not entries:
+        return
+
+    rows = [
+        {
+            "cache_key": key,
+            "provider": "api_ninjas",
+            "request_text": text,
+            "corrections": corrections,
+        }
+        for key, (text, corrections) in entries.items()
+    ]
+    try:
+        supabase.table("spellcheck_cache").upsert(rows, on_conflict="cache_key").execute()
+    except Exception as error:
+        print(f"WARNING: spellcheck cache save failed: {error}", flush=True)
+
+
+_CONTRACTION_SUFFIXES = {"s", "ve", "re", "ll", "d", "m", "t"}
+
+
+def _osa_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance (adjacent transposition = 1 edit), bounded.
+
+    Returns `max_distance + 1` once every cell of a row exceeds the bound.
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev_prev: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        curr = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, prev_prev[j - 2] + 1)
+            curr[j] = value
+        if min(curr) > max_distance:
+            return max_distance + 1
+        prev_prev, prev = prev, curr
+    return min(prev[-1], max_distance + 1)
+
+
+class LocalSpellChecker:
+    """Offline SymSpell-style spellchecker over a word-frequency dictionary.
+
+    Known-word checks are plain set lookups. Suggestions use the symmetric-delete
+    index: every dictionary word's prefix deletes (up to `max_edit_distance`) are
+    hashed with crc32 and packed as sorted `(hash << 32) | word_id` uint64 keys in
+    a file under /tmp, which is memory-mapped and binary-searched. The index is
+    built on the first suggestion lookup and reused across processes on the instance.
+    """
+
+    prefix_length = 7
+
+    def __init__(self, word_counts: dict[str, int], max_edit_distance: int = 2, source_id: str = ""):
+        self.word_counts = word_counts
+        self.words = list(word_counts)
+        self.max_edit_distance = max_edit_distance
+        self.source_id = source_id
+        self._index = None
+        self._index_lock = threading.Lock()
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str,
+        max_edit_distance: int = 2,
+        overrides_path: str | None = None,
+    ) -> "LocalSpellChecker":
+        """Load a "word count" dictionary, then apply `overrides_path` (same format, optional).
+
+        Override counts replace the dictionary's; lines starting with "#" are comments.
+        """
+        word_counts = cls._read_word_counts(path)
+        source_id = cls._file_source_id(path)
+        if overrides_path and os.path.isfile(overrides_path):
+            word_counts.update(cls._read_word_counts(overrides_path))
+            source_id = f"{source_id}+{cls._file_source_id(overrides_path)}"
+        return cls(word_counts, max_edit_distance=max_edit_distance, source_id=source_id)
+
+    @staticmethod
+    def _read_word_counts(path: str) -> dict[str, int]:
+        word_counts: dict[str, int] = {}
+        if os.path.getsize(path) == 0:
+            return word_counts
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for line in iter(mapped.readline, b""):
+                    parts = line.split()
+                    if len(parts) < 2 or parts[0].startswith(b"#"):
+                        continue
+                    try:
+                        count = int(parts[1])
+                    except ValueError:
+                        continue
+                    word = parts[0].decode("utf-8", errors="ignore").lower()
+                    if word and count > word_counts.get(word, 0):
+                        word_counts[word] = count
+        return word_counts
+
+    @staticmethod
+    def _file_source_id(path: str) -> str:
+        st = os.stat(path)
+        return f"{os.path.abspath(path)}:{st.st_size}:{int(st.st_mtime)}"
+
+    def is_known(self, token: str) -> bool:
+        word = token.strip("'").lower()
+        if not word or len(word) == 1 or any(ch.isdigit() for ch in word):
+            return True
+        if word in self.word_counts:
+            return True
+        if "'" in word:
+            parts = word.split("'")
+            base = parts[0]
+            base_known = base in self.word_counts or (base.endswith("n") and base[:-1] in self.word_counts)
+            return base_known and all(part in _CONTRACTION_SUFFIXES or part in self.word_counts for part in parts[1:])
+        return False
+
+    def suspicious_tokens(self, text: str) -> list[str]:
+        """Tokens of a prepared spellcheck text that are not dictionary words."""
+        return [token for token in text.split() if not self.is_known(token)]
+
+    def _deletes(self, word: str) -> set[str]:
+        results = {word}
+        frontier = {word}
+        for _ in range(self.max_edit_distance):
+            next_frontier = set()
+            for value in frontier:
+                if len(value) <= 1:
+                    continue
+                for i in range(len(value)):
+                    next_frontier.add(value[:i] + value[i + 1:])
+            next_frontier -= results
+            results |= next_frontier
+            frontier = next_frontier
+        return results
+
+    def _load_index(self) -> memoryview:
+        if self._index is not None:
+            return self._index
+        with self._index_lock:
+            if self._index is not None:
+                return self._index
+            digest = hashlib.sha256(
+                f"{self.source_id}:{self.max_edit_distance}:{self.prefix_length}:{len(self.words)}".encode("utf-8")
+            ).hexdigest()[:16]
+            index_path = os.path.join(SPELLCHECK_LOCAL_INDEX_DIR, f"symspell-{digest}.bin")
+            if not os.path.isfile(index_path):
+                keys = []
+                for word_id, word in enumerate(self.words):
+                    for deleted in self._deletes(word[:self.prefix_length]):
+                        keys.append((zlib.crc32(deleted.encode("utf-8")) << 32) | word_id)
+                keys.sort()
+                os.makedirs(SPELLCHECK_LOCAL_INDEX_DIR, exist_ok=True)
+                tmp_path = f"{index_path}.{uuid.uuid4().hex}.tmp"
+                with open(tmp_path, "wb") as f:
+                    array("Q", keys).tofile(f)
+                os.replace(tmp_path, index_path)
+            with open(index_path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._index = memoryview(mapped).cast("Q")
+            return self._index
+
+    def suggest(self, token: str) -> str | None:
+        """Best dictionary correction for a token: lowest distance, then highest frequency."""
+        word = token.strip("'").lower()
+        if not word or self.is_known(word):
+            return None
+
+        index = self._load_index()
+        best_word = None
+        best_key = None
+        seen: set[int] = set()
+        for deleted in self._deletes(word[:self.prefix_length]):
+            low = zlib.crc32(deleted.encode("utf-8")) << 32
+            position = bisect.bisect_left(index, low)
+            while position < len(index) and index[position] < low + (1 << 32):
+                word_id = index[position] & 0xFFFFFFFF
+                position += 1
+                if word_id in seen:
+                    continue
+                seen.add(word_id)
+                candidate = self.words[word_id]
+                if abs(len(candidate) - len(word)) > self.max_edit_distance:
+                    continue
+                distance = _osa_distance(word, candidate, self.max_edit_distance)
+                if distance > self.max_edit_distance:
+                    continue
+                key = (distance, -self.word_counts[candidate], candidate)
+                if best_key is None or key < best_key:
+                    best_key = key
+                    best_word = candidate
+
+        if best_word and token[:1].isupper():
+            best_word = best_word.upper() if token.isupper() and len(token) > 1 else best_word.capitalize()
+        return best_word
+
+    def corrections(self, text: str) -> list[dict]:
+        """Corrections for a prepared text, in the API Ninjas `corrections` shape."""
+        found: list[dict] = []
+        for token in self.suspicious_tokens(text):
+            suggestion = self.suggest(token)
+            if not suggestion:
+                continue
+            found.append({
+                "word": token,
+                "correction": suggestion,
+                "candidates": [suggestion],
+                "rule_id": "LOCAL_SPELLCHECK",
+            })
+        return found
+
+
+_local_spellchecker = None
+_local_spellchecker_lock = threading.Lock()
+_local_spellchecker_failed = False
+
+
+def get_local_spellchecker() -> LocalSpellChecker | None:
+    """Load the bundled dictionary once per instance; None when it is unavailable."""
+    global _local_spellchecker, _local_spellchecker_failed
+    if _local_spellchecker is not None or _local_spellchecker_failed:
+        return _local_spellchecker
+    with _local_spellchecker_lock:
+        if _local_spellchecker is None and not _local_spellchecker_failed:
+            try:
+                _local_spellchecker = LocalSpellChecker.from_file(
+                    SPELLCHECK_DICTIONARY_PATH,
+                    max_edit_distance=SPELLCHECK_LOCAL_MAX_EDIT_DISTANCE,
+                    overrides_path=SPELLCHECK_DICTIONARY_OVERRIDES_PATH,
+                )
+            except Exception as error:
+                _local_spellchecker_failed = True
+                print(f"WARNING: local spellcheck dictionary unavailable ({SPELLCHECK_DICTIONARY_PATH}): {error}", flush=True)
+    return _local_spellchecker
+
+
+def _local_spellcheck_debug_entry(text: str, corrections: list[dict], mode: str) -> dict:
+    return {
+        "provider": "local",
+        "request_text": text,
+        "status_code": 200,
+        "response_json": {"corrections": corrections},
+        "correction_count": len(corrections),
+        "local_mode": mode,
+    }
+
+
+def _fetch_spellcheck_corrections(text: str) -> tuple[list[dict] | None, dict]:
+    """Send one prepared text to API Ninjas.
+
+    Returns (corrections, debug_entry); corrections is None when the request failed.
+    Throttling is left to the adaptive limiter when SPELLCHECK_ADAPTIVE_CONCURRENCY is on.
+    """
+    response = http_get(
+        SPELLCHECK_API_URL,
+        retry_status=not SPELLCHECK_ADAPTIVE_CONCURRENCY,
+        headers={"X-Api-Key": SPELLCHECK_API_KEY},
+        params={"text": text},
+        timeout=30,
+    )
+    return _parse_spellcheck_response(text, response)
 
-    # Keep apostrophes so contractions don't become false positives (e.g. I've -> Ive).
-    text = _prepare_spellcheck_text(raw_text)
-    if not text:
-        return [], detection_id, None
 
-    response = requests.get(
+async def _fetch_spellcheck_corrections_async(text: str) -> tuple[list[dict] | None, dict]:
+    """Async variant of `_fetch_spellcheck_corrections` on the outbound engine."""
+    response = await get_async_engine().request(
+        "GET",
         SPELLCHECK_API_URL,
+        retry_status=not SPELLCHECK_ADAPTIVE_CONCURRENCY,
         headers={"X-Api-Key": SPELLCHECK_API_KEY},
         params={"text": text},
         timeout=30,
     )
+    return _parse_spellcheck_response(text, response)
 
+
+def _parse_spellcheck_response(text: str, response) -> tuple[list[dict] | None, dict]:
     response_payload: dict = {}
     if response.status_code == 200:
         parsed = response.json()
@@ -1544,7 +3879,348 @@ def _check_spelling_item(item: dict) -> tuple[list[dict], str | None, dict | Non
     }
 
     if response.status_code != 200:
-        return [], detection_id, debug_entry
+        return None, debug_entry
+    return corrections, debug_entry
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on in-flight spellcheck requests, shared by threads or coroutines.
+
+    Every healthy response (latency within target) grows the limit by 1/limit,
+    i.e. about one slot per round of requests. A 429/5xx, or latency above twice
+    the target, halves it at most once per target window.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, latency_target: float):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.peak_limit = self.limit
+        self.completed = 0
+        self.throttle_events = 0
+        self.decreases = 0
+        self._last_decrease_at = 0.0
+        self._cond = threading.Condition()
+        self._async_cond: asyncio.Condition | None = None
+
+    def _try_acquire(self) -> bool:
+        with self._cond:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def acquire(self, deadline: float | None = None) -> bool:
+        """Wait for a slot; returns False, without taking one, once `deadline` (epoch seconds) passes."""
+        with self._cond:
+            while True:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                if self.in_flight < int(self.limit):
+                    break
+                self._cond.wait(remaining)
+            self.in_flight += 1
+            return True
+
+    def release(self, status_code: int | None, latency: float):
+        with self._cond:
+            self.in_flight -= 1
+            self.completed += 1
+            throttled = status_code in HTTP_RETRY_STATUS_CODES
+            if throttled:
+                self.throttle_events += 1
+            now = time.monotonic()
+            if throttled or latency > 2 * self.latency_target:
+                if now - self._last_decrease_at >= self.latency_target:
+                    self.limit = max(float(self.minimum), self.limit / 2)
+                    self.decreases += 1
+                    self._last_decrease_at = now
+            elif latency <= self.latency_target:
+                self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+                self.peak_limit = max(self.peak_limit, self.limit)
+            self._cond.notify_all()
+
+    async def acquire_async(self):
+        if self._async_cond is None:
+            self._async_cond = asyncio.Condition()
+        async with self._async_cond:
+            await self._async_cond.wait_for(self._try_acquire)
+
+    async def release_async(self, status_code: int | None, latency: float):
+        self.release(status_code, latency)
+        if self._async_cond is not None:
+            async with self._async_cond:
+                self._async_cond.notify_all()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "concurrency_final": int(self.limit),
+                "concurrency_peak": int(self.peak_limit),
+                "throttle_events": self.throttle_events,
+                "concurrency_decreases": self.decreases,
+            }
+
+
+# Returned instead of a response when the stage budget ran out before sending.
+_SPELLCHECK_SKIPPED = (None, None)
+
+
+def _limited_fetch_spellcheck(
+    text: str,
+    limiter: AdaptiveConcurrencyLimiter | None,
+    deadline: float | None = None,
+):
+    """Send one spellcheck request under the limiter; `_SPELLCHECK_SKIPPED` once `deadline` passed.
+
+    Threads cannot be cancelled, so workers already running when the stage
+    budget runs out check the deadline here instead of sending requests whose
+    results would be discarded.
+    """
+    if deadline is not None and time.time() >= deadline:
+        return _SPELLCHECK_SKIPPED
+    if limiter is None:
+        return _fetch_spellcheck_corrections(text)
+    if not limiter.acquire(deadline):
+        return _SPELLCHECK_SKIPPED
+    started_at = time.time()
+    status_code = None
+    try:
+        result = _fetch_spellcheck_corrections(text)
+        status_code = (result[1] or {}).get("status_code")
+        return result
+    finally:
+        limiter.release(status_code, time.time() - started_at)
+
+
+async def _limited_fetch_spellcheck_async(text: str, limiter: AdaptiveConcurrencyLimiter | None):
+    if limiter is None:
+        return await _fetch_spellcheck_corrections_async(text)
+    await limiter.acquire_async()
+    started_at = time.time()
+    status_code = None
+    try:
+        result = await _fetch_spellcheck_corrections_async(text)
+        status_code = (result[1] or {}).get("status_code")
+        return result
+    finally:
+        await limiter.release_async(status_code, time.time() - started_at)
+
+
+def _pack_spellcheck_batches(texts: list[str], max_chars: int) -> list[list[str]]:
+    """Greedily pack texts into batches whose joined length stays within `max_chars`."""
+    batches: list[list[str]] = []
+    current: list[str] = []
+    current_len = 0
+    for text in texts:
+        added = len(text) + (len(SPELLCHECK_BATCH_SEPARATOR) if current else 0)
+        if current and current_len + added > max_chars:
+            batches.append(current)
+            current = []
+            current_len = 0
+            added = len(text)
+        current.append(text)
+        current_len += added
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _split_batch_corrections(
+    texts: list[str],
+    corrections: list[dict],
+) -> tuple[dict[str, list[dict]], set[str]]:
+    """Assign corrections from a joined batch back to the texts they came from.
+
+    Each segment's character span in the joined request is known, so every
+    occurrence of a corrected word maps to one segment. The k-th correction of a
+    word is matched to its k-th occurrence; when the counts differ the mapping is
+    ambiguous and every segment containing that word is returned for a per-item
+    retry.
+    """
+    offsets: list[int] = []
+    position = 0
+    for text in texts:
+        offsets.append(position)
+        position += len(text) + len(SPELLCHECK_BATCH_SEPARATOR)
+    joined = SPELLCHECK_BATCH_SEPARATOR.join(texts)
+
+    assigned: dict[str, list[dict]] = {text: [] for text in texts}
+    ambiguous: set[str] = set()
+    corrections_by_word: dict[str, list[dict]] = {}
+    for correction in corrections:
+        if not isinstance(correction, dict):
+            continue
+        word = read_string(correction.get("word"))
+        if word:
+            corrections_by_word.setdefault(word, []).append(correction)
+
+    for word, word_corrections in corrections_by_word.items():
+        pattern = re.compile(r"(?<![\w'])" + re.escape(word) + r"(?![\w'])")
+        segment_indices = [
+            bisect.bisect_right(offsets, match.start()) - 1
+            for match in pattern.finditer(joined)
+        ]
+        if len(segment_indices) != len(word_corrections):
+            if segment_indices:
+                ambiguous.update(texts[index] for index in segment_indices)
+            else:
+                # The provider reported a token we cannot place (e.g. the separator).
+                ambiguous.update(texts)
+            continue
+        for index, correction in zip(segment_indices, word_corrections):
+            assigned[texts[index]].append(correction)
+
+    for text in ambiguous:
+        assigned.pop(text, None)
+    return assigned, ambiguous
+
+
+def _assemble_batch_results(
+    texts: list[str],
+    corrections: list[dict],
+    batch_debug: dict,
+) -> tuple[dict[str, tuple[list[dict] | None, dict | None]], set[str]]:
+    joined = SPELLCHECK_BATCH_SEPARATOR.join(texts)
+    assigned, ambiguous = _split_batch_corrections(texts, corrections)
+    results: dict[str, tuple[list[dict] | None, dict | None]] = {}
+    for text, text_corrections in assigned.items():
+        results[text] = (text_corrections, {
+            "provider": "api_ninjas",
+            "request_text": text,
+            "status_code": batch_debug.get("status_code"),
+            "response_json": {"corrections": text_corrections},
+            "correction_count": len(text_corrections),
+            "batch_size": len(texts),
+            "batch_request_text": joined,
+        })
+    return results, ambiguous
+
+
+def _fetch_spellcheck_batch(
+    texts: list[str],
+    limiter: AdaptiveConcurrencyLimiter | None = None,
+    deadline: float | None = None,
+) -> tuple[dict[str, tuple[list[dict] | None, dict | None]], int]:
+    """Spellcheck several prepared texts in one request when they can be split back.
+
+    Returns ({text: (corrections, debug_entry)}, request_count). Texts left
+    unsent at `deadline` are omitted, so they count as unchecked.
+    """
+    if len(texts) == 1:
+        result = _limited_fetch_spellcheck(texts[0], limiter, deadline)
+        return ({}, 0) if result is _SPELLCHECK_SKIPPED else ({texts[0]: result}, 1)
+
+    batch_result = _limited_fetch_spellcheck(SPELLCHECK_BATCH_SEPARATOR.join(texts), limiter, deadline)
+    if batch_result is _SPELLCHECK_SKIPPED:
+        return {}, 0
+    corrections, batch_debug = batch_result
+    if corrections is None:
+        return {text: (None, batch_debug) for text in texts}, 1
+
+    results, ambiguous = _assemble_batch_results(texts, corrections, batch_debug)
+    request_count = 1
+    for text in texts:
+        if text in ambiguous:
+            result = _limited_fetch_spellcheck(text, limiter, deadline)
+            if result is _SPELLCHECK_SKIPPED:
+                results.pop(text, None)
+            else:
+                results[text] = result
+                request_count += 1
+    return results, request_count
+
+
+async def _fetch_spellcheck_batch_async(
+    texts: list[str],
+    limiter: AdaptiveConcurrencyLimiter | None = None,
+) -> tuple[dict[str, tuple[list[dict] | None, dict | None]], int]:
+    """Async variant of `_fetch_spellcheck_batch`; ambiguous retries run concurrently."""
+    if len(texts) == 1:
+        return {texts[0]: await _limited_fetch_spellcheck_async(texts[0], limiter)}, 1
+
+    corrections, batch_debug = await _limited_fetch_spellcheck_async(
+        SPELLCHECK_BATCH_SEPARATOR.join(texts),
+        limiter,
+    )
+    if corrections is None:
+        return {text: (None, batch_debug) for text in texts}, 1
+
+    results, ambiguous = _assemble_batch_results(texts, corrections, batch_debug)
+    retry_texts = [text for text in texts if text in ambiguous]
+    retried = await asyncio.gather(*(_limited_fetch_spellcheck_async(text, limiter) for text in retry_texts))
+    results.update(zip(retry_texts, retried))
+    return results, 1 + len(retry_texts)
+
+
+def _run_spellcheck_batches_threaded(
+    batches: list[list[str]],
+    worker_count: int,
+    time_budget_seconds: float | None,
+    on_result,
+    limiter: AdaptiveConcurrencyLimiter | None = None,
+) -> bool:
+    """Run batches on a thread pool; returns True when the time budget ran out.
+
+    Queued batches are cancelled at the budget; running ones stop before their
+    next request (see `_limited_fetch_spellcheck`).
+    """
+    deadline = None if time_budget_seconds is None else time.time() + time_budget_seconds
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=worker_count)
+    try:
+        future_to_batch = {
+            executor.submit(_fetch_spellcheck_batch, batch, limiter, deadline): batch
+            for batch in batches
+        }
+        try:
+            for future in concurrent.futures.as_completed(future_to_batch, timeout=time_budget_seconds):
+                batch = future_to_batch[future]
+                try:
+                    batch_results, batch_requests = future.result()
+                except Exception as error:
+                    print(f"Spellcheck worker error: {error}", flush=True)
+                    batch_results, batch_requests = {text: (None, None) for text in batch}, 0
+                on_result(batch_results, batch_requests)
+        except concurrent.futures.TimeoutError:
+            return True
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return deadline is not None and time.time() >= deadline
+
+
+def _run_spellcheck_batches_async(
+    batches: list[list[str]],
+    time_budget_seconds: float | None,
+    on_result,
+    limiter: AdaptiveConcurrencyLimiter | None = None,
+) -> bool:
+    """Run batches on the outbound event loop; returns True when the time budget ran out."""
+    async def _run_one(batch: list[str]):
+        try:
+            batch_results, batch_requests = await _fetch_spellcheck_batch_async(batch, limiter)
+        except Exception as error:
+            print(f"Spellcheck async error: {error}", flush=True)
+            batch_results, batch_requests = {text: (None, None) for text in batch}, 0
+        on_result(batch_results, batch_requests)
+
+    async def _run_all():
+        await asyncio.gather(*(_run_one(batch) for batch in batches))
+
+    try:
+        get_async_engine().run(_run_all(), timeout=time_budget_seconds)
+    except concurrent.futures.TimeoutError:
+        return True
+    return False
+
+
+def _build_spelling_errors(item: dict, corrections: list[dict]) -> list[dict]:
+    """Map provider corrections onto error rows for one subtitle item."""
+    raw_text = item.get("text", "")
+    timestamp = item.get("start_time", 0)
+    detection_id = item.get("detection_id")
 
     errors: list[dict] = []
     for correction in corrections:
@@ -1568,52 +4244,255 @@ def _check_spelling_item(item: dict) -> tuple[list[dict], str | None, dict | Non
             "context": raw_text,
             "timestamp": timestamp,
             "detection_id": detection_id,
-            "rule_id": "API_NINJAS_SPELLCHECK",
+            "rule_id": read_string(correction.get("rule_id")) or "API_NINJAS_SPELLCHECK",
             "source": "subtitle",
             "has_replacement": bool(original_norm and suggested_norm and suggested_norm != original_norm),
         })
 
-    return errors, detection_id, debug_entry
+    return errors
+
+
+def _check_spelling_item(item: dict) -> tuple[list[dict], str | None, dict | None]:
+    raw_text = item.get("text", "")
+    detection_id = item.get("detection_id")
+    if not raw_text or not raw_text.strip():
+        return [], detection_id, None
+
+    # Keep apostrophes so contractions don't become false positives (e.g. I've -> Ive).
+    text = _prepare_spellcheck_text(raw_text)
+    if not text:
+        return [], detection_id, None
+
+    corrections, debug_entry = _fetch_spellcheck_corrections(text)
+    if corrections is None:
+        return [], detection_id, debug_entry
+    return _build_spelling_errors(item, corrections), detection_id, debug_entry
 
 
 def check_spelling(
     texts: list[dict],
     debug_by_detection_id: dict[str, list[dict]] | None = None,
     max_workers: int | None = None,
+    time_budget_seconds: float | None = None,
+    stats: dict | None = None,
+    supabase=None,
 ) -> list[dict]:
-    """Check typos with API Ninjas Spellcheck (send whole subtitle sentence)."""
+    """Check typos with API Ninjas Spellcheck (send whole subtitle sentence).
+
+    Items are deduplicated by their prepared text, so a line repeated across the
+    video costs one request and its result fans out to every item. Uncached texts
+    are packed into batched requests of up to SPELLCHECK_BATCH_MAX_CHARS. Responses are
+    cached in-process and, when `supabase` is given and SPELLCHECK_CACHE_PERSISTENT
+    is on, in the `spellcheck_cache` table so later runs skip the API entirely.
+    When `time_budget_seconds` elapses, pending requests are cancelled and the
+    items that did not get a response are counted in `stats["unchecked"]`;
+    items whose request failed are counted in `stats["failed"]`. The indices of
+    both are listed in `stats["unverified_indices"]`.
+
+    With SPELLCHECK_ADAPTIVE_CONCURRENCY, in-flight requests follow an AIMD limit
+    (see `AdaptiveConcurrencyLimiter`) and texts answered with 429/5xx are retried
+    in later rounds (up to SPELLCHECK_THROTTLE_RETRIES) instead of being dropped.
+
+    The bundled local dictionary runs first: texts with no unknown tokens are
+    resolved without any request, and SPELLCHECK_PROVIDER=local answers every
+    text offline with SymSpell suggestions.
+    """
     errors: list[dict] = []
 
-    if not SPELLCHECK_API_KEY:
+    offline = SPELLCHECK_PROVIDER == "local"
+    if not offline and not SPELLCHECK_API_KEY:
         raise ValueError("SPELLCHECK_API_KEY is not configured")
 
-    if not texts:
-        return errors
+    items_by_text: dict[str, list[int]] = {}
+    for idx, item in enumerate(texts):
+        raw_text = item.get("text", "")
+        if not raw_text or not raw_text.strip():
+            continue
+        text = _prepare_spellcheck_text(raw_text)
+        if text:
+            items_by_text.setdefault(text, []).append(idx)
+
+    if stats is not None:
+        stats.update({
+            "total": len(texts),
+            "unique_texts": len(items_by_text),
+            "local_resolved": 0,
+            "memory_cache_hits": 0,
+            "persistent_cache_hits": 0,
+            "api_texts": 0,
+            "requests": 0,
+            "unchecked": 0,
+            "failed": 0,
+            "unverified_indices": [],
+            "budget_exhausted": False,
+            "throttle_events": 0,
+            "throttle_retries": 0,
+        })
+
+    results_by_text: dict[str, tuple[list[dict] | None, dict | None]] = {}
+    local_checker = get_local_spellchecker() if offline or SPELLCHECK_LOCAL_FILTER_ENABLED else None
+    if offline and local_checker is None:
+        raise ValueError("SPELLCHECK_PROVIDER=local but the spellcheck dictionary could not be loaded")
+    if local_checker is not None:
+        for text in items_by_text:
+            if offline:
+                corrections = local_checker.corrections(text)
+                results_by_text[text] = (corrections, _local_spellcheck_debug_entry(text, corrections, "offline"))
+            elif not local_checker.suspicious_tokens(text):
+                results_by_text[text] = ([], _local_spellcheck_debug_entry(text, [], "all_tokens_known"))
+    local_resolved = len(results_by_text)
+
+    key_by_text = {text: _spellcheck_cache_key(text) for text in items_by_text if text not in results_by_text}
+    for text, key in key_by_text.items():
+        cached = _spellcheck_memory_cache.get(key)
+        if cached is not None:
+            results_by_text[text] = (cached, _cached_spellcheck_debug_entry(text, cached, "memory"))
+    memory_hits = len(results_by_text) - local_resolved
+
+    persistent_hits = 0
+    use_persistent = supabase is not None and SPELLCHECK_CACHE_PERSISTENT
+    if use_persistent:
+        missing = [key_by_text[text] for text in items_by_text if text not in results_by_text]
+        persisted = load_spellcheck_cache(supabase, missing)
+        for text, key in key_by_text.items():
+            if text in results_by_text or key not in persisted:
+                continue
+            corrections = persisted[key]
+            _spellcheck_memory_cache.put(key, corrections)
+            results_by_text[text] = (corrections, _cached_spellcheck_debug_entry(text, corrections, "persistent"))
+            persistent_hits += 1
+
+    if stats is not None:
+        stats["local_resolved"] = local_resolved
+        stats["memory_cache_hits"] = memory_hits
+        stats["persistent_cache_hits"] = persistent_hits
 
+    pending_texts = [text for text in items_by_text if text not in results_by_text]
     worker_count = max_workers if isinstance(max_workers, int) and max_workers > 0 else SPELLCHECK_MAX_WORKERS
-    worker_count = max(1, min(worker_count, len(texts)))
+    limiter = None
+    if SPELLCHECK_ADAPTIVE_CONCURRENCY and not offline:
+        limiter = AdaptiveConcurrencyLimiter(
+            initial=worker_count,
+            minimum=1,
+            maximum=max(worker_count, SPELLCHECK_MAX_CONCURRENCY),
+            latency_target=SPELLCHECK_LATENCY_TARGET_SECONDS,
+        )
+        # The limiter gates requests; the pool only needs enough threads to reach its ceiling.
+        worker_count = limiter.maximum
+
+    fetched: dict[str, tuple[str, list[dict]]] = {}
+    request_count = 0
+    results_lock = threading.Lock()
+
+    def _on_batch_result(batch_results: dict, batch_requests: int):
+        nonlocal request_count
+        with results_lock:
+            request_count += batch_requests
+            for text, result in batch_results.items():
+                results_by_text[text] = result
+                corrections = result[0]
+                if corrections is not None:
+                    _spellcheck_memory_cache.put(key_by_text[text], corrections)
+                    fetched[key_by_text[text]] = (text, corrections)
 
-    future_to_idx: dict[concurrent.futures.Future, int] = {}
-    ordered_results: dict[int, tuple[list[dict], str | None, dict | None]] = {}
-    with concurrent.futures.ThreadPoolExecutor(max_workers=worker_count) as executor:
-        for idx, item in enumerate(texts):
-            future = executor.submit(_check_spelling_item, item)
-            future_to_idx[future] = idx
+    started_at = time.time()
+    deadline = started_at + time_budget_seconds if time_budget_seconds is not None else None
+    budget_exhausted = False
+    throttle_retries = 0
+    for attempt in range(SPELLCHECK_THROTTLE_RETRIES + 1 if limiter is not None else 1):
+        if not pending_texts:
+            break
+        if attempt > 0:
+            # Give the upstream a moment before re-sending throttled texts.
+            backoff = HTTP_RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1))
+            if deadline is not None and time.time() + backoff >= deadline:
+                budget_exhausted = True
+                break
+            time.sleep(backoff)
+            throttle_retries += len(pending_texts)
+        remaining = None if deadline is None else max(0.0, deadline - time.time())
+        if SPELLCHECK_BATCH_ENABLED:
+            batches = _pack_spellcheck_batches(pending_texts, SPELLCHECK_BATCH_MAX_CHARS)
+        else:
+            batches = [[text] for text in pending_texts]
+        if OUTBOUND_IO_MODE == "async":
+            budget_exhausted = _run_spellcheck_batches_async(batches, remaining, _on_batch_result, limiter)
+        else:
+            budget_exhausted = _run_spellcheck_batches_threaded(
+                batches,
+                max(1, min(worker_count, len(batches))),
+                remaining,
+                _on_batch_result,
+                limiter,
+            )
+        if budget_exhausted or limiter is None:
+            break
+        with results_lock:
+            pending_texts = [
+                text for text in pending_texts
+                if text in results_by_text
+                and results_by_text[text][0] is None
+                and (results_by_text[text][1] or {}).get("status_code") in HTTP_RETRY_STATUS_CODES
+            ]
+    elapsed = time.time() - started_at
 
-        for future in concurrent.futures.as_completed(future_to_idx):
-            idx = future_to_idx[future]
-            try:
-                ordered_results[idx] = future.result()
-            except Exception as error:
-                print(f"Spellcheck worker error: {error}", flush=True)
-                ordered_results[idx] = ([], None, None)
+    # Late results from cancelled work must not mutate the maps read below.
+    with results_lock:
+        final_results = dict(results_by_text)
+        final_fetched = dict(fetched)
+        final_request_count = request_count
+    if budget_exhausted:
+        print(
+            "Spellcheck time budget exhausted "
+            f"(budget={time_budget_seconds}s, done={len(final_results)}/{len(items_by_text)})",
+            flush=True,
+        )
+        if stats is not None:
+            stats["budget_exhausted"] = True
+
+    if use_persistent:
+        save_spellcheck_cache(supabase, final_fetched)
+
+    item_results: dict[int, tuple[list[dict], dict | None]] = {}
+    unchecked = 0
+    failed = 0
+    unverified_indices: list[int] = []
+    for text, indices in items_by_text.items():
+        if text not in final_results:
+            unchecked += len(indices)
+            unverified_indices.extend(indices)
+            continue
+        corrections, debug_entry = final_results[text]
+        if corrections is None:
+            # No usable response: report it rather than pass it as clean.
+            if (debug_entry or {}).get("status_code") in HTTP_RETRY_STATUS_CODES:
+                unchecked += len(indices)
+            else:
+                failed += len(indices)
+            unverified_indices.extend(indices)
+        for idx in indices:
+            item_errors = _build_spelling_errors(texts[idx], corrections) if corrections else []
+            item_results[idx] = (item_errors, debug_entry)
 
     for idx in range(len(texts)):
-        item_errors, detection_id, debug_entry = ordered_results.get(idx, ([], None, None))
+        item_errors, debug_entry = item_results.get(idx, ([], None))
+        detection_id = texts[idx].get("detection_id")
         if debug_by_detection_id is not None and detection_id and debug_entry:
             debug_by_detection_id.setdefault(detection_id, []).append(debug_entry)
         errors.extend(item_errors)
 
+    if stats is not None:
+        stats["api_texts"] = len(final_results) - local_resolved - memory_hits - persistent_hits
+        stats["requests"] = final_request_count
+        stats["unchecked"] = unchecked
+        stats["failed"] = failed
+        stats["unverified_indices"] = sorted(unverified_indices)
+        stats["throttle_retries"] = throttle_retries
+        stats["elapsed_seconds"] = round(elapsed, 3)
+        stats["throughput_rps"] = round(final_request_count / elapsed, 2) if elapsed > 0 else 0.0
+        if limiter is not None:
+            stats.update(limiter.snapshot())
+
     return errors
 
 
@@ -1674,12 +4553,14 @@ CONTAINMENT_WINDOW_SECONDS_BEFORE = 1.5
 CONTAINMENT_WINDOW_SECONDS_AFTER = 1.5
 
 
+_NUMBER_WORDS_RE = re.compile(r"\b(" + "|".join(re.escape(word) for word in _NUMBER_WORDS) + r")\b")
+
+
 def _normalize_text_for_sync(text: str) -> str:
     """Normalize text for subtitle-transcription sync checks."""
     value = (text or "").lower().strip()
     value = re.sub(r"[^\w\s]", " ", value)
-    for word, digit in _NUMBER_WORDS.items():
-        value = re.sub(r"\b" + re.escape(word) + r"\b", digit, value)
+    value = _NUMBER_WORDS_RE.sub(lambda match: _NUMBER_WORDS[match.group(1)], value)
     value = re.sub(r"\s+", " ", value).strip()
     return value
 
@@ -1814,9 +4695,23 @@ def _collect_word_windows_for_range(start: float, end: float, word_windows: list
     ]
 
 
-def _collect_word_windows_by_start_time(start: float, end: float, word_windows: list[dict]) -> list[dict]:
+def _word_window_start_times(word_windows: list[dict]) -> list[float]:
+    """Start-time index for start-sorted word windows (see `_collect_word_windows_by_start_time`)."""
+    return [window["start_time"] for window in word_windows]
+
+
+def _collect_word_windows_by_start_time(
+    start: float,
+    end: float,
+    word_windows: list[dict],
+    start_times: list[float] | None = None,
+) -> list[dict]:
     if end <= start:
         return []
+    if start_times is not None:
+        lo = bisect.bisect_left(start_times, start)
+        hi = bisect.bisect_left(start_times, end, lo)
+        return word_windows[lo:hi]
     return [
         window
         for window in word_windows
@@ -1842,47 +4737,103 @@ def _compute_word_overlap_ratio(sub_tokens: list[str], asr_tokens: list[str]) ->
     return len(common) / len(subtitle_words)
 
 
-def _levenshtein_distance(a: str, b: str) -> int:
+def _levenshtein_distance(a: str, b: str, max_distance: int | None = None) -> int:
+    """Edit distance using Myers' bit-parallel algorithm (Hyyrö formulation).
+
+    The shorter string is encoded as per-character bitmasks and each character
+    of the longer string advances one column in O(1) big-int operations, so the
+    cost is O(len(longer)) word operations instead of the O(|a|*|b|) DP. Python
+    ints are arbitrary width, so patterns longer than 64 chars use the same code
+    path as a multi-word blocked bit-vector would.
+
+    When `max_distance` is given, returns `max_distance + 1` as soon as the
+    distance is known to exceed it.
+    """
     if a == b:
         return 0
-    if not a:
-        return len(b)
-    if not b:
-        return len(a)
-
-    prev = list(range(len(b) + 1))
-    for i, ca in enumerate(a, start=1):
-        curr = [i]
-        for j, cb in enumerate(b, start=1):
-            insert_cost = curr[j - 1] + 1
-            delete_cost = prev[j] + 1
-            replace_cost = prev[j - 1] + (0 if ca == cb else 1)
-            curr.append(min(insert_cost, delete_cost, replace_cost))
-        prev = curr
-    return prev[-1]
+    if len(a) > len(b):
+        a, b = b, a
+    pattern_len = len(a)
+    text_len = len(b)
+    bounded = max_distance is not None and max_distance >= 0
+    if bounded and text_len - pattern_len > max_distance:
+        return max_distance + 1
+    if not pattern_len:
+        return text_len
+
+    peq: dict[str, int] = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+
+    mask = (1 << pattern_len) - 1
+    high_bit = 1 << (pattern_len - 1)
+    pv = mask
+    mv = 0
+    score = pattern_len
+    for j, ch in enumerate(b, start=1):
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & high_bit:
+            score += 1
+        elif mh & high_bit:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+        # Each remaining column can lower the score by at most one.
+        if bounded and score - (text_len - j) > max_distance:
+            return max_distance + 1
+    return score
 
 
 def _detect_subtitle_overlaps(subtitles: list[dict]) -> list[dict]:
+    """Find overlapping subtitle pairs with a sweep over start-sorted intervals.
+
+    Intervals still open at the current start time live in a min-heap keyed by
+    end time, so the cost is O(n log n + overlaps). Pairs are reported in the
+    same (i, j) order as the original pairwise scan.
+    """
+    intervals: list[tuple[float, float, int]] = []
+    for index, subtitle in enumerate(subtitles):
+        start = _to_float(subtitle.get("start_time"), 0.0)
+        end = _to_float(subtitle.get("end_time"), start)
+        if end <= start:
+            continue
+        intervals.append((start, end, index))
+    intervals.sort()
+
+    pairs: list[tuple[int, int]] = []
+    active_heap: list[tuple[float, int]] = []
+    active: set[int] = set()
+    for start, end, index in intervals:
+        while active_heap and active_heap[0][0] <= start:
+            _, ended_index = heapq.heappop(active_heap)
+            active.discard(ended_index)
+        for other_index in active:
+            pairs.append((other_index, index) if other_index < index else (index, other_index))
+        active.add(index)
+        heapq.heappush(active_heap, (end, index))
+    pairs.sort()
+
     overlaps: list[dict] = []
-    for i, first in enumerate(subtitles):
+    for i, j in pairs:
+        first = subtitles[i]
+        second = subtitles[j]
         a_start = _to_float(first.get("start_time"), 0.0)
         a_end = _to_float(first.get("end_time"), a_start)
-        if a_end <= a_start:
-            continue
-        for j in range(i + 1, len(subtitles)):
-            second = subtitles[j]
-            b_start = _to_float(second.get("start_time"), 0.0)
-            b_end = _to_float(second.get("end_time"), b_start)
-            if b_end <= b_start:
-                continue
-            overlap_start = max(a_start, b_start)
-            overlap_end = min(a_end, b_end)
-            if overlap_end > overlap_start:
-                overlaps.append({
-                    "subtitle_indices": [i, j],
-                    "overlapping_time_seconds": [round(overlap_start, 3), round(overlap_end, 3)],
-                    "texts": [first.get("text", ""), second.get("text", "")],
-                })
+        b_start = _to_float(second.get("start_time"), 0.0)
+        b_end = _to_float(second.get("end_time"), b_start)
+        overlap_start = max(a_start, b_start)
+        overlap_end = min(a_end, b_end)
+        overlaps.append({
+            "subtitle_indices": [i, j],
+            "overlapping_time_seconds": [round(overlap_start, 3), round(overlap_end, 3)],
+            "texts": [first.get("text", ""), second.get("text", "")],
+        })
     return overlaps
 
 
@@ -1959,6 +4910,7 @@ def build_sync_report_window_containment(
     window_before_seconds: float = CONTAINMENT_WINDOW_SECONDS_BEFORE,
     window_after_seconds: float = CONTAINMENT_WINDOW_SECONDS_AFTER,
     words_source: str = "raw_words",
+    word_windows: list[dict] | None = None,
 ) -> dict:
     duplicates = _detect_subtitle_overlaps(subtitles)
     duplicate_map: dict[int, list[int]] = {}
@@ -1967,7 +4919,9 @@ def build_sync_report_window_containment(
         duplicate_map.setdefault(first, []).append(second)
         duplicate_map.setdefault(second, []).append(first)
 
-    word_windows = _build_transcription_word_windows(transcriptions, transcription_words)
+    if word_windows is None:
+        word_windows = _build_transcription_word_windows(transcriptions, transcription_words)
+    word_start_times = _word_window_start_times(word_windows)
 
     details: list[dict] = []
     synced = 0
@@ -1987,7 +4941,12 @@ def build_sync_report_window_containment(
 
         window_start = max(0.0, subtitle_start - safe_before)
         window_end = subtitle_end + safe_after
-        window_rows = _collect_word_windows_by_start_time(window_start, window_end, word_windows)
+        window_rows = _collect_word_windows_by_start_time(
+            window_start,
+            window_end,
+            word_windows,
+            word_start_times,
+        )
 
         window_tokens = [str(row.get("token") or "") for row in window_rows if str(row.get("token") or "")]
         window_raw_tokens = [str(row.get("raw") or "") for row in window_rows if str(row.get("raw") or "")]
@@ -2233,7 +5192,7 @@ def detect_mismatches_fast_containment(
     transcription_words: list[dict] | None = None,
     window_before_seconds: float = CONTAINMENT_WINDOW_SECONDS_BEFORE,
     window_after_seconds: float = CONTAINMENT_WINDOW_SECONDS_AFTER,
-    max_subtitles: int = MISMATCH_MAX_SUBTITLES,
+    time_budget_seconds: float | None = MISMATCH_STAGE_BUDGET_SECONDS,
 ) -> tuple[list[dict], dict]:
     """Fast mismatch detection using subtitle containment in a time window.
 
@@ -2241,21 +5200,26 @@ def detect_mismatches_fast_containment(
     - No offset scanning
     - No edit distance
     - No overlap/duplicate checks
+    - Window lookups bisect a start-time index instead of scanning all words
+
+    Every subtitle is evaluated unless `time_budget_seconds` runs out first.
     """
     safe_before = max(0.0, float(window_before_seconds))
     safe_after = max(0.0, float(window_after_seconds))
-    safe_limit = max(1, int(max_subtitles))
+    started_at = time.time()
+    deadline = started_at + float(time_budget_seconds) if time_budget_seconds else None
 
     subtitles_total = len(subtitles)
-    subtitles_processed = min(subtitles_total, safe_limit)
-    cap_applied = subtitles_total > subtitles_processed
-
-    evaluated = subtitles[:subtitles_processed]
     word_windows = _build_transcription_word_windows(transcriptions, transcription_words)
+    word_start_times = _word_window_start_times(word_windows)
     words_source = "raw_words" if transcription_words else "segments_fallback"
 
     mismatches: list[dict] = []
-    for subtitle in evaluated:
+    subtitles_processed = 0
+    for subtitle in subtitles:
+        if deadline is not None and time.time() >= deadline:
+            break
+        subtitles_processed += 1
         subtitle_text = read_string(subtitle.get("text")) or ""
         subtitle_start = _to_float(subtitle.get("start_time"), 0.0)
         subtitle_end = _to_float(subtitle.get("end_time"), subtitle_start)
@@ -2266,7 +5230,12 @@ def detect_mismatches_fast_containment(
         window_start = max(0.0, subtitle_start - safe_before)
         window_end = subtitle_end + safe_after
 
-        window_rows = _collect_word_windows_by_start_time(window_start, window_end, word_windows)
+        window_rows = _collect_word_windows_by_start_time(
+            window_start,
+            window_end,
+            word_windows,
+            word_start_times,
+        )
         window_raw_tokens = [str(row.get("raw") or "") for row in window_rows if str(row.get("raw") or "")]
         window_text = " ".join(window_raw_tokens).strip()
         window_normalized = _normalize_text_for_sync(window_text)
@@ -2293,7 +5262,8 @@ def detect_mismatches_fast_containment(
     return mismatches, {
         "subtitles_total": subtitles_total,
         "subtitles_processed": subtitles_processed,
-        "cap_applied": cap_applied,
+        "budget_exhausted": subtitles_processed < subtitles_total,
+        "elapsed_seconds": time.time() - started_at,
         "words_source": words_source,
         "window_before_seconds": safe_before,
         "window_after_seconds": safe_after,
@@ -2346,12 +5316,13 @@ def detect_mismatches(
 
 
 # --- 8. Store Results in Supabase ---
-def store_text_detections(supabase, project_id: str, detections: list[dict]):
+def store_text_detections(supabase, project_id: str, detections: list[dict], run_id: str | None = None):
     rows = []
     for d in detections:
         rows.append({
             "id": str(uuid.uuid4()),
             "project_id": project_id,
+            "run_id": run_id,
             "text": d["text"],
             "start_time": d["start_time"],
             "end_time": d["end_time"],
@@ -2368,12 +5339,13 @@ def store_text_detections(supabase, project_id: str, detections: list[dict]):
         supabase.table("text_detections").insert(rows).execute()
 
 
-def store_transcriptions(supabase, project_id: str, segments: list[dict]):
+def store_transcriptions(supabase, project_id: str, segments: list[dict], run_id: str | None = None):
     rows = []
     for s in segments:
         rows.append({
             "id": str(uuid.uuid4()),
             "project_id": project_id,
+            "run_id": run_id,
             "text": s["text"],
             "start_time": s["start_time"],
             "end_time": s["end_time"],
@@ -2384,7 +5356,7 @@ def store_transcriptions(supabase, project_id: str, segments: list[dict]):
         supabase.table("transcriptions").insert(rows).execute()
 
 
-def store_spelling_errors(supabase, project_id: str, errors: list[dict]):
+def store_spelling_errors(supabase, project_id: str, errors: list[dict], run_id: str | None = None):
     rows = []
     for e in errors:
         # Defensive gate: do not persist non-actionable punctuation/case-only matches.
@@ -2393,47 +5365,51 @@ def store_spelling_errors(supabase, project_id: str, errors: list[dict]):
         rows.append({
             "id": str(uuid.uuid4()),
             "project_id": project_id,
+            "run_id": run_id,
             "source": e["source"],
             "original_text": e["original_text"],
             "suggested_text": e["suggested_text"],
             "context": e.get("context"),
             "timestamp": e["timestamp"],
             "rule_id": e.get("rule_id"),
-            "is_false_positive": False,
+            "is_false_positive": bool(e.get("is_false_positive", False)),
         })
     if rows:
         supabase.table("spelling_errors").insert(rows).execute()
 
 
-def store_mismatches(supabase, project_id: str, mismatches: list[dict]):
+def store_mismatches(supabase, project_id: str, mismatches: list[dict], run_id: str | None = None):
     rows = []
     for m in mismatches:
         rows.append({
             "id": str(uuid.uuid4()),
             "project_id": project_id,
+            "run_id": run_id,
             "subtitle_text": m["subtitle_text"],
             "transcription_text": m["transcription_text"],
             "start_time": m["start_time"],
             "end_time": m["end_time"],
             "severity": m["severity"],
             "mismatch_type": m.get("mismatch_type"),
-            "is_dismissed": False,
+            "is_dismissed": bool(m.get("is_dismissed", False)),
         })
     if rows:
         supabase.table("mismatches").insert(rows).execute()
 
 
-def save_ocr_raw_to_storage(project_id: str, video_url: str | None, raw_payload: dict) -> dict | None:
-    """Persist raw OCR payload to Supabase Storage as latest.json."""
-    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-        print("Skipping OCR raw save: Supabase env missing", flush=True)
-        return None
-
+def _prepare_raw_upload(
+    bucket: str,
+    source: str,
+    project_id: str,
+    video_url: str | None,
+    raw_payload: dict,
+) -> tuple[str, dict, bytes, dict]:
+    """Build (upload_url, headers, body, meta) for a raw payload latest.json object."""
     generated_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    object_path = f"projects/{project_id}/ocr-raw/latest.json"
+    object_path = f"projects/{project_id}/{bucket}/latest.json"
     raw_document = {
         "version": 1,
-        "source": "google_video_intelligence",
+        "source": source,
         "project_id": project_id,
         "generated_at": generated_at,
         "video_url": video_url,
@@ -2441,76 +5417,219 @@ def save_ocr_raw_to_storage(project_id: str, video_url: str | None, raw_payload:
     }
 
     body = json.dumps(raw_document, ensure_ascii=False).encode("utf-8")
-    upload_url = f"{SUPABASE_URL}/storage/v1/object/ocr-raw/{object_path}"
-    response = requests.post(
-        upload_url,
-        headers={
-            "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
-            "apikey": SUPABASE_SERVICE_KEY,
-            "x-upsert": "true",
-            "Content-Type": "application/json",
-        },
-        data=body,
-        timeout=60,
-    )
+    upload_url = f"{SUPABASE_URL}/storage/v1/object/{bucket}/{object_path}"
+    headers = {
+        "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
+        "apikey": SUPABASE_SERVICE_KEY,
+        "x-upsert": "true",
+        "Content-Type": "application/json",
+    }
+    meta = {
+        "storage_path": object_path,
+        "generated_at": generated_at,
+        "size_bytes": len(body),
+    }
+    return upload_url, headers, body, meta
+
 
+def _finish_raw_upload(response, label: str, meta: dict) -> dict | None:
     if response.status_code >= 400:
         print(
-            f"Failed to upload OCR raw payload (status={response.status_code} body={response.text[:300]})",
+            f"Failed to upload {label} raw payload (status={response.status_code} body={response.text[:300]})",
             flush=True,
         )
         return None
-
-    return {
-        "storage_path": object_path,
-        "generated_at": generated_at,
-        "size_bytes": len(body),
-    }
+    return meta
 
 
-def save_transcription_raw_to_storage(project_id: str, video_url: str | None, raw_payload: dict) -> dict | None:
-    """Persist raw transcription payload to Supabase Storage as latest.json."""
+def save_ocr_raw_to_storage(project_id: str, video_url: str | None, raw_payload: dict) -> dict | None:
+    """Persist raw OCR payload to Supabase Storage as latest.json."""
     if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-        print("Skipping transcription raw save: Supabase env missing", flush=True)
+        print("Skipping OCR raw save: Supabase env missing", flush=True)
         return None
 
-    generated_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    object_path = f"projects/{project_id}/transcription-raw/latest.json"
-    raw_document = {
-        "version": 1,
-        "source": "google_speech_to_text_v2",
-        "project_id": project_id,
-        "generated_at": generated_at,
-        "video_url": video_url,
-        "raw_response": raw_payload,
-    }
+    upload_url, headers, body, meta = _prepare_raw_upload(
+        "ocr-raw", "google_video_intelligence", project_id, video_url, raw_payload,
+    )
+    response = http_post(upload_url, headers=headers, data=body, timeout=60)
+    return _finish_raw_upload(response, "OCR", meta)
 
-    body = json.dumps(raw_document, ensure_ascii=False).encode("utf-8")
+
+async def save_ocr_raw_to_storage_async(project_id: str, video_url: str | None, raw_payload: dict) -> dict | None:
+    """Async variant of `save_ocr_raw_to_storage` on the outbound engine."""
+    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        print("Skipping OCR raw save: Supabase env missing", flush=True)
+        return None
+
+    upload_url, headers, body, meta = _prepare_raw_upload(
+        "ocr-raw", "google_video_intelligence", project_id, video_url, raw_payload,
+    )
+    response = await get_async_engine().request("POST", upload_url, headers=headers, content=body, timeout=60)
+    return _finish_raw_upload(response, "OCR", meta)
+
+
+# Word index: the sync report's token windows, precomputed from the raw STT
+# words and stored next to latest.json so classify runs skip the raw payload.
+# Layout (zlib-compressed): magic, u32 header length, JSON header, float64
+# start times, float64 end times, newline-joined tokens, newline-joined raw
+# tokens (omitted when identical to the tokens). The header carries the
+# fingerprint of the tokenizer that produced it; an index built by different
+# normalization code is treated as missing so classify rebuilds from raw words.
+WORD_INDEX_MAGIC = b"VQWI"
+WORD_INDEX_VERSION = 1
+
+
+def word_index_normalizer_version() -> str:
+    return behaviour_fingerprint("_build_transcription_word_windows")[:16]
+
+
+def encode_word_index(word_windows: list[dict]) -> bytes:
+    tokens = [window["token"] for window in word_windows]
+    raws = [window.get("raw", window["token"]) for window in word_windows]
+    raw_same = raws == tokens
+    starts = array("d", (float(window["start_time"]) for window in word_windows))
+    ends = array("d", (float(window["end_time"]) for window in word_windows))
+    if sys.byteorder != "little":
+        starts.byteswap()
+        ends.byteswap()
+    token_blob = "\n".join(tokens).encode("utf-8")
+    raw_blob = b"" if raw_same else "\n".join(raws).encode("utf-8")
+    header = json.dumps({
+        "version": WORD_INDEX_VERSION,
+        "normalizer": word_index_normalizer_version(),
+        "count": len(tokens),
+        "raw_same": raw_same,
+        "token_bytes": len(token_blob),
+        "raw_bytes": len(raw_blob),
+    }).encode("utf-8")
+    return zlib.compress(
+        WORD_INDEX_MAGIC + len(header).to_bytes(4, "little") + header
+        + starts.tobytes() + ends.tobytes() + token_blob + raw_blob,
+        6,
+    )
+
+
+def decode_word_index(data: bytes) -> list[dict]:
+    """Rebuild the word windows written by `encode_word_index`."""
+    body = zlib.decompress(data)
+    if body[:4] != WORD_INDEX_MAGIC:
+        raise ValueError("Not a word index")
+    header_length = int.from_bytes(body[4:8], "little")
+    header = json.loads(body[8:8 + header_length])
+    if header.get("version") != WORD_INDEX_VERSION:
+        raise ValueError(f"Unsupported word index version {header.get('version')}")
+    if header.get("normalizer") != word_index_normalizer_version():
+        raise ValueError("Word index was built by a different normalizer")
+    count = int(header["count"])
+    offset = 8 + header_length
+    starts = array("d")
+    starts.frombytes(body[offset:offset + count * 8])
+    offset += count * 8
+    ends = array("d")
+    ends.frombytes(body[offset:offset + count * 8])
+    offset += count * 8
+    if sys.byteorder != "little":
+        starts.byteswap()
+        ends.byteswap()
+    token_blob = body[offset:offset + header["token_bytes"]]
+    offset += header["token_bytes"]
+    tokens = token_blob.decode("utf-8").split("\n") if count else []
+    if header.get("raw_same", True):
+        raws = tokens
+    else:
+        raws = body[offset:offset + header["raw_bytes"]].decode("utf-8").split("\n")
+    if len(tokens) != count or len(raws) != count:
+        raise ValueError("Corrupt word index")
+    return [
+        {"token": tokens[i], "raw": raws[i], "start_time": starts[i], "end_time": ends[i]}
+        for i in range(count)
+    ]
+
+
+def _prepare_word_index_upload(project_id: str, word_windows: list[dict]) -> tuple[str, dict, bytes, str]:
+    object_path = f"projects/{project_id}/transcription-raw/word_index.bin"
     upload_url = f"{SUPABASE_URL}/storage/v1/object/transcription-raw/{object_path}"
-    response = requests.post(
-        upload_url,
-        headers={
-            "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
-            "apikey": SUPABASE_SERVICE_KEY,
-            "x-upsert": "true",
-            "Content-Type": "application/json",
-        },
-        data=body,
-        timeout=60,
+    headers = {
+        "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
+        "apikey": SUPABASE_SERVICE_KEY,
+        "x-upsert": "true",
+        "Content-Type": "application/octet-stream",
+    }
+    return upload_url, headers, encode_word_index(word_windows), object_path
+
+
+def _finish_word_index_upload(response, meta: dict | None, object_path: str) -> dict | None:
+    if meta is None:
+        return None
+    if response is not None and response.status_code < 400:
+        meta["word_index_path"] = object_path
+    else:
+        if response is not None:
+            print(
+                f"Failed to upload transcription word index (status={response.status_code} body={response.text[:300]})",
+                flush=True,
+            )
+        meta["word_index_path"] = None
+    return meta
+
+
+def save_transcription_raw_to_storage(
+    project_id: str,
+    video_url: str | None,
+    raw_payload: dict,
+    word_windows: list[dict] | None = None,
+) -> dict | None:
+    """Persist raw transcription payload to Supabase Storage as latest.json.
+
+    With `word_windows`, the compact word index is uploaded next to it.
+    """
+    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        print("Skipping transcription raw save: Supabase env missing", flush=True)
+        return None
+
+    upload_url, headers, body, meta = _prepare_raw_upload(
+        "transcription-raw", "google_speech_to_text_v2", project_id, video_url, raw_payload,
     )
+    response = http_post(upload_url, headers=headers, data=body, timeout=60)
+    meta = _finish_raw_upload(response, "transcription", meta)
+    if meta is None or not word_windows:
+        return meta
+    index_url, index_headers, index_body, index_path = _prepare_word_index_upload(project_id, word_windows)
+    try:
+        index_response = http_post(index_url, headers=index_headers, data=index_body, timeout=60)
+    except Exception as index_error:
+        print(f"Failed to upload transcription word index: {index_error}", flush=True)
+        index_response = None
+    return _finish_word_index_upload(index_response, meta, index_path)
 
-    if response.status_code >= 400:
-        print(
-            f"Failed to upload transcription raw payload (status={response.status_code} body={response.text[:300]})",
-            flush=True,
-        )
+
+async def save_transcription_raw_to_storage_async(
+    project_id: str,
+    video_url: str | None,
+    raw_payload: dict,
+    word_windows: list[dict] | None = None,
+) -> dict | None:
+    """Async variant of `save_transcription_raw_to_storage` on the outbound engine."""
+    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        print("Skipping transcription raw save: Supabase env missing", flush=True)
         return None
 
-    return {
-        "storage_path": object_path,
-        "generated_at": generated_at,
-        "size_bytes": len(body),
-    }
+    upload_url, headers, body, meta = _prepare_raw_upload(
+        "transcription-raw", "google_speech_to_text_v2", project_id, video_url, raw_payload,
+    )
+    response = await get_async_engine().request("POST", upload_url, headers=headers, content=body, timeout=60)
+    meta = _finish_raw_upload(response, "transcription", meta)
+    if meta is None or not word_windows:
+        return meta
+    index_url, index_headers, index_body, index_path = _prepare_word_index_upload(project_id, word_windows)
+    try:
+        index_response = await get_async_engine().request(
+            "POST", index_url, headers=index_headers, content=index_body, timeout=60,
+        )
+    except Exception as index_error:
+        print(f"Failed to upload transcription word index: {index_error}", flush=True)
+        index_response = None
+    return _finish_word_index_upload(index_response, meta, index_path)
 
 
 def update_project_ocr_raw_metadata(supabase, project_id: str, raw_meta: dict):
@@ -2530,9 +5649,39 @@ def update_project_transcription_raw_metadata(supabase, project_id: str, raw_met
         "transcription_raw_storage_path": raw_meta["storage_path"],
         "transcription_raw_generated_at": raw_meta["generated_at"],
         "transcription_raw_size_bytes": raw_meta["size_bytes"],
+        "transcription_word_index_path": raw_meta.get("word_index_path"),
     }).eq("id", project_id).execute()
 
 
+def load_transcription_word_index(project_id: str, storage_path: str) -> list[dict]:
+    """Load the precomputed word windows for the sync report ([] if unavailable)."""
+    if not project_id or not storage_path:
+        return []
+    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        return []
+
+    download_url = f"{SUPABASE_URL}/storage/v1/object/transcription-raw/{storage_path}"
+    try:
+        response = http_get(
+            download_url,
+            headers={
+                "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
+                "apikey": SUPABASE_SERVICE_KEY,
+            },
+            timeout=30,
+        )
+        if response.status_code >= 400:
+            print(
+                f"WARNING: word index download failed (project_id={project_id}, status={response.status_code})",
+                flush=True,
+            )
+            return []
+        return decode_word_index(response.content)
+    except Exception as error:
+        print(f"WARNING: word index unavailable (project_id={project_id}): {error}", flush=True)
+        return []
+
+
 def load_transcription_raw_words(project_id: str, storage_path: str) -> list[dict]:
     """Load raw STT payload from Storage and extract word-level timings."""
     if not project_id or not storage_path:
@@ -2542,7 +5691,7 @@ def load_transcription_raw_words(project_id: str, storage_path: str) -> list[dic
 
     download_url = f"{SUPABASE_URL}/storage/v1/object/transcription-raw/{storage_path}"
     try:
-        response = requests.get(
+        response = http_get(
             download_url,
             headers={
                 "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
@@ -2752,434 +5901,1817 @@ def build_testing_audit_rows(
     return rows
 
 
-# --- Main Cloud Function Entry Point ---
-@functions_framework.http
-def analyze_video(request):
-    """HTTP Cloud Function: orchestrates the full video analysis pipeline."""
-    t0 = time.time()
-    print("=" * 60, flush=True)
-    print("analyze_video STARTED", flush=True)
+# --- 9. Incremental Re-analysis ---
+def _select_project_rows(supabase, table_name: str, columns: str, project_id: str, run_id: str | None) -> list[dict]:
+    query = supabase.table(table_name).select(columns).eq("project_id", project_id)
+    response = scope_to_run(query, run_id).execute()
+    rows = response.data if hasattr(response, "data") else []
+    return [row for row in rows if isinstance(row, dict)] if isinstance(rows, list) else []
 
-    # IAM auth on the Cloud Run service is the primary gatekeeper.
-    if CLOUD_FUNCTION_SECRET:
-        secret_header = request.headers.get("X-Function-Secret", "")
-        if secret_header != CLOUD_FUNCTION_SECRET:
-            print("WARNING: X-Function-Secret mismatch; relying on IAM auth", flush=True)
 
-    data = request.get_json(silent=True)
-    if not data:
-        return {"error": "Missing request body"}, 400
+def _coverage_line_key(text: str, start_time) -> str:
+    return f"{_to_float(start_time, 0.0):.3f}|{text}"
 
-    mode = data.get("mode", "analyze")
-    project_id = data.get("project_id")
-    video_url = data.get("video_url")
-    frame_io_url = data.get("frame_io_url")
-    raw_ocr_payload = data.get("raw_ocr_payload")
 
-    print(f"project_id: {project_id}", flush=True)
-    print(f"mode: {mode}", flush=True)
-    print(f"video_url:  {(video_url or '')[:120]}", flush=True)
-    print(f"frame_io_url: {frame_io_url}", flush=True)
+def build_run_coverage(
+    run_id: str,
+    spellcheck_unverified: list[dict],
+    mismatch_unverified: list[dict],
+) -> dict:
+    """Describe which subtitle lines a run left unchecked (budget, throttling, failed requests).
 
-    if mode not in ("analyze", "classify_ocr_payload"):
-        return {"error": f"Unsupported mode: {mode}"}, 400
+    Lines missing from both lists were either checked by the run or carried from
+    a run that checked them, so their rows can be carried forward again.
+    """
+    return {
+        "version": 1,
+        "run_id": run_id,
+        "spellcheck_unchecked": sorted({
+            _coverage_line_key(line.get("text", ""), line.get("start_time")) for line in spellcheck_unverified
+        }),
+        "mismatch_unchecked": sorted({
+            _coverage_line_key(line.get("text", ""), line.get("start_time")) for line in mismatch_unverified
+        }),
+    }
 
-    if mode == "analyze" and not project_id:
-        return {"error": "Missing project_id"}, 400
-    if mode == "classify_ocr_payload" and not isinstance(raw_ocr_payload, dict):
-        return {"error": "Missing or invalid raw_ocr_payload", "error_code": "invalid_payload"}, 400
 
-    supabase = get_supabase()
-    debug_lines: list[str] = []
+def load_run_coverage(supabase, project_id: str, run_id: str | None) -> dict | None:
+    """Coverage recorded when `run_id` was activated; None when unknown (legacy run or mismatch)."""
+    if not run_id:
+        return None
+    response = supabase.table("projects").select("active_run_coverage").eq("id", project_id).limit(1).execute()
+    rows = response.data if hasattr(response, "data") else []
+    row = rows[0] if isinstance(rows, list) and rows and isinstance(rows[0], dict) else {}
+    coverage = row.get("active_run_coverage")
+    if not isinstance(coverage, dict) or coverage.get("run_id") != run_id:
+        return None
+    return coverage
+
+
+def load_previous_analysis(supabase, project_id: str, run_id: str | None) -> dict | None:
+    """Load the rows of the project's active run, or None when there is nothing to diff against."""
+    detections = _select_project_rows(
+        supabase,
+        "text_detections",
+        "text,start_time,end_time,bbox_top,bbox_left,bbox_bottom,bbox_right,"
+        "confidence,is_subtitle,is_fixed_text,is_partial_sequence",
+        project_id,
+        run_id,
+    )
+    if not detections:
+        return None
+    return {
+        "detections": [
+            {
+                "text": row.get("text") or "",
+                "start_time": _to_float(row.get("start_time"), 0.0),
+                "end_time": _to_float(row.get("end_time"), 0.0),
+                "bbox": {
+                    "top": row.get("bbox_top"),
+                    "left": row.get("bbox_left"),
+                    "bottom": row.get("bbox_bottom"),
+                    "right": row.get("bbox_right"),
+                },
+                "confidence": row.get("confidence"),
+                "is_subtitle": bool(row.get("is_subtitle")),
+                "is_fixed_text": bool(row.get("is_fixed_text")),
+                "is_partial_sequence": bool(row.get("is_partial_sequence")),
+            }
+            for row in detections
+        ],
+        "coverage": load_run_coverage(supabase, project_id, run_id),
+        "transcriptions": _select_project_rows(
+            supabase, "transcriptions", "text,start_time,end_time", project_id, run_id,
+        ),
+        "spelling_errors": _select_project_rows(
+            supabase,
+            "spelling_errors",
+            "source,original_text,suggested_text,context,timestamp,rule_id,is_false_positive",
+            project_id,
+            run_id,
+        ),
+        "mismatches": _select_project_rows(
+            supabase,
+            "mismatches",
+            "subtitle_text,transcription_text,start_time,end_time,severity,mismatch_type,is_dismissed",
+            project_id,
+            run_id,
+        ),
+    }
 
-    def make_step_logger(status: str, progress: int):
-        def _logger(message: str, level: str = "DEBUG"):
-            if not project_id:
-                print(message, flush=True)
-                return
-            append_debug_log_line(
-                supabase=supabase,
-                project_id=project_id,
-                debug_lines=debug_lines,
-                level=level,
-                status=status,
-                progress=progress,
-                message=message,
-            )
 
-        return _logger
+def diff_subtitles_against_previous(
+    subtitles: list[dict],
+    previous_subtitles: list[dict],
+    tolerance_seconds: float = INCREMENTAL_MATCH_TOLERANCE_SECONDS,
+) -> tuple[dict[int, dict], list[int]]:
+    """Pair each subtitle with an unchanged line of the previous run.
+
+    Lines match when their normalized text is equal and both start and end moved
+    by at most `tolerance_seconds`; each previous line is used once, nearest first.
+    Returns ({subtitle_index: previous_subtitle}, [indices of added/changed lines]).
+    """
+    previous_by_text: dict[str, list[int]] = {}
+    for previous_index, previous in enumerate(previous_subtitles):
+        key = _normalize_text_for_sync(previous.get("text", ""))
+        previous_by_text.setdefault(key, []).append(previous_index)
 
-    try:
-        if mode == "classify_ocr_payload":
-            source_payload = raw_ocr_payload.get("raw_response") if isinstance(raw_ocr_payload.get("raw_response"), dict) else raw_ocr_payload
-            raw_detections = extract_detections_from_raw_payload(source_payload)
-            merged = merge_partial_sequences(raw_detections)
-            inferred_duration = max((d.get("end_time", 0) for d in merged), default=0.0)
-            classified = classify_subtitle_vs_fixed(merged, inferred_duration, debug_scores=True)
-            classified = classify_semantic_tags(classified)
-            classified = sorted(
-                classified,
-                key=lambda d: (
-                    d.get("start_time", 0),
-                    d.get("end_time", 0),
-                    (d.get("text") or "").lower(),
-                ),
+    candidates: list[tuple[float, int, int]] = []
+    for index, subtitle in enumerate(subtitles):
+        key = _normalize_text_for_sync(subtitle.get("text", ""))
+        start = _to_float(subtitle.get("start_time"), 0.0)
+        end = _to_float(subtitle.get("end_time"), start)
+        for previous_index in previous_by_text.get(key, []):
+            previous = previous_subtitles[previous_index]
+            drift = max(
+                abs(start - _to_float(previous.get("start_time"), 0.0)),
+                abs(end - _to_float(previous.get("end_time"), 0.0)),
             )
+            if drift <= tolerance_seconds:
+                candidates.append((drift, index, previous_index))
 
-            for index, det in enumerate(classified):
-                det["detection_id"] = f"det_{index:04d}"
+    matched: dict[int, dict] = {}
+    used: set[int] = set()
+    for _, index, previous_index in sorted(candidates):
+        if index in matched or previous_index in used:
+            continue
+        matched[index] = previous_subtitles[previous_index]
+        used.add(previous_index)
+    changed = [index for index in range(len(subtitles)) if index not in matched]
+    return matched, changed
 
-            filtered_subtitles = build_filtered_subtitles(classified)
-            filtered_subtitle_ids = {d.get("detection_id") for d in filtered_subtitles if d.get("detection_id")}
-            transcriptions_for_sync: list[dict] = []
-            transcription_words_for_sync: list[dict] = []
-            words_source = "segments_fallback"
-            if project_id:
-                try:
-                    transcriptions_resp = (
-                        supabase.table("transcriptions")
-                        .select("text,start_time,end_time,speaker,confidence")
-                        .eq("project_id", project_id)
-                        .order("start_time", desc=False)
-                        .execute()
-                    )
-                    transcriptions_data = transcriptions_resp.data if hasattr(transcriptions_resp, "data") else []
-                    if isinstance(transcriptions_data, list):
-                        transcriptions_for_sync = transcriptions_data
-                except Exception as transcriptions_error:
-                    print(
-                        f"WARNING: could not load transcriptions for sync report (project_id={project_id}): {transcriptions_error}",
-                        flush=True,
-                    )
-                try:
-                    project_meta_resp = (
-                        supabase.table("projects")
-                        .select("transcription_raw_storage_path")
-                        .eq("id", project_id)
-                        .limit(1)
-                        .execute()
-                    )
-                    project_rows = project_meta_resp.data if hasattr(project_meta_resp, "data") else []
-                    storage_path = None
-                    if isinstance(project_rows, list) and project_rows:
-                        first_row = project_rows[0]
-                        if isinstance(first_row, dict):
-                            storage_path = read_string(first_row.get("transcription_raw_storage_path"))
-                    if storage_path:
-                        transcription_words_for_sync = load_transcription_raw_words(project_id, storage_path)
-                        if transcription_words_for_sync:
-                            words_source = "raw_words"
-                except Exception as transcription_raw_error:
-                    print(
-                        (
-                            "WARNING: could not load transcription raw words for sync report "
-                            f"(project_id={project_id}): {transcription_raw_error}"
-                        ),
-                        flush=True,
-                    )
-            sync_report = build_sync_report_window_containment(
-                subtitles=filtered_subtitles,
-                transcriptions=transcriptions_for_sync,
-                transcription_words=transcription_words_for_sync if transcription_words_for_sync else None,
-                window_before_seconds=CONTAINMENT_WINDOW_SECONDS_BEFORE,
-                window_after_seconds=CONTAINMENT_WINDOW_SECONDS_AFTER,
-                words_source=words_source,
-            )
 
-            spelling_input = [
-                {
-                    "detection_id": d["detection_id"],
-                    "text": d["text"],
-                    "start_time": d["start_time"],
-                }
-                for d in filtered_subtitles
-            ]
-            spellcheck_checked_ids = {d["detection_id"] for d in spelling_input}
-            spelling_debug_by_detection_id: dict[str, list[dict]] = {}
-            raw_spelling_errors = check_spelling(spelling_input, spelling_debug_by_detection_id)
-            filtered_spelling_errors = filter_false_positives(raw_spelling_errors, classified)
-
-            raw_spelling_by_detection_id: dict[str, list[dict]] = {}
-            for error in raw_spelling_errors:
-                detection_id = error.get("detection_id")
-                if detection_id:
-                    raw_spelling_by_detection_id.setdefault(detection_id, []).append(error)
-
-            kept_spelling_by_detection_id: dict[str, list[dict]] = {}
-            for error in filtered_spelling_errors:
-                detection_id = error.get("detection_id")
-                if detection_id:
-                    kept_spelling_by_detection_id.setdefault(detection_id, []).append(error)
-
-            audit_rows = build_testing_audit_rows(
-                classified,
-                filtered_subtitle_ids,
-                spellcheck_checked_ids,
-                raw_spelling_by_detection_id,
-                kept_spelling_by_detection_id,
-                spelling_debug_by_detection_id,
-            )
+def _rows_for_previous_line(rows: list[dict], previous: dict, text_field: str, time_field: str) -> list[dict]:
+    previous_start = _to_float(previous.get("start_time"), 0.0)
+    return [
+        row for row in rows
+        if (row.get(text_field) or "") == previous.get("text", "")
+        and abs(_to_float(row.get(time_field), 0.0) - previous_start) <= 1e-3
+    ]
 
-            counts = {
-                "raw": len(raw_detections),
-                "merged": len(merged),
-                "subtitle": sum(1 for d in classified if d.get("is_subtitle")),
-                "fixed": sum(1 for d in classified if d.get("is_fixed_text")),
-                "partial": sum(1 for d in classified if d.get("is_partial_sequence")),
-                "filtered_subtitles": len(filtered_subtitles),
-                "brand_name": sum(1 for d in classified if "brand_name" in (d.get("semantic_tags") or [])),
-                "proper_name": sum(1 for d in classified if "proper_name" in (d.get("semantic_tags") or [])),
-                "spelling_checked": len(spelling_input),
-                "spelling_raw_matches": len(raw_spelling_errors),
-                "spelling_kept_matches": len(filtered_spelling_errors),
-                "spelling_with_error": sum(1 for row in audit_rows if row.get("spelling_status") == "error_detected"),
-                "spelling_filtered_out": sum(1 for row in audit_rows if row.get("spelling_status") == "error_filtered_out"),
-                "spelling_no_error": sum(1 for row in audit_rows if row.get("spelling_status") == "no_error"),
-            }
 
-            return {
-                "status": "ok",
-                "mode": "classify_ocr_payload",
-                "counts": counts,
-                "raw_detections": raw_detections,
-                "audit_rows": audit_rows,
-                "sync_report": sync_report,
-            }, 200
+def _transcription_window_text(transcriptions: list[dict], start: float, end: float) -> str:
+    window_start = start - CONTAINMENT_WINDOW_SECONDS_BEFORE
+    window_end = end + CONTAINMENT_WINDOW_SECONDS_AFTER
+    parts = [
+        row.get("text") or ""
+        for row in transcriptions
+        if _to_float(row.get("end_time"), 0.0) >= window_start
+        and _to_float(row.get("start_time"), 0.0) <= window_end
+    ]
+    return _normalize_text_for_sync(" ".join(parts))
+
+
+def plan_incremental_analysis(
+    filtered_subtitles: list[dict],
+    transcription_segments: list[dict],
+    previous: dict,
+) -> dict:
+    """Decide which subtitles need spellcheck/mismatch work and what carries forward.
+
+    Unchanged lines keep their previous spelling errors (re-timed to the new cut,
+    false-positive flags preserved) when their raw text is identical, since the
+    sync normalization hides case, punctuation and number-word edits. Their
+    previous mismatches carry forward only when the transcription around the
+    line is also unchanged, since a recut can move or replace the audio under an
+    otherwise identical subtitle. Rows are only carried for lines the previous
+    run actually checked (`previous["coverage"]`); without coverage every line
+    is re-checked.
+    """
+    previous_subtitles = build_filtered_subtitles(previous.get("detections") or [])
+    matched, changed = diff_subtitles_against_previous(filtered_subtitles, previous_subtitles)
+    previous_transcriptions = previous.get("transcriptions") or []
+    coverage = previous.get("coverage")
+    if not isinstance(coverage, dict):
+        matched, changed = {}, list(range(len(filtered_subtitles)))
+        coverage = {}
+    spellcheck_unchecked = set(coverage.get("spellcheck_unchecked") or [])
+    mismatch_unchecked = set(coverage.get("mismatch_unchecked") or [])
+
+    carried_spelling: list[dict] = []
+    carried_mismatches: list[dict] = []
+    spellcheck_recheck: list[int] = list(changed)
+    mismatch_recheck: list[int] = list(changed)
+    for index, previous_line in matched.items():
+        subtitle = filtered_subtitles[index]
+        start = _to_float(subtitle.get("start_time"), 0.0)
+        end = _to_float(subtitle.get("end_time"), start)
+        previous_key = _coverage_line_key(previous_line.get("text", ""), previous_line.get("start_time"))
+        if subtitle.get("text") != previous_line.get("text") or previous_key in spellcheck_unchecked:
+            spellcheck_recheck.append(index)
+        else:
+            for row in _rows_for_previous_line(
+                previous.get("spelling_errors") or [], previous_line, "context", "timestamp",
+            ):
+                original_text = row.get("original_text") or ""
+                suggested_text = row.get("suggested_text") or ""
+                original_norm = _normalize_spell_token(original_text)
+                suggested_norm = _normalize_spell_token(suggested_text)
+                carried_spelling.append({
+                    "source": row.get("source") or "subtitle",
+                    "original_text": original_text,
+                    "suggested_text": suggested_text,
+                    "context": subtitle.get("text"),
+                    "timestamp": start,
+                    "detection_id": subtitle.get("detection_id"),
+                    "rule_id": row.get("rule_id"),
+                    "has_replacement": bool(original_norm and suggested_norm and suggested_norm != original_norm),
+                    "is_false_positive": bool(row.get("is_false_positive")),
+                })
+
+        if previous_key in mismatch_unchecked:
+            mismatch_recheck.append(index)
+            continue
+        previous_start = _to_float(previous_line.get("start_time"), 0.0)
+        previous_end = _to_float(previous_line.get("end_time"), previous_start)
+        audio_unchanged = _transcription_window_text(transcription_segments, start, end) == _transcription_window_text(
+            previous_transcriptions,
+            previous_start,
+            previous_end,
+        )
+        if not audio_unchanged:
+            mismatch_recheck.append(index)
+            continue
+        for row in _rows_for_previous_line(previous.get("mismatches") or [], previous_line, "subtitle_text", "start_time"):
+            carried_mismatches.append({
+                "subtitle_text": subtitle.get("text"),
+                "transcription_text": row.get("transcription_text") or "",
+                "start_time": start,
+                "end_time": end,
+                "severity": row.get("severity") or "high",
+                "mismatch_type": row.get("mismatch_type"),
+                "is_dismissed": bool(row.get("is_dismissed")),
+            })
+
+    return {
+        "spellcheck_subtitles": [filtered_subtitles[index] for index in sorted(spellcheck_recheck)],
+        "mismatch_subtitles": [filtered_subtitles[index] for index in sorted(mismatch_recheck)],
+        "carried_spelling_errors": carried_spelling,
+        "carried_mismatches": carried_mismatches,
+        "stats": {
+            "subtitles": len(filtered_subtitles),
+            "previous_subtitles": len(previous_subtitles),
+            "unchanged": len(matched),
+            "changed": len(changed),
+            "removed": len(previous_subtitles) - len(matched),
+            "spellcheck_rechecked": len(spellcheck_recheck),
+            "mismatch_rechecked": len(mismatch_recheck),
+        },
+    }
+
+
+def _make_step_logger(supabase, project_id: str | None, debug_lines: list[str], status: str, progress: int):
+    def _logger(message: str, level: str = "DEBUG"):
+        if not project_id:
+            print(message, flush=True)
+            return
+        append_debug_log_line(
+            supabase=supabase,
+            project_id=project_id,
+            debug_lines=debug_lines,
+            level=level,
+            status=status,
+            progress=progress,
+            message=message,
+        )
+
+    return _logger
 
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            if not video_url:
-                raise ValueError("No video URL available; resolve Frame.io metadata before triggering analysis")
-
-            clear_previous_results(supabase, project_id)
-            stage_durations: dict[str, float] = {}
-
-            # ── Step 1: Download video ──────────────────────────────
-            t1 = time.time()
-            update_status(supabase, project_id, "fetching_video", 10,
-                          "Downloading video...", debug_lines=debug_lines)
-            video_path = download_video(video_url, tmp_dir)
-            file_size_mb = os.path.getsize(video_path) / (1024 * 1024)
-            elapsed = time.time() - t1
-            stage_durations["fetching_video"] = elapsed
-            update_status(supabase, project_id, "fetching_video", 15,
-                          f"Video downloaded: {file_size_mb:.1f} MB in {elapsed:.1f}s", debug_lines=debug_lines)
-
-            # ── Step 2: Detect text in video (Video Intelligence) ───
-            t2 = time.time()
-            update_status(supabase, project_id, "detecting_text", 20,
-                          "Sending video to Google Video Intelligence API...", debug_lines=debug_lines)
-            detect_logger = make_step_logger("detecting_text", 20)
-            ocr_input_path = video_path
-            ocr_source = "original"
-            if OCR_PROXY_ENABLED:
+
+def run_analysis(
+    supabase,
+    project_id: str,
+    video_url: str | None,
+    incremental: bool = INCREMENTAL_ANALYSIS_ENABLED,
+    debug_lines: list[str] | None = None,
+    started_at: float | None = None,
+    reset_http_stats: bool = True,
+    expected_size_bytes: int | None = None,
+    renditions: list[dict] | None = None,
+):
+    """Run the full analyze pipeline for one project; raises on failure.
+
+    Shared by the synchronous HTTP mode, queue workers and batch runs. Status
+    and debug lines are written to the project as the stages progress. Batch
+    runs pass `reset_http_stats=False` since the latency histograms are global.
+    `expected_size_bytes` is the file size Frame.io reported for `video_url`;
+    `renditions` are Frame.io transcodes that can replace the OCR proxy.
+    """
+    t0 = started_at if started_at is not None else time.time()
+    if debug_lines is None:
+        debug_lines = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if not video_url:
+            raise ValueError("No video URL available; resolve Frame.io metadata before triggering analysis")
+
+        # Results are written under a fresh run_id and only become visible when
+        # the run is activated at the end; older runs are collected afterwards.
+        run_id = str(uuid.uuid4())
+        run_started_at = _utc_timestamp_iso(with_microseconds=True)
+        register_run(supabase, project_id, run_id, run_started_at)
+        previous_analysis = None
+        if incremental:
+            try:
+                previous_analysis = load_previous_analysis(
+                    supabase,
+                    project_id,
+                    get_active_run_id(supabase, project_id),
+                )
+            except Exception as previous_error:
+                print(f"WARNING: could not load previous results, running full analysis: {previous_error}", flush=True)
+        if reset_http_stats:
+            reset_http_latency_stats()
+        stage_durations: dict[str, float] = {}
+        pending_raw_uploads: list[tuple[str, concurrent.futures.Future, object]] = []
+
+        # The duration drives subtitle classification and STT mode selection;
+        # resolve it from metadata / the container header while the download runs.
+        duration_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="duration")
+        try:
+            metadata_duration = get_project_duration(supabase, project_id)
+        except Exception as duration_error:
+            print(f"WARNING: could not read stored duration: {duration_error}", flush=True)
+            metadata_duration = None
+        duration_future = duration_executor.submit(resolve_video_duration, video_url, metadata_duration)
+        duration_executor.shutdown(wait=False)
+
+        # ── Step 1: Download video ──────────────────────────────
+        t1 = time.time()
+        update_status(supabase, project_id, "fetching_video", 10,
+                      "Downloading video...", debug_lines=debug_lines)
+        fetch_logger = _make_step_logger(supabase, project_id, debug_lines, "fetching_video", 10)
+        video_path = None
+        ocr_input_path = None
+        ocr_source = "original"
+        # A Frame.io transcode at the width the proxy would have replaces both the
+        # proxy transcode and, when it carries audio, the download of the master.
+        rendition = None
+        ocr_target_width = OCR_PROXY_MAX_WIDTH
+        if renditions and OCR_RENDITIONS_ENABLED and OCR_PROXY_ENABLED:
+            ocr_target_width = ocr_proxy_target_width(probe_master_width(video_url))
+            rendition = pick_ocr_rendition(
+                [item for item in renditions if isinstance(item, dict) and item.get("url") != video_url],
+                min_width=ocr_target_width,
+                probe_dimensions=probe_remote_mp4_dimensions,
+            )
+        if rendition:
+            ocr_input_path, rendition_has_audio = fetch_ocr_rendition(
+                rendition, tmp_dir, debug_logger=fetch_logger, min_width=ocr_target_width,
+            )
+            if ocr_input_path:
+                ocr_source = f"rendition:{rendition['key']}"
+                if rendition_has_audio:
+                    video_path = ocr_input_path
+        if video_path is None:
+            video_path = download_video(
+                video_url,
+                tmp_dir,
+                debug_logger=fetch_logger,
+                expected_size_bytes=expected_size_bytes,
+            )
+        file_size_mb = os.path.getsize(video_path) / (1024 * 1024)
+        elapsed = time.time() - t1
+        stage_durations["fetching_video"] = elapsed
+        update_status(supabase, project_id, "fetching_video", 15,
+                      f"Video downloaded: {file_size_mb:.1f} MB in {elapsed:.1f}s", debug_lines=debug_lines)
+
+        # ── Step 2: Detect text in video (Video Intelligence) ───
+        t2 = time.time()
+        update_status(supabase, project_id, "detecting_text", 20,
+                      "Sending video to Google Video Intelligence API...", debug_lines=debug_lines)
+        detect_logger = _make_step_logger(supabase, project_id, debug_lines, "detecting_text", 20)
+        if ocr_input_path:
+            detect_logger("OCR proxy skipped: using Frame.io rendition", level="DEBUG")
+        elif OCR_PROXY_ENABLED:
+            with _transcode_slots:
                 proxy_path = build_ocr_proxy_video(
                     video_path,
                     tmp_dir,
                     debug_logger=detect_logger,
                 )
-                if proxy_path:
-                    ocr_input_path = proxy_path
-                    ocr_source = "proxy"
-            else:
-                detect_logger("OCR proxy disabled by config", level="DEBUG")
-            detect_logger(f"OCR source selected: {ocr_source}", level="DEBUG")
-            raw_detections, raw_payload = detect_text_in_video_with_raw(
-                ocr_input_path,
-                debug_logger=detect_logger,
-                input_source=ocr_source,
-            )
-            elapsed = time.time() - t2
-            stage_durations["detecting_text"] = elapsed
-            update_status(supabase, project_id, "detecting_text", 30,
-                          (
-                              "Video Intelligence done: "
-                              f"{len(raw_detections)} raw text detections in {elapsed:.1f}s "
-                              f"(source={ocr_source})"
-                          ),
-                          debug_lines=debug_lines)
-
+            if proxy_path:
+                ocr_input_path = proxy_path
+                ocr_source = "proxy"
+        else:
+            detect_logger("OCR proxy disabled by config", level="DEBUG")
+        ocr_input_path = ocr_input_path or video_path
+        detect_logger(f"OCR source selected: {ocr_source}", level="DEBUG")
+        raw_detections, raw_payload = detect_text_in_video_with_raw(
+            ocr_input_path,
+            debug_logger=detect_logger,
+            input_source=ocr_source,
+        )
+        elapsed = time.time() - t2
+        stage_durations["detecting_text"] = elapsed
+        update_status(supabase, project_id, "detecting_text", 30,
+                      (
+                          "Video Intelligence done: "
+                          f"{len(raw_detections)} raw text detections in {elapsed:.1f}s "
+                          f"(source={ocr_source})"
+                      ),
+                      debug_lines=debug_lines)
+
+        if OUTBOUND_IO_MODE == "async":
+            pending_raw_uploads.append((
+                "OCR",
+                get_async_engine().submit(save_ocr_raw_to_storage_async(project_id, video_url, raw_payload)),
+                update_project_ocr_raw_metadata,
+            ))
+        else:
             raw_meta = save_ocr_raw_to_storage(project_id, video_url, raw_payload)
             update_project_ocr_raw_metadata(supabase, project_id, raw_meta)
 
-            merged = merge_partial_sequences(raw_detections)
-            print(f"  Merged partial sequences: {len(raw_detections)} -> {len(merged)} detections", flush=True)
+        merged = merge_partial_sequences(raw_detections)
+        print(f"  Merged partial sequences: {len(raw_detections)} -> {len(merged)} detections", flush=True)
 
-            # Get video duration for classification
-            _ensure_ffmpeg()
-            probe = subprocess.run(
-                [_FFPROBE_PATH, "-v", "error", "-show_entries", "format=duration",
-                 "-of", "default=noprint_wrappers=1:nokey=1", video_path],
-                capture_output=True, text=True,
-            )
-            video_duration = float(probe.stdout.strip()) if probe.stdout.strip() else 0
-            print(f"  Video duration: {video_duration:.1f}s", flush=True)
-
-            classified = classify_subtitle_vs_fixed(merged, video_duration)
-            n_subtitles = sum(1 for d in classified if d.get("is_subtitle"))
-            n_fixed = sum(1 for d in classified if d.get("is_fixed_text"))
-            store_text_detections(supabase, project_id, classified)
-            update_status(supabase, project_id, "detecting_text", 40,
-                          f"Text classified: {n_subtitles} subtitles, {n_fixed} fixed texts", debug_lines=debug_lines)
-
-            # ── Step 3: Transcribe audio (Gemini) ───────────────────
-            t3 = time.time()
-            update_status(supabase, project_id, "transcribing_audio", 50,
-                          "Extracting audio track with ffmpeg...", debug_lines=debug_lines)
+        # Get video duration for classification
+        try:
+            video_duration, duration_source = duration_future.result()
+        except Exception as duration_error:
+            print(f"WARNING: duration resolver failed: {duration_error}", flush=True)
+            video_duration, duration_source = 0.0, "unknown"
+        if not video_duration:
+            video_duration, duration_source = resolve_video_duration(None, video_path=video_path)
+        print(f"  Video duration: {video_duration:.1f}s (source={duration_source})", flush=True)
+
+        classified = classify_subtitle_vs_fixed(merged, video_duration)
+        n_subtitles = sum(1 for d in classified if d.get("is_subtitle"))
+        n_fixed = sum(1 for d in classified if d.get("is_fixed_text"))
+        store_text_detections(supabase, project_id, classified, run_id=run_id)
+        update_status(supabase, project_id, "detecting_text", 40,
+                      f"Text classified: {n_subtitles} subtitles, {n_fixed} fixed texts", debug_lines=debug_lines)
+
+        # ── Step 3: Transcribe audio (Gemini) ───────────────────
+        t3 = time.time()
+        update_status(supabase, project_id, "transcribing_audio", 50,
+                      "Extracting audio track with ffmpeg...", debug_lines=debug_lines)
+        with _transcode_slots:
             audio_path = extract_audio(video_path, tmp_dir)
-            audio_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
-            print(f"  Audio extracted: {audio_size_mb:.1f} MB", flush=True)
-
-            update_status(supabase, project_id, "transcribing_audio", 55,
-                          "Sending audio to Speech-to-Text for transcription...", debug_lines=debug_lines)
-            raw_transcription_segments, raw_transcription_payload, transcription_words = transcribe_with_speech_to_text(
-                audio_path,
-                video_duration,
-                debug_logger=make_step_logger("transcribing_audio", 55),
-            )
-            transcription_segments = split_transcription_segments(raw_transcription_segments)
-            elapsed = time.time() - t3
-            stage_durations["transcribing_audio"] = elapsed
-            store_transcriptions(supabase, project_id, transcription_segments)
-            try:
+        audio_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
+        print(f"  Audio extracted: {audio_size_mb:.1f} MB", flush=True)
+
+        update_status(supabase, project_id, "transcribing_audio", 55,
+                      "Sending audio to Speech-to-Text for transcription...", debug_lines=debug_lines)
+        raw_transcription_segments, raw_transcription_payload, transcription_words = transcribe_with_speech_to_text(
+            audio_path,
+            video_duration,
+            debug_logger=_make_step_logger(supabase, project_id, debug_lines, "transcribing_audio", 55),
+        )
+        transcription_segments = split_transcription_segments(raw_transcription_segments)
+        elapsed = time.time() - t3
+        stage_durations["transcribing_audio"] = elapsed
+        store_transcriptions(supabase, project_id, transcription_segments, run_id=run_id)
+        transcription_word_windows = (
+            _build_transcription_word_windows([], transcription_words) if transcription_words else None
+        )
+        try:
+            if OUTBOUND_IO_MODE == "async":
+                pending_raw_uploads.append((
+                    "transcription",
+                    get_async_engine().submit(save_transcription_raw_to_storage_async(
+                        project_id,
+                        video_url,
+                        raw_transcription_payload,
+                        word_windows=transcription_word_windows,
+                    )),
+                    update_project_transcription_raw_metadata,
+                ))
+            else:
                 transcription_raw_meta = save_transcription_raw_to_storage(
                     project_id=project_id,
                     video_url=video_url,
                     raw_payload=raw_transcription_payload,
+                    word_windows=transcription_word_windows,
                 )
                 update_project_transcription_raw_metadata(supabase, project_id, transcription_raw_meta)
-            except Exception as transcription_raw_error:
+        except Exception as transcription_raw_error:
+            append_debug_log_line(
+                supabase=supabase,
+                project_id=project_id,
+                debug_lines=debug_lines,
+                level="ERROR",
+                status="transcribing_audio",
+                progress=65,
+                message=(
+                    "Could not persist transcription raw payload "
+                    f"(project_id={project_id}): {transcription_raw_error}"
+                ),
+            )
+        update_status(supabase, project_id, "transcribing_audio", 65,
+                      (
+                          "Transcription done: "
+                          f"{len(raw_transcription_segments)} raw segments -> "
+                          f"{len(transcription_segments)} normalized segments in {elapsed:.1f}s"
+                      ),
+                      debug_lines=debug_lines)
+
+        # ── Step 4: Check spelling (API Ninjas) ─────────────────
+        t4 = time.time()
+        filtered_subs = build_filtered_subtitles(classified)
+        incremental_plan = None
+        if previous_analysis is not None:
+            incremental_plan = plan_incremental_analysis(filtered_subs, transcription_segments, previous_analysis)
+            plan_stats = incremental_plan["stats"]
+            append_debug_log_line(
+                supabase=supabase,
+                project_id=project_id,
+                debug_lines=debug_lines,
+                level="DEBUG",
+                status="checking_spelling",
+                progress=70,
+                message=(
+                    "INCREMENTAL: "
+                    f"subtitles={plan_stats['subtitles']} previous={plan_stats['previous_subtitles']} "
+                    f"unchanged={plan_stats['unchanged']} changed={plan_stats['changed']} "
+                    f"removed={plan_stats['removed']} spellcheck_rechecked={plan_stats['spellcheck_rechecked']} "
+                    f"mismatch_rechecked={plan_stats['mismatch_rechecked']}"
+                ),
+            )
+        spellcheck_subs = incremental_plan["spellcheck_subtitles"] if incremental_plan else filtered_subs
+        subtitle_texts = [
+            {"text": d["text"], "start_time": d["start_time"]}
+            for d in spellcheck_subs
+        ]
+        spellcheck_workers = max(1, min(SPELLCHECK_MAX_WORKERS, len(subtitle_texts) if subtitle_texts else 1))
+        update_status(supabase, project_id, "checking_spelling", 70,
+                      (
+                          "Checking spelling on subtitle segments "
+                          f"(total={len(subtitle_texts)}, workers={spellcheck_workers}, "
+                          f"budget={SPELLCHECK_STAGE_BUDGET_SECONDS:g}s)..."
+                      ),
+                      debug_lines=debug_lines)
+        spellcheck_stats: dict = {}
+        spelling_errors = check_spelling(
+            subtitle_texts,
+            max_workers=SPELLCHECK_MAX_WORKERS,
+            time_budget_seconds=SPELLCHECK_STAGE_BUDGET_SECONDS,
+            stats=spellcheck_stats,
+            supabase=supabase,
+        )
+        spellcheck_unverified = [
+            spellcheck_subs[index] for index in spellcheck_stats.get("unverified_indices", [])
+        ]
+        if incremental_plan:
+            spelling_errors = spelling_errors + incremental_plan["carried_spelling_errors"]
+        filtered_errors = filter_false_positives(spelling_errors, classified)
+        store_spelling_errors(supabase, project_id, filtered_errors, run_id=run_id)
+        elapsed = time.time() - t4
+        stage_durations["checking_spelling"] = elapsed
+        if spellcheck_stats.get("budget_exhausted"):
+            append_debug_log_line(
+                supabase=supabase,
+                project_id=project_id,
+                debug_lines=debug_lines,
+                level="DEBUG",
+                status="checking_spelling",
+                progress=80,
+                message=(
+                    "SPELLCHECK_BUDGET_EXHAUSTED: "
+                    f"total={spellcheck_stats.get('total', 0)} "
+                    f"unchecked={spellcheck_stats.get('unchecked', 0)} "
+                    f"budget={SPELLCHECK_STAGE_BUDGET_SECONDS:g}s"
+                ),
+            )
+        if spellcheck_stats.get("requests"):
+            append_debug_log_line(
+                supabase=supabase,
+                project_id=project_id,
+                debug_lines=debug_lines,
+                level="DEBUG",
+                status="checking_spelling",
+                progress=80,
+                message=(
+                    "SPELLCHECK_CONCURRENCY: "
+                    f"requests={spellcheck_stats.get('requests', 0)} "
+                    f"throughput={spellcheck_stats.get('throughput_rps', 0)}rps "
+                    f"limit_final={spellcheck_stats.get('concurrency_final', '-')} "
+                    f"limit_peak={spellcheck_stats.get('concurrency_peak', '-')} "
+                    f"throttle_events={spellcheck_stats.get('throttle_events', 0)} "
+                    f"throttle_retries={spellcheck_stats.get('throttle_retries', 0)}"
+                ),
+            )
+        update_status(supabase, project_id, "checking_spelling", 80,
+                      (
+                          "Spelling done: "
+                          f"{len(spelling_errors)} raw, {len(filtered_errors)} after filtering in {elapsed:.1f}s "
+                          f"(total={spellcheck_stats.get('total', 0)}, "
+                          f"unique_texts={spellcheck_stats.get('unique_texts', 0)}, "
+                          f"local={spellcheck_stats.get('local_resolved', 0)}, "
+                          f"cache_hits={spellcheck_stats.get('memory_cache_hits', 0)}"
+                          f"+{spellcheck_stats.get('persistent_cache_hits', 0)}, "
+                          f"requests={spellcheck_stats.get('requests', 0)}, workers={spellcheck_workers})"
+                      ),
+                      debug_lines=debug_lines)
+
+        # ── Step 5: Detect mismatches ───────────────────────────
+        t5 = time.time()
+        mismatch_subs = incremental_plan["mismatch_subtitles"] if incremental_plan else filtered_subs
+        mismatch_words_source = "raw_words" if transcription_words else "segments_fallback"
+        update_status(
+            supabase,
+            project_id,
+            "detecting_mismatches",
+            85,
+            (
+                "Comparing subtitles against transcription "
+                f"(total={len(mismatch_subs)}, budget={MISMATCH_STAGE_BUDGET_SECONDS:g}s, "
+                f"words_source={mismatch_words_source})..."
+            ),
+            debug_lines=debug_lines,
+        )
+        mismatches, mismatch_meta = detect_mismatches_fast_containment(
+            mismatch_subs,
+            transcription_segments,
+            transcription_words=transcription_words,
+            time_budget_seconds=MISMATCH_STAGE_BUDGET_SECONDS,
+        )
+        mismatch_unverified = mismatch_subs[mismatch_meta["subtitles_processed"]:]
+        if incremental_plan:
+            mismatches = sorted(
+                mismatches + incremental_plan["carried_mismatches"],
+                key=lambda m: (m["start_time"], m["end_time"]),
+            )
+        store_mismatches(supabase, project_id, mismatches, run_id=run_id)
+        elapsed = time.time() - t5
+        stage_durations["detecting_mismatches"] = elapsed
+        if mismatch_meta["budget_exhausted"]:
+            append_debug_log_line(
+                supabase=supabase,
+                project_id=project_id,
+                debug_lines=debug_lines,
+                level="DEBUG",
+                status="detecting_mismatches",
+                progress=95,
+                message=(
+                    "MISMATCH_BUDGET_EXHAUSTED: "
+                    f"total={mismatch_meta['subtitles_total']} "
+                    f"processed={mismatch_meta['subtitles_processed']} "
+                    f"budget={MISMATCH_STAGE_BUDGET_SECONDS:g}s"
+                ),
+            )
+        update_status(supabase, project_id, "detecting_mismatches", 95,
+                      (
+                          f"Mismatches done: {len(mismatches)} found in {elapsed:.1f}s "
+                          f"(processed={mismatch_meta['subtitles_processed']}, "
+                          f"words_source={mismatch_meta['words_source']})"
+                      ),
+                      debug_lines=debug_lines)
+
+        # ── Done ────────────────────────────────────────────────
+        for upload_label, upload_future, update_metadata in pending_raw_uploads:
+            try:
+                update_metadata(supabase, project_id, upload_future.result(timeout=120))
+            except Exception as upload_error:
                 append_debug_log_line(
                     supabase=supabase,
                     project_id=project_id,
                     debug_lines=debug_lines,
                     level="ERROR",
-                    status="transcribing_audio",
-                    progress=65,
+                    status="detecting_mismatches",
+                    progress=95,
                     message=(
-                        "Could not persist transcription raw payload "
-                        f"(project_id={project_id}): {transcription_raw_error}"
+                        f"Could not persist {upload_label} raw payload "
+                        f"(project_id={project_id}): {upload_error}"
                     ),
                 )
-            update_status(supabase, project_id, "transcribing_audio", 65,
-                          (
-                              "Transcription done: "
-                              f"{len(raw_transcription_segments)} raw segments -> "
-                              f"{len(transcription_segments)} normalized segments in {elapsed:.1f}s"
-                          ),
-                          debug_lines=debug_lines)
-
-            # ── Step 4: Check spelling (API Ninjas) ─────────────────
-            t4 = time.time()
-            subtitle_texts_all = [
-                {"text": d["text"], "start_time": d["start_time"]}
-                for d in build_filtered_subtitles(classified)
-            ]
-            subtitle_texts = subtitle_texts_all[:SPELLCHECK_MAX_SEGMENTS]
-            spellcheck_cap_applied = len(subtitle_texts_all) > len(subtitle_texts)
-            spellcheck_workers = max(1, min(SPELLCHECK_MAX_WORKERS, len(subtitle_texts) if subtitle_texts else 1))
-            update_status(supabase, project_id, "checking_spelling", 70,
-                          (
-                              "Checking spelling on subtitle segments "
-                              f"(total={len(subtitle_texts_all)}, processed={len(subtitle_texts)}, "
-                              f"workers={spellcheck_workers})..."
-                          ),
-                          debug_lines=debug_lines)
-            spelling_errors = check_spelling(
-                subtitle_texts,
-                max_workers=SPELLCHECK_MAX_WORKERS,
+
+        http_summary = http_latency_summary() if reset_http_stats else ""
+        if http_summary:
+            append_debug_log_line(
+                supabase=supabase,
+                project_id=project_id,
+                debug_lines=debug_lines,
+                level="DEBUG",
+                status="detecting_mismatches",
+                progress=95,
+                message=f"HTTP latency by host: {http_summary}",
             )
-            filtered_errors = filter_false_positives(spelling_errors, classified)
-            store_spelling_errors(supabase, project_id, filtered_errors)
-            elapsed = time.time() - t4
-            stage_durations["checking_spelling"] = elapsed
-            if spellcheck_cap_applied:
-                append_debug_log_line(
-                    supabase=supabase,
-                    project_id=project_id,
+        activated = activate_run(
+            supabase,
+            project_id,
+            run_id,
+            run_started_at,
+            coverage=build_run_coverage(run_id, spellcheck_unverified, mismatch_unverified),
+        )
+        if activated:
+            start_run_garbage_collection(supabase, project_id, run_id, run_started_at)
+        else:
+            append_debug_log_line(
+                supabase=supabase,
+                project_id=project_id,
+                debug_lines=debug_lines,
+                level="DEBUG",
+                status="detecting_mismatches",
+                progress=95,
+                message=f"RUN_SUPERSEDED: a newer run is already active; discarding run_id={run_id}",
+            )
+            discard_run(supabase, project_id, run_id)
+
+        total_elapsed = time.time() - t0
+        breakdown = ", ".join(
+            f"{stage}={duration:.1f}s"
+            for stage, duration in stage_durations.items()
+        )
+        update_status(
+            supabase,
+            project_id,
+            "completed",
+            100,
+            f"Analysis completed in {total_elapsed:.1f}s ({breakdown})",
+            debug_lines=debug_lines,
+        )
+        print(f"analyze_video COMPLETED in {total_elapsed:.1f}s", flush=True)
+        print("=" * 60, flush=True)
+
+
+# --- 10. Job Queue & Workers ---
+class SQLiteJobQueue:
+    """Lease-based job queue on SQLite (":memory:" by default) for tests and local runs.
+
+    Same contract as `SupabaseJobQueue`: `claim` hands out the oldest available
+    job under a lease and `heartbeat` extends it. Each claim counts as an
+    attempt; `fail` requeues until `max_attempts`. A job whose lease expires is
+    failed outright, not retried: the worker was killed, almost always at the
+    function timeout, and a rerun would time out again. `take_expired` hands
+    such jobs to the worker, which marks their projects as errored (SQLite has
+    no projects table to update).
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._expired: list[dict] = []
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analysis_jobs (
+                id TEXT PRIMARY KEY,
+                project_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                lease_owner TEXT,
+                lease_expires_at REAL,
+                available_at REAL NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+
+    @staticmethod
+    def _to_job(row) -> dict | None:
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        return job
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM analysis_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row)
+
+    def enqueue(self, project_id: str, payload: dict, max_attempts: int = JOB_MAX_ATTEMPTS) -> dict:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM analysis_jobs WHERE project_id = ? AND status IN ('queued', 'running')",
+                (project_id,),
+            ).fetchone()
+            if row is None:
+                job_id = str(uuid.uuid4())
+                self._conn.execute(
+                    "INSERT INTO analysis_jobs (id, project_id, payload, status, max_attempts, available_at, "
+                    "created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                    (job_id, project_id, json.dumps(payload), max_attempts, now, now, now),
+                )
+                row = self._conn.execute("SELECT * FROM analysis_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row)
+
+    def claim(self, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> dict | None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                expired = self._conn.execute(
+                    "SELECT * FROM analysis_jobs WHERE status = 'running' AND lease_expires_at < ?",
+                    (now,),
+                ).fetchall()
+                self._conn.execute(
+                    "UPDATE analysis_jobs SET status = 'failed', last_error = ?, lease_owner = NULL, "
+                    "lease_expires_at = NULL, updated_at = ? WHERE status = 'running' AND lease_expires_at < ?",
+                    (JOB_LEASE_EXPIRED_ERROR, now, now),
+                )
+                row = self._conn.execute(
+                    "SELECT id FROM analysis_jobs WHERE status = 'queued' AND available_at <= ? "
+                    "ORDER BY available_at, created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE analysis_jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                        "lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                        (worker_id, now + lease_seconds, now, row["id"]),
+                    )
+                    row = self._conn.execute("SELECT * FROM analysis_jobs WHERE id = ?", (row["id"],)).fetchone()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._expired.extend(self._to_job(expired_row) for expired_row in expired)
+        return self._to_job(row)
+
+    def take_expired(self) -> list[dict]:
+        """Jobs failed by `claim` because their lease expired."""
+        with self._lock:
+            expired, self._expired = self._expired, []
+        return expired
+
+    def _update_leased(self, job_id: str, worker_id: str, assignments: str, params: tuple) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE analysis_jobs SET {assignments}, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (*params, time.time(), job_id, worker_id),
+            )
+        return cursor.rowcount > 0
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+        return self._update_leased(job_id, worker_id, "lease_expires_at = ?", (time.time() + lease_seconds,))
+
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        return self._update_leased(job_id, worker_id, "status = 'completed', lease_expires_at = NULL", ())
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay_seconds: float = 0.0) -> str | None:
+        """Record a failed attempt; returns the job's new status ("queued" or "failed"), None if the lease was lost."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        status = "queued" if job["attempts"] < job["max_attempts"] else "failed"
+        updated = self._update_leased(
+            job_id,
+            worker_id,
+            "status = ?, last_error = ?, available_at = ?, lease_owner = NULL, lease_expires_at = NULL",
+            (status, error[:2000], time.time() + retry_delay_seconds),
+        )
+        return status if updated else None
+
+
+class SupabaseJobQueue:
+    """Lease-based job queue on the `analysis_jobs` table.
+
+    Claiming goes through the `claim_analysis_job` RPC (FOR UPDATE SKIP LOCKED),
+    so concurrent workers on different instances never get the same job. The
+    RPC also fails jobs whose lease expired (without retrying them) and marks
+    their projects as errored in the same transaction, so `take_expired` has
+    nothing to report.
+    """
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    @staticmethod
+    def _first(response) -> dict | None:
+        rows = response.data if hasattr(response, "data") else None
+        if isinstance(rows, dict):
+            return rows
+        if isinstance(rows, list) and rows and isinstance(rows[0], dict):
+            return rows[0]
+        return None
+
+    @staticmethod
+    def _iso_in(seconds: float) -> str:
+        return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+    def get(self, job_id: str) -> dict | None:
+        return self._first(self.supabase.table("analysis_jobs").select("*").eq("id", job_id).limit(1).execute())
+
+    def _active_job(self, project_id: str) -> dict | None:
+        return self._first(
+            self.supabase.table("analysis_jobs")
+            .select("*")
+            .eq("project_id", project_id)
+            .in_("status", ["queued", "running"])
+            .limit(1)
+            .execute()
+        )
+
+    def enqueue(self, project_id: str, payload: dict, max_attempts: int = JOB_MAX_ATTEMPTS) -> dict:
+        active = self._active_job(project_id)
+        if active is not None:
+            return active
+        try:
+            return self._first(self.supabase.table("analysis_jobs").insert({
+                "id": str(uuid.uuid4()),
+                "project_id": project_id,
+                "payload": payload,
+                "status": "queued",
+                "max_attempts": max_attempts,
+            }).execute()) or {}
+        except Exception:
+            # A concurrent enqueue (double click, second tab) won the race on
+            # idx_analysis_jobs_active_project: its job is the one to report.
+            active = self._active_job(project_id)
+            if active is None:
+                raise
+            return active
+
+    def claim(self, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> dict | None:
+        job = self._first(self.supabase.rpc(
+            "claim_analysis_job",
+            {"p_worker_id": worker_id, "p_lease_seconds": int(lease_seconds)},
+        ).execute())
+        return job if job and job.get("id") else None
+
+    def take_expired(self) -> list[dict]:
+        return []
+
+    def _update_leased(self, job_id: str, worker_id: str, values: dict) -> bool:
+        values = {**values, "updated_at": self._iso_in(0)}
+        response = (
+            self.supabase.table("analysis_jobs")
+            .update(values)
+            .eq("id", job_id)
+            .eq("lease_owner", worker_id)
+            .eq("status", "running")
+            .execute()
+        )
+        return bool(getattr(response, "data", None))
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+        return self._update_leased(job_id, worker_id, {"lease_expires_at": self._iso_in(lease_seconds)})
+
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        return self._update_leased(job_id, worker_id, {"status": "completed", "lease_expires_at": None})
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay_seconds: float = 0.0) -> str | None:
+        job = self.get(job_id)
+        if job is None:
+            return None
+        status = "queued" if int(job.get("attempts") or 0) < int(job.get("max_attempts") or 1) else "failed"
+        updated = self._update_leased(job_id, worker_id, {
+            "status": status,
+            "last_error": error[:2000],
+            "available_at": self._iso_in(retry_delay_seconds),
+            "lease_owner": None,
+            "lease_expires_at": None,
+        })
+        return status if updated else None
+
+
+_sqlite_job_queue: SQLiteJobQueue | None = None
+_sqlite_job_queue_lock = threading.Lock()
+
+
+def get_job_queue(supabase):
+    """Return the queue backend selected by JOB_QUEUE_BACKEND."""
+    global _sqlite_job_queue
+    if JOB_QUEUE_BACKEND != "sqlite":
+        return SupabaseJobQueue(supabase)
+    with _sqlite_job_queue_lock:
+        if _sqlite_job_queue is None:
+            _sqlite_job_queue = SQLiteJobQueue(JOB_QUEUE_SQLITE_PATH)
+    return _sqlite_job_queue
+
+
+class _JobHeartbeat:
+    """Background thread that keeps a claimed job's lease alive while it runs."""
+
+    def __init__(self, queue, job_id: str, worker_id: str):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"job-heartbeat-{job_id}", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                if not self.queue.heartbeat(self.job_id, self.worker_id, JOB_LEASE_SECONDS):
+                    self.lease_lost = True
+                    print(f"WARNING: lease lost for job {self.job_id}", flush=True)
+                    return
+            except Exception as heartbeat_error:
+                print(f"WARNING: heartbeat failed for job {self.job_id}: {heartbeat_error}", flush=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        return False
+
+
+def process_job(supabase, queue, job: dict, worker_id: str) -> str:
+    """Run one claimed job; returns "completed", "queued" (will retry), "failed" or "lease_lost"."""
+    job_id = job["id"]
+    project_id = job["project_id"]
+    payload = job.get("payload") or {}
+    attempts = int(job.get("attempts") or 1)
+    max_attempts = int(job.get("max_attempts") or 1)
+    debug_lines: list[str] = []
+    print(f"Worker {worker_id} running job {job_id} (project_id={project_id}, attempt {attempts}/{max_attempts})", flush=True)
+
+    started_at = time.time()
+    with _JobHeartbeat(queue, job_id, worker_id) as heartbeat:
+        try:
+            run_analysis(
+                supabase,
+                project_id,
+                payload.get("video_url"),
+                incremental=bool(payload.get("incremental", INCREMENTAL_ANALYSIS_ENABLED)),
+                debug_lines=debug_lines,
+                started_at=started_at,
+                expected_size_bytes=_read_size_bytes(payload.get("expected_size_bytes")),
+                renditions=payload.get("renditions"),
+            )
+        except Exception as job_error:
+            traceback.print_exc()
+            retry_delay = JOB_RETRY_BACKOFF_SECONDS * (2 ** (attempts - 1))
+            status = queue.fail(job_id, worker_id, str(job_error), retry_delay_seconds=retry_delay)
+            elapsed = time.time() - started_at
+            if status == "queued":
+                update_status(
+                    supabase,
+                    project_id,
+                    "pending",
+                    0,
+                    f"Attempt {attempts}/{max_attempts} failed after {elapsed:.1f}s, retrying in {retry_delay:.0f}s: {job_error}",
                     debug_lines=debug_lines,
-                    level="DEBUG",
-                    status="checking_spelling",
-                    progress=80,
-                    message=(
-                        "SPELLCHECK_SEGMENT_CAP_APPLIED: "
-                        f"total={len(subtitle_texts_all)} processed={len(subtitle_texts)} "
-                        f"cap={SPELLCHECK_MAX_SEGMENTS}"
+                    debug_level="ERROR",
+                )
+            elif status == "failed":
+                update_status(
+                    supabase,
+                    project_id,
+                    "error",
+                    0,
+                    f"Pipeline failed after {elapsed:.1f}s (attempt {attempts}/{max_attempts}): {job_error}",
+                    debug_lines=debug_lines,
+                    debug_level="ERROR",
+                )
+            return status or "lease_lost"
+
+    if heartbeat.lease_lost or not queue.complete(job_id, worker_id):
+        print(f"WARNING: job {job_id} finished after its lease was taken over", flush=True)
+        return "lease_lost"
+    return "completed"
+
+
+def run_worker(
+    supabase,
+    queue,
+    worker_id: str | None = None,
+    max_jobs: int = WORKER_MAX_JOBS,
+    time_budget_seconds: float = WORKER_TIME_BUDGET_SECONDS,
+) -> dict:
+    """Claim and run jobs until the queue is empty, `max_jobs` ran or the time budget is spent.
+
+    A job that outlives the invocation is not lost: its lease expires and the
+    next worker fails it and marks its project as errored. Lease expiry is not
+    retried, since the job would hit the same function timeout again; only
+    errors raised inside the pipeline are retried (up to JOB_MAX_ATTEMPTS).
+    """
+    worker_id = worker_id or f"worker-{uuid.uuid4().hex[:12]}"
+    deadline = time.time() + time_budget_seconds
+    outcomes: list[dict] = []
+    while len(outcomes) < max_jobs and time.time() < deadline:
+        job = queue.claim(worker_id, JOB_LEASE_SECONDS)
+        for expired_job in queue.take_expired():
+            try:
+                update_status(
+                    supabase,
+                    expired_job["project_id"],
+                    "error",
+                    0,
+                    (
+                        f"Analysis job {expired_job['id']} failed: lease expired on attempt "
+                        f"{expired_job.get('attempts')}/{expired_job.get('max_attempts')} "
+                        "(worker timed out or was killed; not retried)"
                     ),
+                    debug_level="ERROR",
                 )
-            update_status(supabase, project_id, "checking_spelling", 80,
-                          (
-                              "Spelling done: "
-                              f"{len(spelling_errors)} raw, {len(filtered_errors)} after filtering in {elapsed:.1f}s "
-                              f"(processed={len(subtitle_texts)}, workers={spellcheck_workers})"
-                          ),
-                          debug_lines=debug_lines)
-
-            # ── Step 5: Detect mismatches ───────────────────────────
-            t5 = time.time()
-            filtered_subs = build_filtered_subtitles(classified)
-            mismatches_to_process = min(len(filtered_subs), MISMATCH_MAX_SUBTITLES)
-            mismatch_words_source = "raw_words" if transcription_words else "segments_fallback"
-            update_status(
+            except Exception as status_error:
+                print(f"WARNING: could not mark project of expired job {expired_job['id']}: {status_error}", flush=True)
+        if job is None:
+            break
+        outcomes.append({
+            "job_id": job["id"],
+            "project_id": job["project_id"],
+            "outcome": process_job(supabase, queue, job, worker_id),
+        })
+    return {"worker_id": worker_id, "jobs": outcomes}
+
+
+# --- 11. Batch Analysis ---
+def _resolve_batch_items(supabase, data: dict) -> list[dict]:
+    """Normalize `projects` / `project_ids` from an analyze_batch request.
+
+    Items without a video_url are resolved from their Frame.io link when a
+    token is configured (cached, so repeats of one link cost no API calls),
+    falling back to the URL stored on the project.
+    """
+    items: list[dict] = []
+    seen: set[str] = set()
+    raw_items = data.get("projects")
+    if not isinstance(raw_items, list):
+        raw_items = [{"project_id": project_id} for project_id in (data.get("project_ids") or [])]
+    for raw_item in raw_items:
+        if not isinstance(raw_item, dict):
+            continue
+        project_id = read_string(raw_item.get("project_id"))
+        if not project_id or project_id in seen:
+            continue
+        seen.add(project_id)
+        items.append({
+            "project_id": project_id,
+            "video_url": read_string(raw_item.get("video_url")),
+            "frame_io_url": read_string(raw_item.get("frame_io_url")),
+            "incremental": raw_item.get("incremental"),
+            "expected_size_bytes": _read_size_bytes(raw_item.get("expected_size_bytes")),
+            "renditions": raw_item.get("renditions") if isinstance(raw_item.get("renditions"), list) else None,
+        })
+
+    missing_urls = [item["project_id"] for item in items if not item["video_url"]]
+    if missing_urls:
+        response = supabase.table("projects").select("id,video_url,frame_io_url").in_("id", missing_urls).execute()
+        rows = response.data if hasattr(response, "data") else []
+        row_by_id = {row.get("id"): row for row in rows or [] if isinstance(row, dict)}
+        for item in items:
+            if item["video_url"]:
+                continue
+            row = row_by_id.get(item["project_id"]) or {}
+            item["frame_io_url"] = item["frame_io_url"] or read_string(row.get("frame_io_url"))
+            if item["frame_io_url"] and FRAME_IO_TOKEN:
+                try:
+                    _apply_frame_io_source(item, fetch_video_from_frame_io(item["frame_io_url"]))
+                except Exception as frame_error:
+                    print(f"WARNING: Frame.io resolution failed for {item['project_id']}: {frame_error}", flush=True)
+            if not item["video_url"]:
+                item["video_url"] = read_string(row.get("video_url"))
+    return items
+
+
+def _apply_frame_io_source(item: dict, metadata: dict):
+    """Fill a request item's video URL, expected size and renditions from Frame.io metadata."""
+    item["video_url"] = metadata.get("video_url")
+    item["expected_size_bytes"] = item.get("expected_size_bytes") or metadata.get("file_size")
+    item["renditions"] = item.get("renditions") or metadata.get("renditions")
+
+
+def _defer_batch_item(supabase, item: dict, incremental: bool) -> dict:
+    """Hand a batch item that no longer fits the invocation to the job queue, or fail it visibly."""
+    project_id = item["project_id"]
+    if JOB_WORKER_ENABLED:
+        job = get_job_queue(supabase).enqueue(project_id, {
+            "video_url": item.get("video_url"),
+            "frame_io_url": item.get("frame_io_url"),
+            "incremental": incremental if item.get("incremental") is None else bool(item["incremental"]),
+            "expected_size_bytes": item.get("expected_size_bytes"),
+            "renditions": item.get("renditions"),
+        })
+        update_status(supabase, project_id, "pending", 0,
+                      f"Batch time budget reached; queued for a worker (job={job.get('id')})")
+        return {"project_id": project_id, "status": "queued", "job_id": job.get("id")}
+    update_status(supabase, project_id, "error", 0,
+                  "Not started: the batch ran out of time before this project. Re-run the analysis.",
+                  debug_level="ERROR")
+    return {"project_id": project_id, "status": "skipped"}
+
+
+def run_analysis_batch(
+    supabase,
+    items: list[dict],
+    max_concurrency: int = BATCH_MAX_CONCURRENT_PROJECTS,
+    incremental: bool = INCREMENTAL_ANALYSIS_ENABLED,
+    started_at: float | None = None,
+    time_budget_seconds: float = BATCH_TIME_BUDGET_SECONDS,
+) -> list[dict]:
+    """Analyze several projects in one invocation, `max_concurrency` at a time.
+
+    Projects overlap naturally: while one waits on Video Intelligence or STT,
+    another downloads or transcodes (transcodes are capped by
+    TRANSCODE_MAX_CONCURRENCY). The Supabase client, Google API clients, HTTP
+    pools, ffmpeg binary and spellcheck caches are shared across projects.
+    Each project keeps its own status and debug log; one failure does not stop
+    the others.
+
+    The invocation cannot outlive the function timeout, so a project only
+    starts while its estimated runtime (BATCH_ESTIMATED_PROJECT_SECONDS, or the
+    slowest project so far) still fits `time_budget_seconds`. The rest are
+    queued for a worker when one is configured, otherwise marked as errored.
+    """
+    reset_http_latency_stats()
+    deadline = (started_at if started_at is not None else time.time()) + time_budget_seconds
+    slowest_lock = threading.Lock()
+    slowest_seconds = BATCH_ESTIMATED_PROJECT_SECONDS
+    for position, item in enumerate(items, start=1):
+        update_status(supabase, item["project_id"], "pending", 0,
+                      f"Queued in batch ({position}/{len(items)})")
+
+    def _run_one(item: dict) -> dict:
+        nonlocal slowest_seconds
+        project_id = item["project_id"]
+        if time.time() + slowest_seconds > deadline:
+            try:
+                return _defer_batch_item(supabase, item, incremental)
+            except Exception as defer_error:
+                print(f"Failed to defer batch project {project_id}: {defer_error}", flush=True)
+                return {"project_id": project_id, "status": "error", "error": str(defer_error)}
+        debug_lines: list[str] = []
+        started_at = time.time()
+        try:
+            run_analysis(
                 supabase,
                 project_id,
-                "detecting_mismatches",
-                85,
-                (
-                    "Comparing subtitles against transcription "
-                    f"(total={len(filtered_subs)}, processed={mismatches_to_process}, "
-                    f"words_source={mismatch_words_source})..."
-                ),
+                item.get("video_url"),
+                incremental=incremental if item.get("incremental") is None else bool(item["incremental"]),
                 debug_lines=debug_lines,
+                started_at=started_at,
+                reset_http_stats=False,
+                expected_size_bytes=item.get("expected_size_bytes"),
+                renditions=item.get("renditions"),
             )
-            mismatches, mismatch_meta = detect_mismatches_fast_containment(
-                filtered_subs,
-                transcription_segments,
-                transcription_words=transcription_words,
-                max_subtitles=MISMATCH_MAX_SUBTITLES,
-            )
-            store_mismatches(supabase, project_id, mismatches)
-            elapsed = time.time() - t5
-            stage_durations["detecting_mismatches"] = elapsed
-            if mismatch_meta["cap_applied"]:
-                append_debug_log_line(
-                    supabase=supabase,
-                    project_id=project_id,
+            elapsed = time.time() - started_at
+            with slowest_lock:
+                slowest_seconds = max(slowest_seconds, elapsed)
+            return {"project_id": project_id, "status": "completed", "elapsed_seconds": round(elapsed, 1)}
+        except Exception as batch_error:
+            elapsed = time.time() - started_at
+            traceback.print_exc()
+            try:
+                update_status(
+                    supabase,
+                    project_id,
+                    "error",
+                    0,
+                    f"Pipeline failed after {elapsed:.1f}s: {batch_error}",
                     debug_lines=debug_lines,
-                    level="DEBUG",
-                    status="detecting_mismatches",
-                    progress=95,
-                    message=(
-                        "MISMATCH_SUBTITLE_CAP_APPLIED: "
-                        f"total={mismatch_meta['subtitles_total']} "
-                        f"processed={mismatch_meta['subtitles_processed']} "
-                        f"cap={MISMATCH_MAX_SUBTITLES}"
+                    debug_level="ERROR",
+                )
+            except Exception as db_err:
+                print(f"Failed to update error status in DB: {db_err}", flush=True)
+            return {"project_id": project_id, "status": "error", "elapsed_seconds": round(elapsed, 1), "error": str(batch_error)}
+
+    worker_count = max(1, min(max_concurrency, BATCH_MAX_CONCURRENT_PROJECTS, len(items)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="batch") as executor:
+        results = list(executor.map(_run_one, items))
+    print(f"Batch HTTP latency by host: {http_latency_summary()}", flush=True)
+    return results
+
+
+# --- 12. OCR Payload Classification ---
+def run_classify_ocr_payload(supabase, project_id: str | None, raw_ocr_payload: dict) -> dict:
+    """Re-run extraction, classification, sync report and spellcheck over a stored OCR payload."""
+    source_payload = raw_ocr_payload.get("raw_response") if isinstance(raw_ocr_payload.get("raw_response"), dict) else raw_ocr_payload
+    raw_detections = extract_detections_from_raw_payload(source_payload)
+    merged = merge_partial_sequences(raw_detections)
+    inferred_duration = max((d.get("end_time", 0) for d in merged), default=0.0)
+    classified = classify_subtitle_vs_fixed(merged, inferred_duration, debug_scores=True)
+    classified = classify_semantic_tags(classified)
+    classified = sorted(
+        classified,
+        key=lambda d: (
+            d.get("start_time", 0),
+            d.get("end_time", 0),
+            (d.get("text") or "").lower(),
+        ),
+    )
+
+    for index, det in enumerate(classified):
+        det["detection_id"] = f"det_{index:04d}"
+
+    filtered_subtitles = build_filtered_subtitles(classified)
+    filtered_subtitle_ids = {d.get("detection_id") for d in filtered_subtitles if d.get("detection_id")}
+    transcriptions_for_sync: list[dict] = []
+    transcription_words_for_sync: list[dict] = []
+    word_windows_for_sync: list[dict] = []
+    words_source = "segments_fallback"
+    if project_id:
+        storage_path = None
+        word_index_path = None
+        try:
+            project_meta_resp = (
+                supabase.table("projects")
+                .select("transcription_raw_storage_path,transcription_word_index_path")
+                .eq("id", project_id)
+                .limit(1)
+                .execute()
+            )
+            project_rows = project_meta_resp.data if hasattr(project_meta_resp, "data") else []
+            if isinstance(project_rows, list) and project_rows:
+                first_row = project_rows[0]
+                if isinstance(first_row, dict):
+                    storage_path = read_string(first_row.get("transcription_raw_storage_path"))
+                    word_index_path = read_string(first_row.get("transcription_word_index_path"))
+        except Exception as project_meta_error:
+            print(
+                f"WARNING: could not load transcription metadata for sync report (project_id={project_id}): {project_meta_error}",
+                flush=True,
+            )
+
+        # The word index is built from the raw words, so it replaces both the
+        # raw payload download and the transcription segments query.
+        if word_index_path:
+            word_windows_for_sync = load_transcription_word_index(project_id, word_index_path)
+            if word_windows_for_sync:
+                words_source = "raw_words"
+                print(f"  Sync report words loaded from index: {len(word_windows_for_sync)} tokens", flush=True)
+
+        if not word_windows_for_sync:
+            try:
+                transcriptions_query = (
+                    supabase.table("transcriptions")
+                    .select("text,start_time,end_time,speaker,confidence")
+                    .eq("project_id", project_id)
+                )
+                transcriptions_resp = (
+                    scope_to_run(transcriptions_query, get_active_run_id(supabase, project_id))
+                    .order("start_time", desc=False)
+                    .execute()
+                )
+                transcriptions_data = transcriptions_resp.data if hasattr(transcriptions_resp, "data") else []
+                if isinstance(transcriptions_data, list):
+                    transcriptions_for_sync = transcriptions_data
+            except Exception as transcriptions_error:
+                print(
+                    f"WARNING: could not load transcriptions for sync report (project_id={project_id}): {transcriptions_error}",
+                    flush=True,
+                )
+            try:
+                if storage_path:
+                    transcription_words_for_sync = load_transcription_raw_words(project_id, storage_path)
+                    if transcription_words_for_sync:
+                        words_source = "raw_words"
+            except Exception as transcription_raw_error:
+                print(
+                    (
+                        "WARNING: could not load transcription raw words for sync report "
+                        f"(project_id={project_id}): {transcription_raw_error}"
                     ),
+                    flush=True,
                 )
-            update_status(supabase, project_id, "detecting_mismatches", 95,
-                          (
-                              f"Mismatches done: {len(mismatches)} found in {elapsed:.1f}s "
-                              f"(processed={mismatch_meta['subtitles_processed']}, "
-                              f"words_source={mismatch_meta['words_source']})"
-                          ),
-                          debug_lines=debug_lines)
-
-            # ── Done ────────────────────────────────────────────────
-            total_elapsed = time.time() - t0
-            breakdown = ", ".join(
-                f"{stage}={duration:.1f}s"
-                for stage, duration in stage_durations.items()
+    sync_report = build_sync_report_window_containment(
+        subtitles=filtered_subtitles,
+        transcriptions=transcriptions_for_sync,
+        transcription_words=transcription_words_for_sync if transcription_words_for_sync else None,
+        window_before_seconds=CONTAINMENT_WINDOW_SECONDS_BEFORE,
+        window_after_seconds=CONTAINMENT_WINDOW_SECONDS_AFTER,
+        words_source=words_source,
+        word_windows=word_windows_for_sync or None,
+    )
+
+    spelling_input = [
+        {
+            "detection_id": d["detection_id"],
+            "text": d["text"],
+            "start_time": d["start_time"],
+        }
+        for d in filtered_subtitles
+    ]
+    spellcheck_checked_ids = {d["detection_id"] for d in spelling_input}
+    spelling_debug_by_detection_id: dict[str, list[dict]] = {}
+    spelling_stats: dict = {}
+    raw_spelling_errors = check_spelling(
+        spelling_input,
+        spelling_debug_by_detection_id,
+        stats=spelling_stats,
+        supabase=supabase,
+    )
+    filtered_spelling_errors = filter_false_positives(raw_spelling_errors, classified)
+
+    raw_spelling_by_detection_id: dict[str, list[dict]] = {}
+    for error in raw_spelling_errors:
+        detection_id = error.get("detection_id")
+        if detection_id:
+            raw_spelling_by_detection_id.setdefault(detection_id, []).append(error)
+
+    kept_spelling_by_detection_id: dict[str, list[dict]] = {}
+    for error in filtered_spelling_errors:
+        detection_id = error.get("detection_id")
+        if detection_id:
+            kept_spelling_by_detection_id.setdefault(detection_id, []).append(error)
+
+    audit_rows = build_testing_audit_rows(
+        classified,
+        filtered_subtitle_ids,
+        spellcheck_checked_ids,
+        raw_spelling_by_detection_id,
+        kept_spelling_by_detection_id,
+        spelling_debug_by_detection_id,
+    )
+
+    counts = {
+        "raw": len(raw_detections),
+        "merged": len(merged),
+        "subtitle": sum(1 for d in classified if d.get("is_subtitle")),
+        "fixed": sum(1 for d in classified if d.get("is_fixed_text")),
+        "partial": sum(1 for d in classified if d.get("is_partial_sequence")),
+        "filtered_subtitles": len(filtered_subtitles),
+        "brand_name": sum(1 for d in classified if "brand_name" in (d.get("semantic_tags") or [])),
+        "proper_name": sum(1 for d in classified if "proper_name" in (d.get("semantic_tags") or [])),
+        "spelling_checked": len(spelling_input),
+        "spelling_raw_matches": len(raw_spelling_errors),
+        "spelling_kept_matches": len(filtered_spelling_errors),
+        "spelling_with_error": sum(1 for row in audit_rows if row.get("spelling_status") == "error_detected"),
+        "spelling_filtered_out": sum(1 for row in audit_rows if row.get("spelling_status") == "error_filtered_out"),
+        "spelling_no_error": sum(1 for row in audit_rows if row.get("spelling_status") == "no_error"),
+        "spelling_unchecked": spelling_stats.get("unchecked", 0),
+        "spelling_failed": spelling_stats.get("failed", 0),
+    }
+
+    return {
+        "status": "ok",
+        "mode": "classify_ocr_payload",
+        "counts": counts,
+        "raw_detections": raw_detections,
+        "audit_rows": audit_rows,
+        "sync_report": sync_report,
+    }
+
+
+CLASSIFY_CACHE_KEY_VERSION = 1
+_classify_cache = _LruCache(CLASSIFY_CACHE_MAX_ENTRIES)
+_data_file_digests: dict[tuple, str] = {}
+
+
+def _data_file_digest(path: str) -> str:
+    """sha256 of a bundled data file, memoized per (path, size, mtime); "missing" if unreadable."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return "missing"
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _data_file_digests.get(key)
+    if digest is None:
+        hasher = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                hasher.update(block)
+        digest = _data_file_digests[key] = hasher.hexdigest()
+    return digest
+
+
+def classify_heuristics_version() -> str:
+    """Version stamp of the classify pipeline: its code, the constants it reads and its data.
+
+    Covers every module function and class (methods included) reachable from
+    `run_classify_ocr_payload`, inline thresholds included, the current value
+    of each referenced upper-case constant (MIN_SUBTITLE_CONFIDENCE,
+    containment windows, spellcheck settings, _CONTRACTION_SUFFIXES...) and the
+    digests of the spellcheck dictionary and its overrides. Any heuristic change
+    yields a new stamp.
+    """
+    code_stamp = behaviour_fingerprint("run_classify_ocr_payload")
+    dictionary_stamp = (
+        f"{_data_file_digest(SPELLCHECK_DICTIONARY_PATH)}+{_data_file_digest(SPELLCHECK_DICTIONARY_OVERRIDES_PATH)}"
+    )
+    return hashlib.sha256(
+        f"{CLASSIFY_CACHE_KEY_VERSION}|{code_stamp}|{dictionary_stamp}".encode("utf-8")
+    ).hexdigest()
+
+
+def _classify_project_state(supabase, project_id: str | None) -> str:
+    """Project inputs the classify result depends on (active transcription)."""
+    if not project_id:
+        return ""
+    response = (
+        supabase.table("projects")
+        .select("active_run_id,transcription_raw_generated_at,transcription_word_index_path")
+        .eq("id", project_id)
+        .limit(1)
+        .execute()
+    )
+    rows = response.data if hasattr(response, "data") else []
+    row = rows[0] if isinstance(rows, list) and rows and isinstance(rows[0], dict) else {}
+    return json.dumps([project_id, row.get("active_run_id"), row.get("transcription_raw_generated_at"),
+                       row.get("transcription_word_index_path")])
+
+
+def classify_payload_hash(raw_ocr_payload: dict) -> str:
+    payload_json = json.dumps(raw_ocr_payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload_json.encode("utf-8")).hexdigest()
+
+
+def classify_cache_key(payload_hash: str, project_state: str, heuristics_version: str) -> str:
+    return hashlib.sha256(f"{heuristics_version}|{project_state}|{payload_hash}".encode("utf-8")).hexdigest()
+
+
+# Stored results live at one object per project and payload hash, overwritten
+# in place; the full key inside tells whether it still matches the project
+# state and heuristics. Expired objects are deleted when read, and the run GC
+# drops the project's folder once a new run makes every entry stale.
+def _classify_cache_prefix(project_id: str) -> str:
+    return f"projects/{project_id}/ocr-raw/classify-cache/"
+
+
+def _classify_cache_object_url(project_id: str, payload_hash: str) -> str:
+    return f"{SUPABASE_URL}/storage/v1/object/ocr-raw/{_classify_cache_prefix(project_id)}{payload_hash}.json"
+
+
+def _storage_headers() -> dict:
+    return {"Authorization": f"Bearer {SUPABASE_SERVICE_KEY}", "apikey": SUPABASE_SERVICE_KEY}
+
+
+def _delete_classify_cache_objects(project_id: str, payload_hashes: list[str]):
+    if not payload_hashes:
+        return
+    prefix = _classify_cache_prefix(project_id)
+    response = http_request(
+        "DELETE",
+        f"{SUPABASE_URL}/storage/v1/object/ocr-raw",
+        headers=_storage_headers(),
+        json={"prefixes": [f"{prefix}{payload_hash}.json" for payload_hash in payload_hashes]},
+        timeout=30,
+    )
+    if response.status_code >= 400:
+        raise RuntimeError(f"classify cache delete failed (status={response.status_code})")
+
+
+def delete_classify_cache(project_id: str):
+    """Delete every stored classify result of a project (its entries are stale once a new run is active)."""
+    if not project_id or not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        return
+    response = http_post(
+        f"{SUPABASE_URL}/storage/v1/object/list/ocr-raw",
+        headers=_storage_headers(),
+        json={"prefix": _classify_cache_prefix(project_id), "limit": 1000, "offset": 0},
+        timeout=30,
+    )
+    if response.status_code >= 400:
+        raise RuntimeError(f"classify cache listing failed (status={response.status_code})")
+    entries = response.json()
+    names = [
+        str(entry["name"]) for entry in (entries if isinstance(entries, list) else [])
+        if isinstance(entry, dict) and str(entry.get("name") or "").endswith(".json")
+    ]
+    _delete_classify_cache_objects(project_id, [name[:-len(".json")] for name in names])
+
+
+def _load_persisted_classify_result(project_id: str, payload_hash: str, key: str) -> dict | None:
+    try:
+        response = http_get(
+            _classify_cache_object_url(project_id, payload_hash),
+            headers=_storage_headers(),
+            timeout=15,
+        )
+        if response.status_code >= 400:
+            return None
+        payload = response.json()
+    except Exception as error:
+        print(f"WARNING: classify cache read failed: {error}", flush=True)
+        return None
+    if not isinstance(payload, dict) or not isinstance(payload.get("result"), dict):
+        return None
+    try:
+        generated_at = datetime.fromisoformat(str(payload.get("generated_at")).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        generated_at = 0.0
+    if generated_at + CLASSIFY_CACHE_TTL_SECONDS <= time.time():
+        try:
+            _delete_classify_cache_objects(project_id, [payload_hash])
+        except Exception as delete_error:
+            print(f"WARNING: expired classify cache entry not deleted: {delete_error}", flush=True)
+        return None
+    # Stale entries (other heuristics or project state) are overwritten by the recompute.
+    return payload["result"] if payload.get("key") == key else None
+
+
+def _classify_result_complete(result: dict) -> bool:
+    """False when spellcheck left texts unchecked or failed; such results are not cached."""
+    counts = result.get("counts") or {}
+    return not counts.get("spelling_unchecked") and not counts.get("spelling_failed")
+
+
+def _persist_classify_result(project_id: str, payload_hash: str, key: str, heuristics_version: str, result: dict):
+    body = json.dumps({
+        "version": 2,
+        "key": key,
+        "heuristics_version": heuristics_version,
+        "generated_at": _utc_timestamp_iso(),
+        "result": result,
+    }, ensure_ascii=False, default=str).encode("utf-8")
+    try:
+        response = http_post(
+            _classify_cache_object_url(project_id, payload_hash),
+            headers={
+                **_storage_headers(),
+                "x-upsert": "true",
+                "Content-Type": "application/json",
+            },
+            data=body,
+            timeout=30,
+        )
+        if response.status_code >= 400:
+            print(f"WARNING: classify cache write failed (status={response.status_code})", flush=True)
+    except Exception as error:
+        print(f"WARNING: classify cache write failed: {error}", flush=True)
+
+
+def classify_ocr_payload_cached(
+    supabase,
+    project_id: str | None,
+    raw_ocr_payload: dict,
+    use_cache: bool = True,
+) -> dict:
+    """`run_classify_ocr_payload` behind a result cache; the response reports cache use.
+
+    Results are keyed on the payload hash, the project's active transcription and
+    `classify_heuristics_version()`, kept in memory and, for projects, in the
+    ocr-raw bucket so other instances can serve them, for up to
+    CLASSIFY_CACHE_TTL_SECONDS. Results where spellcheck did not cover every
+    subtitle are returned but never stored. `use_cache=False` forces a
+    recompute (the fresh result is still stored).
+    """
+    if not CLASSIFY_CACHE_ENABLED:
+        return {**run_classify_ocr_payload(supabase, project_id, raw_ocr_payload), "cache": {"hit": False}}
+
+    started_at = time.time()
+    heuristics_version = classify_heuristics_version()
+    try:
+        project_state = _classify_project_state(supabase, project_id)
+    except Exception as state_error:
+        print(f"WARNING: classify cache disabled for this call: {state_error}", flush=True)
+        return {**run_classify_ocr_payload(supabase, project_id, raw_ocr_payload), "cache": {"hit": False}}
+    payload_hash = classify_payload_hash(raw_ocr_payload)
+    key = classify_cache_key(payload_hash, project_state, heuristics_version)
+    persistent = CLASSIFY_CACHE_PERSISTENT and bool(project_id) and bool(SUPABASE_URL and SUPABASE_SERVICE_KEY)
+    cache_info = {"key": key[:16], "heuristics_version": heuristics_version[:12]}
+
+    if use_cache:
+        source = "memory"
+        entry = _classify_cache.get(key)
+        result = entry[1] if entry and entry[0] > time.time() else None
+        if result is None and persistent:
+            source = "storage"
+            result = _load_persisted_classify_result(project_id, payload_hash, key)
+            if result is not None:
+                _classify_cache.put(key, (time.time() + CLASSIFY_CACHE_TTL_SECONDS, result))
+        if result is not None:
+            print(f"  classify_ocr_payload served from {source} cache in {time.time() - started_at:.2f}s", flush=True)
+            return {**result, "cache": {**cache_info, "hit": True, "source": source}}
+
+    result = run_classify_ocr_payload(supabase, project_id, raw_ocr_payload)
+    stored = _classify_result_complete(result)
+    if stored:
+        _classify_cache.put(key, (time.time() + CLASSIFY_CACHE_TTL_SECONDS, result))
+        if persistent:
+            _persist_classify_result(project_id, payload_hash, key, heuristics_version, result)
+    else:
+        print(
+            f"  classify_ocr_payload result not cached: spellcheck incomplete "
+            f"(unchecked={result['counts'].get('spelling_unchecked')}, failed={result['counts'].get('spelling_failed')})",
+            flush=True,
+        )
+    return {**result, "cache": {**cache_info, "hit": False, "source": None, "stored": stored}}
+
+
+# --- Main Cloud Function Entry Point ---
+@functions_framework.http
+def analyze_video(request):
+    """HTTP Cloud Function: orchestrates the full video analysis pipeline.
+
+    Modes: "analyze" runs the pipeline inside the request, "analyze_batch" runs
+    several projects concurrently in one invocation, "enqueue" records a
+    job and returns 202, "worker" claims and runs queued jobs (invoked by the
+    Cloud Scheduler job from schedule_worker.sh; "enqueue" is refused until
+    JOB_WORKER_ENABLED says one exists), and "classify_ocr_payload" is the OCR
+    testing endpoint.
+    """
+    t0 = time.time()
+    print("=" * 60, flush=True)
+    print("analyze_video STARTED", flush=True)
+
+    # IAM auth on the Cloud Run service is the primary gatekeeper.
+    if CLOUD_FUNCTION_SECRET:
+        secret_header = request.headers.get("X-Function-Secret", "")
+        if secret_header != CLOUD_FUNCTION_SECRET:
+            print("WARNING: X-Function-Secret mismatch; relying on IAM auth", flush=True)
+
+    data = request.get_json(silent=True)
+    if not data:
+        return {"error": "Missing request body"}, 400
+
+    mode = data.get("mode", "analyze")
+    project_id = data.get("project_id")
+    video_url = data.get("video_url")
+    frame_io_url = data.get("frame_io_url")
+    raw_ocr_payload = data.get("raw_ocr_payload")
+    incremental = data.get("incremental")
+    incremental = INCREMENTAL_ANALYSIS_ENABLED if incremental is None else bool(incremental)
+    expected_size_bytes = _read_size_bytes(data.get("expected_size_bytes"))
+    renditions = data.get("renditions") if isinstance(data.get("renditions"), list) else None
+
+    print(f"project_id: {project_id}", flush=True)
+    print(f"mode: {mode}", flush=True)
+    print(f"video_url:  {(video_url or '')[:120]}", flush=True)
+    print(f"frame_io_url: {frame_io_url}", flush=True)
+
+    if mode not in ("analyze", "analyze_batch", "classify_ocr_payload", "enqueue", "worker"):
+        return {"error": f"Unsupported mode: {mode}"}, 400
+
+    if mode in ("analyze", "enqueue") and not project_id:
+        return {"error": "Missing project_id"}, 400
+    if mode == "classify_ocr_payload" and not isinstance(raw_ocr_payload, dict):
+        return {"error": "Missing or invalid raw_ocr_payload", "error_code": "invalid_payload"}, 400
+
+    supabase = get_supabase()
+    debug_lines: list[str] = []
+
+    try:
+        if mode == "analyze" and not video_url and frame_io_url and FRAME_IO_TOKEN:
+            source = {"expected_size_bytes": expected_size_bytes, "renditions": renditions}
+            _apply_frame_io_source(source, fetch_video_from_frame_io(frame_io_url))
+            video_url = source["video_url"]
+            expected_size_bytes = source["expected_size_bytes"]
+            renditions = source["renditions"]
+
+        if mode == "enqueue":
+            if not JOB_WORKER_ENABLED:
+                # Without a worker the job would sit in "queued" and the project in "pending" forever.
+                return {
+                    "error": "Analysis queue has no worker configured (set JOB_WORKER_ENABLED after scheduling mode=worker)",
+                    "error_code": "queue_worker_not_configured",
+                }, 503
+            job = get_job_queue(supabase).enqueue(project_id, {
+                "video_url": video_url,
+                "frame_io_url": frame_io_url,
+                "incremental": incremental,
+                "expected_size_bytes": expected_size_bytes,
+                "renditions": renditions,
+            })
+            update_status(supabase, project_id, "pending", 0,
+                          f"Queued for analysis (job={job.get('id')})", debug_lines=debug_lines)
+            return {"status": "queued", "project_id": project_id, "job_id": job.get("id")}, 202
+
+        if mode == "analyze_batch":
+            items = _resolve_batch_items(supabase, data)
+            if not items:
+                return {"error": "Missing projects / project_ids"}, 400
+            if len(items) > BATCH_MAX_PROJECTS:
+                return {"error": f"Too many projects in batch ({len(items)} > {BATCH_MAX_PROJECTS})"}, 400
+            try:
+                max_concurrency = _read_bounded_int(
+                    data.get("max_concurrency"),
+                    BATCH_MAX_CONCURRENT_PROJECTS,
+                    1,
+                    BATCH_MAX_CONCURRENT_PROJECTS,
+                )
+            except ValueError as invalid:
+                return {"error": f"Invalid max_concurrency: {invalid}"}, 400
+            results = run_analysis_batch(
+                supabase,
+                items,
+                max_concurrency=max_concurrency,
+                incremental=incremental,
+                started_at=t0,
             )
-            update_status(
+            total_elapsed = time.time() - t0
+            print(f"analyze_batch COMPLETED {len(results)} projects in {total_elapsed:.1f}s", flush=True)
+            return {
+                "status": "completed",
+                "mode": "analyze_batch",
+                "completed": sum(1 for r in results if r["status"] == "completed"),
+                "failed": sum(1 for r in results if r["status"] == "error"),
+                "deferred": sum(1 for r in results if r["status"] in ("queued", "skipped")),
+                "elapsed_seconds": round(total_elapsed, 1),
+                "projects": results,
+            }, 200
+
+        if mode == "worker":
+            try:
+                max_jobs = _read_bounded_int(data.get("max_jobs"), WORKER_MAX_JOBS, 1, WORKER_MAX_JOBS_LIMIT)
+            except ValueError as invalid:
+                return {"error": f"Invalid max_jobs: {invalid}"}, 400
+            summary = run_worker(supabase, get_job_queue(supabase), max_jobs=max_jobs)
+            return {"status": "ok", "mode": "worker", **summary}, 200
+
+        if mode == "classify_ocr_payload":
+            result = classify_ocr_payload_cached(
                 supabase,
                 project_id,
-                "completed",
-                100,
-                f"Analysis completed in {total_elapsed:.1f}s ({breakdown})",
-                debug_lines=debug_lines,
+                raw_ocr_payload,
+                use_cache=data.get("cache") is not False,
             )
-            print(f"analyze_video COMPLETED in {total_elapsed:.1f}s", flush=True)
-            print("=" * 60, flush=True)
+            return result, 200
 
+        run_analysis(
+            supabase,
+            project_id,
+            video_url,
+            incremental=incremental,
+            debug_lines=debug_lines,
+            started_at=t0,
+            expected_size_bytes=expected_size_bytes,
+            renditions=renditions,
+        )
         return {"status": "completed", "project_id": project_id}, 200
 
     except Exception as e:
@@ -0,0 +1,35 @@
+#!/usr/bin/env bash
+# Creates (or updates) the Cloud Scheduler job that drains the analysis queue by
+# calling the function with {"mode": "worker"} every minute. Run it once per
+# environment, then set JOB_WORKER_ENABLED=true on the function and
+# CLOUD_FUNCTION_ANALYZE_QUEUE=true on the web app.
+#
+# Usage: FUNCTION_URL=https://REGION-PROJECT.cloudfunctions.net/analyze-video \
+#        INVOKER_SA=scheduler-invoker@PROJECT.iam.gserviceaccount.com \
+#        REGION=us-central1 ./schedule_worker.sh
+set -euo pipefail
+
+: "${FUNCTION_URL:?FUNCTION_URL is required}"
+: "${INVOKER_SA:?INVOKER_SA (service account with run.invoker) is required}"
+REGION="${REGION:-us-central1}"
+JOB_NAME="${JOB_NAME:-analyze-video-worker}"
+SCHEDULE="${SCHEDULE:-* * * * *}"
+BODY='{"mode":"worker"}'
+
+args=(
+  --location="$REGION"
+  --schedule="$SCHEDULE"
+  --uri="$FUNCTION_URL"
+  --http-method=POST
+  --headers="Content-Type=application/json"
+  --message-body="$BODY"
+  --oidc-service-account-email="$INVOKER_SA"
+  --oidc-token-audience="$FUNCTION_URL"
+  --attempt-deadline=540s
+)
+
+if gcloud scheduler jobs describe "$JOB_NAME" --location="$REGION" >/dev/null 2>&1; then
+  gcloud scheduler jobs update http "$JOB_NAME" "${args[@]}"
+else
+  gcloud scheduler jobs create http "$JOB_NAME" "${args[@]}"
+fi
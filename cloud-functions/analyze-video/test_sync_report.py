@@ -1,8 +1,14 @@
 import importlib.util
+import os
 import pathlib
+import random
 import sys
+import tempfile
+import threading
+import time
 import types
 import unittest
+from unittest import mock
 
 
 def _install_dependency_stubs():
@@ -112,6 +118,29 @@ class SyncReportTests(unittest.TestCase):
         self.assertEqual(MAIN._levenshtein_distance("kitten", "sitting"), 3)
         self.assertEqual(MAIN._levenshtein_distance("sync", "sync"), 0)
 
+    def test_levenshtein_distance_matches_reference_dp(self):
+        def reference(a, b):
+            prev = list(range(len(b) + 1))
+            for i, ca in enumerate(a, start=1):
+                curr = [i]
+                for j, cb in enumerate(b, start=1):
+                    curr.append(min(curr[j - 1] + 1, prev[j] + 1, prev[j - 1] + (ca != cb)))
+                prev = curr
+            return prev[-1]
+
+        rng = random.Random(26)
+        for _ in range(400):
+            alphabet = rng.choice(["ab", "abc ", "abcdefghij klmnop"])
+            a = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 150)))
+            b = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 150)))
+            self.assertEqual(MAIN._levenshtein_distance(a, b), reference(a, b), (a, b))
+
+    def test_levenshtein_distance_max_distance_cutoff(self):
+        self.assertEqual(MAIN._levenshtein_distance("kitten", "sitting", max_distance=3), 3)
+        self.assertEqual(MAIN._levenshtein_distance("kitten", "sitting", max_distance=2), 3)
+        self.assertEqual(MAIN._levenshtein_distance("a", "a" * 80, max_distance=5), 6)
+        self.assertEqual(MAIN._levenshtein_distance("", "abc", max_distance=10), 3)
+
     def test_detect_subtitle_overlaps(self):
         subtitles = [
             {"text": "a", "start_time": 0.0, "end_time": 1.0},
@@ -123,6 +152,34 @@ class SyncReportTests(unittest.TestCase):
         self.assertEqual(overlaps[0]["subtitle_indices"], [0, 1])
         self.assertEqual(overlaps[0]["texts"], ["a", "b"])
 
+    def test_detect_subtitle_overlaps_matches_pairwise_scan(self):
+        def pairwise(subtitles):
+            found = []
+            for i, first in enumerate(subtitles):
+                a_start, a_end = first["start_time"], first["end_time"]
+                if a_end <= a_start:
+                    continue
+                for j in range(i + 1, len(subtitles)):
+                    b_start, b_end = subtitles[j]["start_time"], subtitles[j]["end_time"]
+                    if b_end <= b_start:
+                        continue
+                    if min(a_end, b_end) > max(a_start, b_start):
+                        found.append([i, j])
+            return found
+
+        rng = random.Random(27)
+        for _ in range(50):
+            subtitles = []
+            for n in range(rng.randint(0, 60)):
+                start = round(rng.uniform(0, 30), 1)
+                subtitles.append({
+                    "text": f"line {n}",
+                    "start_time": start,
+                    "end_time": round(start + rng.uniform(-0.5, 3.0), 1),
+                })
+            overlaps = MAIN._detect_subtitle_overlaps(subtitles)
+            self.assertEqual([o["subtitle_indices"] for o in overlaps], pairwise(subtitles))
+
     def test_build_sync_report_thresholds(self):
         subtitles = [
             {"text": "so reality check", "start_time": 0.0, "end_time": 1.0},
@@ -166,6 +223,29 @@ class SyncReportTests(unittest.TestCase):
         self.assertEqual(mismatches[0]["severity"], "high")
         self.assertEqual(mismatches[0]["subtitle_text"], "nothing matches")
 
+    def test_collect_word_windows_by_start_time_index(self):
+        windows = [
+            {"token": str(i), "raw": str(i), "start_time": i * 0.25, "end_time": i * 0.25 + 0.2}
+            for i in range(40)
+        ]
+        start_times = MAIN._word_window_start_times(windows)
+        for start, end in [(0.0, 1.0), (0.3, 2.6), (9.5, 20.0), (2.0, 2.0)]:
+            self.assertEqual(
+                MAIN._collect_word_windows_by_start_time(start, end, windows, start_times),
+                MAIN._collect_word_windows_by_start_time(start, end, windows),
+            )
+
+    def test_detect_mismatches_fast_containment_processes_all_subtitles(self):
+        subtitles = [
+            {"text": "hello world", "start_time": float(i), "end_time": float(i) + 1.0}
+            for i in range(600)
+        ]
+        transcriptions = [{"text": "hello world", "start_time": 0.0, "end_time": 1.0}]
+        mismatches, meta = MAIN.detect_mismatches_fast_containment(subtitles, transcriptions)
+        self.assertEqual(meta["subtitles_processed"], 600)
+        self.assertFalse(meta["budget_exhausted"])
+        self.assertEqual(len(mismatches), 598)
+
     def test_build_sync_report_smoke_shape(self):
         report = MAIN.build_sync_report(
             subtitles=[{"text": "hello", "start_time": 0.0, "end_time": 1.0}],
@@ -178,5 +258,1434 @@ class SyncReportTests(unittest.TestCase):
         self.assertEqual(report["summary"]["total_subtitles"], 1)
 
 
+class HttpSessionTests(unittest.TestCase):
+    def test_http_latency_summary_by_host(self):
+        MAIN.reset_http_latency_stats()
+        for elapsed in (0.01, 0.02, 0.2, 3.0):
+            MAIN._record_http_latency("https://api.api-ninjas.com/v1/spellcheck", elapsed)
+        MAIN._record_http_latency("https://api.frame.io/v4/accounts", 0.4)
+        summary = MAIN.http_latency_summary()
+        self.assertEqual(
+            summary,
+            "api.api-ninjas.com n=4 p50<=0.05s p95<=5s; api.frame.io n=1 p50<=0.5s p95<=0.5s",
+        )
+        MAIN.reset_http_latency_stats()
+        self.assertEqual(MAIN.http_latency_summary(), "")
+
+
+class _FakeQuery:
+    def __init__(self, table):
+        self.table = table
+        self.keys = None
+
+    def select(self, *_args):
+        return self
+
+    def in_(self, _column, keys):
+        self.keys = keys
+        return self
+
+    def upsert(self, rows, **_kwargs):
+        for row in rows:
+            self.table.rows[row["cache_key"]] = row
+        return self
+
+    def execute(self):
+        data = [row for key, row in self.table.rows.items() if self.keys is None or key in self.keys]
+        return types.SimpleNamespace(data=data)
+
+
+class _FakeTable:
+    def __init__(self):
+        self.rows = {}
+
+
+class _FakeSupabase:
+    def __init__(self):
+        self.tables = {}
+
+    def table(self, name):
+        return _FakeQuery(self.tables.setdefault(name, _FakeTable()))
+
+
+class AsyncOutboundEngineTests(unittest.TestCase):
+    def test_token_bucket_limits_rate(self):
+        async def acquire_all():
+            bucket = MAIN._AsyncTokenBucket(rate=50.0, capacity=2)
+            started = MAIN.time.monotonic()
+            for _ in range(7):
+                await bucket.acquire()
+            return MAIN.time.monotonic() - started
+
+        elapsed = MAIN.asyncio.run(acquire_all())
+        self.assertGreaterEqual(elapsed, 0.09)
+
+    @unittest.skipUnless(importlib.util.find_spec("httpx"), "httpx not installed")
+    def test_request_retries_throttled_responses(self):
+        import httpx
+
+        statuses = [429, 503, 200]
+
+        def handler(request):
+            return httpx.Response(statuses.pop(0), json={"ok": True}, headers={"Retry-After": "0"})
+
+        engine = MAIN.AsyncOutboundEngine(max_concurrency=2)
+        engine._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with mock.patch.object(MAIN, "HTTP_RETRY_BACKOFF_SECONDS", 0.0):
+            response = engine.run(engine.request("GET", "https://example.test/x"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(statuses, [])
+
+    def test_check_spelling_async_mode(self):
+        async def fake_fetch(text):
+            return [{"word": "teh", "correction": "the"}] if "teh" in text.split() else [], {"status_code": 200}
+
+        MAIN._spellcheck_memory_cache.clear()
+        texts = [
+            {"detection_id": "det_0000", "text": "teh xqz", "start_time": 0.0},
+            {"detection_id": "det_0001", "text": "xqz day", "start_time": 1.0},
+        ]
+        stats = {}
+        with mock.patch.object(MAIN, "SPELLCHECK_API_KEY", "key"), \
+                mock.patch.object(MAIN, "OUTBOUND_IO_MODE", "async"), \
+                mock.patch.object(MAIN, "_fetch_spellcheck_corrections_async", side_effect=fake_fetch):
+            errors = MAIN.check_spelling(texts, stats=stats)
+        self.assertEqual([e["detection_id"] for e in errors], ["det_0000"])
+        self.assertEqual(stats["requests"], 1)
+
+
+class SpellcheckTests(unittest.TestCase):
+    def setUp(self):
+        MAIN._spellcheck_memory_cache.clear()
+    def test_check_spelling_deduplicates_and_fans_out(self):
+        calls = []
+
+        def fake_fetch(text):
+            calls.append(text)
+            return [{"word": "teh", "correction": "the"}], {"request_text": text}
+
+        texts = [
+            {"detection_id": "det_0000", "text": "teh end", "start_time": 1.0},
+            {"detection_id": "det_0001", "text": "Teh end", "start_time": 2.0},
+            {"detection_id": "det_0002", "text": "teh end!", "start_time": 3.0},
+        ]
+        stats = {}
+        with mock.patch.object(MAIN, "SPELLCHECK_API_KEY", "key"), \
+                mock.patch.object(MAIN, "SPELLCHECK_BATCH_ENABLED", False), \
+                mock.patch.object(MAIN, "_fetch_spellcheck_corrections", side_effect=fake_fetch):
+            errors = MAIN.check_spelling(texts, stats=stats)
+
+        self.assertEqual(sorted(calls), ["Teh end", "teh end"])
+        self.assertEqual([e["detection_id"] for e in errors], ["det_0000", "det_0001", "det_0002"])
+        self.assertEqual([e["timestamp"] for e in errors], [1.0, 2.0, 3.0])
+        self.assertEqual(stats["unique_texts"], 2)
+        self.assertEqual(stats["unchecked"], 0)
+
+    def test_check_spelling_reports_failed_texts(self):
+        def fake_fetch(text):
+            if text == "broken line":
+                return None, {"status_code": 400}
+            return [], {"status_code": 200}
+
+        texts = [
+            {"detection_id": "det_0000", "text": "good line", "start_time": 0.0},
+            {"detection_id": "det_0001", "text": "broken line", "start_time": 1.0},
+        ]
+        stats = {}
+        with mock.patch.object(MAIN, "SPELLCHECK_API_KEY", "key"), \
+                mock.patch.object(MAIN, "SPELLCHECK_LOCAL_FILTER_ENABLED", False), \
+                mock.patch.object(MAIN, "SPELLCHECK_BATCH_ENABLED", False), \
+                mock.patch.object(MAIN, "_fetch_spellcheck_corrections", side_effect=fake_fetch):
+            MAIN.check_spelling(texts, stats=stats)
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["unchecked"], 0)
+        self.assertEqual(stats["unverified_indices"], [1])
+
+    def test_check_spelling_uses_memory_and_persistent_cache(self):
+        fetch = mock.Mock(return_value=([{"word": "teh", "correction": "the"}], {}))
+        supabase = _FakeSupabase()
+        texts = [{"detection_id": "det_0000", "text": "teh end", "start_time": 0.0}]
+        with mock.patch.object(MAIN, "SPELLCHECK_API_KEY", "key"), \
+                mock.patch.object(MAIN, "_fetch_spellcheck_corrections", fetch):
+            MAIN.check_spelling(texts, supabase=supabase)
+            self.assertEqual(fetch.call_count, 1)
+            self.assertEqual(len(supabase.tables["spellcheck_cache"].rows), 1)
+
+            stats = {}
+            MAIN.check_spelling(texts, supabase=supabase, stats=stats)
+            self.assertEqual(stats["memory_cache_hits"], 1)
+
+            MAIN._spellcheck_memory_cache.clear()
+            debug = {}
+            stats = {}
+            errors = MAIN.check_spelling(texts, debug, supabase=supabase, stats=stats)
+            self.assertEqual(stats["persistent_cache_hits"], 1)
+            self.assertEqual(stats["requests"], 0)
+
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(errors[0]["suggested_text"], "the")
+        self.assertEqual(debug["det_0000"][0]["cache"], "persistent")
+
+    def test_pack_spellcheck_batches_respects_max_chars(self):
+        batches = MAIN._pack_spellcheck_batches(["a" * 10, "b" * 10, "c" * 10, "d" * 40], 30)
+        self.assertEqual(batches, [["a" * 10, "b" * 10], ["c" * 10], ["d" * 40]])
+
+    def test_split_batch_corrections_by_offsets(self):
+        texts = ["teh end", "good day", "recieve teh gift"]
+        corrections = [
+            {"word": "teh", "correction": "the"},
+            {"word": "recieve", "correction": "receive"},
+            {"word": "teh", "correction": "the"},
+        ]
+        assigned, ambiguous = MAIN._split_batch_corrections(texts, corrections)
+        self.assertEqual(ambiguous, set())
+        self.assertEqual([c["word"] for c in assigned["teh end"]], ["teh"])
+        self.assertEqual(assigned["good day"], [])
+        self.assertEqual([c["word"] for c in assigned["recieve teh gift"]], ["teh", "recieve"])
+
+        assigned, ambiguous = MAIN._split_batch_corrections(texts, corrections[:1])
+        self.assertEqual(ambiguous, {"teh end", "recieve teh gift"})
+        self.assertEqual(set(assigned), {"good day"})
+
+    def test_check_spelling_batches_and_falls_back_when_ambiguous(self):
+        def fake_fetch(text):
+            found = [{"word": w, "correction": "the"} for w in text.split() if w == "teh"]
+            return found[:1], {"status_code": 200}
+
+        texts = [
+            {"detection_id": "det_0000", "text": "teh end", "start_time": 0.0},
+            {"detection_id": "det_0001", "text": "teh start", "start_time": 1.0},
+            {"detection_id": "det_0002", "text": "xqz day", "start_time": 2.0},
+        ]
+        stats = {}
+        with mock.patch.object(MAIN, "SPELLCHECK_API_KEY", "key"), \
+                mock.patch.object(MAIN, "_fetch_spellcheck_corrections", side_effect=fake_fetch) as fetch:
+            errors = MAIN.check_spelling(texts, stats=stats, max_workers=1)
+
+        self.assertEqual(fetch.call_args_list[0].args[0], "teh end ||| teh start ||| xqz day")
+        self.assertEqual(sorted(c.args[0] for c in fetch.call_args_list[1:]), ["teh end", "teh start"])
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual([e["detection_id"] for e in errors], ["det_0000", "det_0001"])
+
+    def test_adaptive_limiter_grows_and_halves(self):
+        limiter = MAIN.AdaptiveConcurrencyLimiter(initial=4, minimum=1, maximum=8, latency_target=1.0)
+        for _ in range(20):
+            limiter.acquire()
+            limiter.release(200, 0.1)
+        self.assertGreater(limiter.limit, 5)
+
+        grown = limiter.limit
+        limiter.acquire()
+        limiter.release(429, 0.1)
+        self.assertAlmostEqual(limiter.limit, grown / 2)
+        # A second throttle inside the same window does not halve again.
+        limiter.acquire()
+        limiter.release(429, 0.1)
+        self.assertAlmostEqual(limiter.limit, grown / 2)
+        self.assertEqual(limiter.snapshot()["throttle_events"], 2)
+
+    def test_workers_blocked_on_limiter_send_nothing_after_budget(self):
+        limiter = MAIN.AdaptiveConcurrencyLimiter(initial=1, minimum=1, maximum=1, latency_target=1.0)
+        self.assertTrue(limiter.acquire())  # hold the only slot so every worker waits in acquire()
+        results = []
+        with mock.patch.object(MAIN, "_fetch_spellcheck_corrections", return_value=([], {"status_code": 200})) as fetch:
+            exhausted = MAIN._run_spellcheck_batches_threaded(
+                [["one"], ["two"], ["three"]], 3, 0.2, lambda batch, count: results.append(batch), limiter,
+            )
+            time.sleep(0.1)
+            limiter.release(200, 0.1)
+            time.sleep(0.1)
+        self.assertTrue(exhausted)
+        # Workers that gave up report nothing, so their texts count as unchecked.
+        self.assertTrue(all(batch == {} for batch in results))
+        fetch.assert_not_called()
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertFalse(limiter.acquire(deadline=time.time() - 1))
+
+    def test_check_spelling_retries_throttled_texts(self):
+        attempts = {}
+
+        def fake_fetch(text):
+            attempts[text] = attempts.get(text, 0) + 1
+            if text == "teh end" and attempts[text] == 1:
+                return None, {"status_code": 429}
+            return [{"word": "teh", "correction": "the"}], {"status_code": 200}
+
+        texts = [{"detection_id": "det_0000", "text": "teh end", "start_time": 0.0}]
+        stats = {}
+        with mock.patch.object(MAIN, "SPELLCHECK_API_KEY", "key"), \
+                mock.patch.object(MAIN, "HTTP_RETRY_BACKOFF_SECONDS", 0.0), \
+                mock.patch.object(MAIN, "_fetch_spellcheck_corrections", side_effect=fake_fetch):
+            errors = MAIN.check_spelling(texts, stats=stats)
+
+        self.assertEqual(attempts["teh end"], 2)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(stats["throttle_events"], 1)
+        self.assertEqual(stats["throttle_retries"], 1)
+        self.assertEqual(stats["unchecked"], 0)
+
+
+class IncrementalAnalysisTests(unittest.TestCase):
+    @staticmethod
+    def _subtitle(text, start, end):
+        return {
+            "text": text,
+            "start_time": start,
+            "end_time": end,
+            "bbox": {"top": 0.8, "left": 0.1, "bottom": 0.9, "right": 0.9},
+            "confidence": 0.99,
+            "is_subtitle": True,
+            "is_fixed_text": False,
+            "is_partial_sequence": False,
+        }
+
+    def test_diff_matches_on_text_and_time(self):
+        previous = [self._subtitle("Hello there", 1.0, 2.0), self._subtitle("Hello there", 5.0, 6.0)]
+        current = [
+            self._subtitle("hello there!", 5.2, 6.1),
+            self._subtitle("Hello there", 9.0, 10.0),
+            self._subtitle("Brand new line", 1.0, 2.0),
+        ]
+        matched, changed = MAIN.diff_subtitles_against_previous(current, previous, tolerance_seconds=0.5)
+        self.assertIs(matched[0], previous[1])
+        self.assertEqual(changed, [1, 2])
+
+    def test_plan_carries_forward_unchanged_lines(self):
+        previous = {
+            "detections": [self._subtitle("teh end", 1.0, 2.0), self._subtitle("Good day", 4.0, 5.0)],
+            "transcriptions": [
+                {"text": "the end", "start_time": 1.0, "end_time": 2.0},
+                {"text": "good night", "start_time": 4.0, "end_time": 5.0},
+            ],
+            "spelling_errors": [{
+                "source": "subtitle",
+                "original_text": "teh",
+                "suggested_text": "the",
+                "context": "teh end",
+                "timestamp": 1.0,
+                "rule_id": "API_NINJAS_SPELLCHECK",
+                "is_false_positive": True,
+            }],
+            "mismatches": [{
+                "subtitle_text": "Good day",
+                "transcription_text": "good night",
+                "start_time": 4.0,
+                "end_time": 5.0,
+                "severity": "high",
+                "mismatch_type": "subtitle_not_contained_in_window",
+                "is_dismissed": False,
+            }],
+            "coverage": {"run_id": "run-1", "spellcheck_unchecked": [], "mismatch_unchecked": []},
+        }
+        current = [
+            self._subtitle("teh end", 1.1, 2.1),
+            self._subtitle("Good day", 4.0, 5.0),
+            self._subtitle("Extra line", 20.0, 21.0),
+        ]
+        transcriptions = [
+            {"text": "the end", "start_time": 1.1, "end_time": 2.1},
+            {"text": "good day", "start_time": 4.0, "end_time": 5.0},
+        ]
+        plan = MAIN.plan_incremental_analysis(current, transcriptions, previous)
+
+        self.assertEqual([s["text"] for s in plan["spellcheck_subtitles"]], ["Extra line"])
+        self.assertEqual([s["text"] for s in plan["mismatch_subtitles"]], ["Good day", "Extra line"])
+        self.assertEqual(len(plan["carried_spelling_errors"]), 1)
+        carried = plan["carried_spelling_errors"][0]
+        self.assertEqual(carried["timestamp"], 1.1)
+        self.assertTrue(carried["is_false_positive"])
+        self.assertTrue(carried["has_replacement"])
+        self.assertEqual(plan["carried_mismatches"], [])
+        self.assertEqual(plan["stats"]["unchanged"], 2)
+        self.assertEqual(plan["stats"]["removed"], 0)
+
+    def _previous(self, coverage):
+        return {
+            "detections": [self._subtitle("Call one now", 1.0, 2.0), self._subtitle("Good day", 4.0, 5.0)],
+            "transcriptions": [],
+            "spelling_errors": [],
+            "mismatches": [],
+            "coverage": coverage,
+        }
+
+    def test_plan_rechecks_lines_the_previous_run_did_not_check(self):
+        coverage = MAIN.build_run_coverage(
+            "run-1",
+            spellcheck_unverified=[self._subtitle("Good day", 4.0, 5.0)],
+            mismatch_unverified=[self._subtitle("Call one now", 1.0, 2.0)],
+        )
+        current = [self._subtitle("Call one now", 1.0, 2.0), self._subtitle("Good day", 4.0, 5.0)]
+        plan = MAIN.plan_incremental_analysis(current, [], self._previous(coverage))
+        self.assertEqual([s["text"] for s in plan["spellcheck_subtitles"]], ["Good day"])
+        self.assertEqual([s["text"] for s in plan["mismatch_subtitles"]], ["Call one now"])
+
+        plan = MAIN.plan_incremental_analysis(current, [], self._previous(None))
+        self.assertEqual(len(plan["spellcheck_subtitles"]), 2)
+        self.assertEqual(len(plan["mismatch_subtitles"]), 2)
+        self.assertEqual(plan["stats"]["unchanged"], 0)
+
+    def test_plan_rechecks_spelling_when_raw_text_changed(self):
+        coverage = MAIN.build_run_coverage("run-1", [], [])
+        current = [self._subtitle("Call 1 now", 1.0, 2.0), self._subtitle("good day.", 4.0, 5.0)]
+        plan = MAIN.plan_incremental_analysis(current, [], self._previous(coverage))
+        self.assertEqual(plan["stats"]["unchanged"], 2)
+        self.assertEqual([s["text"] for s in plan["spellcheck_subtitles"]], ["Call 1 now", "good day."])
+        self.assertEqual(plan["mismatch_subtitles"], [])
+
+
+class ResultRunTests(unittest.TestCase):
+    def test_scope_to_run_filters_active_or_legacy_rows(self):
+        query = mock.MagicMock()
+        MAIN.scope_to_run(query, "run-1")
+        query.eq.assert_called_once_with("run_id", "run-1")
+        MAIN.scope_to_run(query, None)
+        query.is_.assert_called_once_with("run_id", "null")
+
+    def test_garbage_collect_only_deletes_runs_that_started_earlier(self):
+        supabase = mock.MagicMock()
+        runs_query = supabase.table.return_value.select.return_value.eq.return_value.lt.return_value
+        runs_query.execute.return_value = types.SimpleNamespace(data=[{"id": "run-1"}, {"id": "run-2"}])
+        MAIN.garbage_collect_runs(supabase, "project-1", "run-2", "2026-01-01T00:00:00.123456Z")
+
+        supabase.table.return_value.select.return_value.eq.return_value.lt.assert_called_once_with(
+            "started_at", "2026-01-01T00:00:00.123456Z",
+        )
+        tables = [c.args[0] for c in supabase.table.call_args_list]
+        self.assertEqual(sorted(set(tables)), sorted((*MAIN.RESULT_TABLES, "analysis_runs")))
+        delete_chain = supabase.table.return_value.delete.return_value.eq.return_value
+        delete_chain.in_.assert_any_call("run_id", ["run-1"])
+        delete_chain.in_.assert_any_call("id", ["run-1"])
+        delete_chain.is_.assert_any_call("run_id", "null")
+
+    def test_activate_run_reports_superseded_runs(self):
+        supabase = mock.MagicMock()
+        supabase.rpc.return_value.execute.return_value = types.SimpleNamespace(data=False)
+        self.assertFalse(MAIN.activate_run(supabase, "project-1", "run-1", "2026-01-01T00:00:00.5Z"))
+        name, params = supabase.rpc.call_args.args
+        self.assertEqual(name, "activate_analysis_run")
+        self.assertEqual(params["p_started_at"], "2026-01-01T00:00:00.5Z")
+
+        supabase.rpc.return_value.execute.return_value = types.SimpleNamespace(data=True)
+        self.assertTrue(MAIN.activate_run(supabase, "project-1", "run-2", "2026-01-01T00:00:01Z"))
+
+    def test_run_start_keeps_microseconds(self):
+        self.assertRegex(MAIN._utc_timestamp_iso(with_microseconds=True), r"\.\d{6}Z$")
+        self.assertRegex(MAIN._utc_timestamp_iso(), r":\d{2}Z$")
+
+
+class JobQueueTests(unittest.TestCase):
+    def test_claim_lease_expiry_and_retry(self):
+        queue = MAIN.SQLiteJobQueue()
+        job = queue.enqueue("project-1", {"video_url": "https://example.com/v.mp4"}, max_attempts=2)
+        self.assertEqual(queue.enqueue("project-1", {})["id"], job["id"])
+
+        claimed = queue.claim("worker-a", lease_seconds=60)
+        self.assertEqual(claimed["id"], job["id"])
+        self.assertEqual(claimed["payload"]["video_url"], "https://example.com/v.mp4")
+        self.assertIsNone(queue.claim("worker-b", lease_seconds=60))
+        self.assertTrue(queue.heartbeat(job["id"], "worker-a", lease_seconds=60))
+        self.assertFalse(queue.heartbeat(job["id"], "worker-b", lease_seconds=60))
+
+        # A pipeline error is retried as a new attempt until max_attempts.
+        self.assertEqual(queue.fail(job["id"], "worker-a", "boom"), "queued")
+        reclaimed = queue.claim("worker-b", lease_seconds=60)
+        self.assertEqual(reclaimed["attempts"], 2)
+        self.assertFalse(queue.complete(job["id"], "worker-a"))
+        self.assertEqual(queue.fail(job["id"], "worker-b", "boom"), "failed")
+        self.assertEqual(queue.get(job["id"])["last_error"], "boom")
+
+    def test_expired_lease_fails_without_retry(self):
+        queue = MAIN.SQLiteJobQueue()
+        job = queue.enqueue("project-1", {}, max_attempts=3)
+        queue.claim("worker-a", lease_seconds=60)
+        queue.heartbeat(job["id"], "worker-a", lease_seconds=-1)
+
+        self.assertIsNone(queue.claim("worker-b", lease_seconds=60))
+        stored = queue.get(job["id"])
+        self.assertEqual((stored["status"], stored["attempts"], stored["last_error"]), ("failed", 1, "lease expired"))
+        self.assertEqual([expired["id"] for expired in queue.take_expired()], [job["id"]])
+        self.assertFalse(queue.complete(job["id"], "worker-a"))
+
+    def test_supabase_enqueue_returns_the_job_that_won_a_race(self):
+        winner = {"id": "job-1", "project_id": "project-1", "status": "queued"}
+        table = mock.MagicMock()
+        select = table.select.return_value.eq.return_value.in_.return_value.limit.return_value.execute
+        select.side_effect = [types.SimpleNamespace(data=[]), types.SimpleNamespace(data=[winner])]
+        table.insert.return_value.execute.side_effect = RuntimeError("duplicate key value violates unique constraint")
+        supabase = mock.MagicMock()
+        supabase.table.return_value = table
+        self.assertEqual(MAIN.SupabaseJobQueue(supabase).enqueue("project-1", {}), winner)
+
+        select.side_effect = [types.SimpleNamespace(data=[]), types.SimpleNamespace(data=[])]
+        with self.assertRaises(RuntimeError):
+            MAIN.SupabaseJobQueue(supabase).enqueue("project-1", {})
+
+    def test_worker_retries_failed_job_then_completes(self):
+        queue = MAIN.SQLiteJobQueue()
+        job = queue.enqueue("project-1", {"video_url": "https://example.com/v.mp4"})
+        supabase = mock.MagicMock()
+        run = mock.Mock(side_effect=[RuntimeError("transient"), None])
+        with mock.patch.object(MAIN, "run_analysis", run), \
+                mock.patch.object(MAIN, "JOB_RETRY_BACKOFF_SECONDS", 0.0):
+            first = MAIN.run_worker(supabase, queue, worker_id="w1")
+            second = MAIN.run_worker(supabase, queue, worker_id="w2")
+
+        self.assertEqual(first["jobs"][0]["outcome"], "queued")
+        self.assertEqual(second["jobs"][0]["outcome"], "completed")
+        self.assertEqual(queue.get(job["id"])["status"], "completed")
+        self.assertEqual(run.call_args.args[2], "https://example.com/v.mp4")
+
+    def test_worker_marks_project_error_when_last_lease_expires(self):
+        queue = MAIN.SQLiteJobQueue()
+        job = queue.enqueue("project-1", {"video_url": "https://example.com/v.mp4"}, max_attempts=1)
+        queue.claim("worker-a", lease_seconds=60)
+        queue.heartbeat(job["id"], "worker-a", lease_seconds=-1)
+
+        with mock.patch.object(MAIN, "update_status") as update_status:
+            summary = MAIN.run_worker(mock.MagicMock(), queue, worker_id="w2")
+
+        self.assertEqual(summary["jobs"], [])
+        self.assertEqual(queue.get(job["id"])["status"], "failed")
+        update_status.assert_called_once()
+        self.assertEqual(update_status.call_args.args[1:3], ("project-1", "error"))
+        self.assertEqual(queue.take_expired(), [])
+
+    def test_read_bounded_int(self):
+        self.assertEqual(MAIN._read_bounded_int(None, 1, 1, 50), 1)
+        self.assertEqual(MAIN._read_bounded_int("7", 1, 1, 50), 7)
+        self.assertEqual(MAIN._read_bounded_int(1000, 1, 1, 50), 50)
+        self.assertEqual(MAIN._read_bounded_int(-3, 1, 1, 50), 1)
+        with self.assertRaises(ValueError):
+            MAIN._read_bounded_int("lots", 1, 1, 50)
+        with self.assertRaises(ValueError):
+            MAIN._read_bounded_int(2.5, 1, 1, 50)
+
+
+class BatchAnalysisTests(unittest.TestCase):
+    def test_resolve_batch_items_dedupes_and_loads_urls(self):
+        supabase = mock.MagicMock()
+        supabase.table.return_value.select.return_value.in_.return_value.execute.return_value = \
+            types.SimpleNamespace(data=[{"id": "p2", "video_url": "https://example.com/p2.mp4"}])
+        items = MAIN._resolve_batch_items(supabase, {
+            "projects": [
+                {"project_id": "p1", "video_url": "https://example.com/p1.mp4"},
+                {"project_id": "p2"},
+                {"project_id": "p1"},
+            ],
+        })
+        self.assertEqual([i["project_id"] for i in items], ["p1", "p2"])
+        self.assertEqual(items[1]["video_url"], "https://example.com/p2.mp4")
+
+    def test_batch_runs_projects_concurrently_and_isolates_failures(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fake_run(_supabase, project_id, _video_url, **kwargs):
+            self.assertFalse(kwargs["reset_http_stats"])
+            barrier.wait()
+            if project_id == "bad":
+                raise RuntimeError("download failed")
+
+        items = [{"project_id": "good", "video_url": "u1"}, {"project_id": "bad", "video_url": "u2"}]
+        with mock.patch.object(MAIN, "run_analysis", side_effect=fake_run):
+            results = MAIN.run_analysis_batch(mock.MagicMock(), items, max_concurrency=2)
+
+        self.assertEqual([r["status"] for r in results], ["completed", "error"])
+        self.assertEqual(results[1]["error"], "download failed")
+
+    def test_batch_defers_projects_that_no_longer_fit_the_budget(self):
+        queue = MAIN.SQLiteJobQueue()
+        items = [{"project_id": "p1", "video_url": "u1"}, {"project_id": "p2", "video_url": "u2"}]
+        run = mock.Mock()
+        with mock.patch.object(MAIN, "run_analysis", run), \
+                mock.patch.object(MAIN, "BATCH_ESTIMATED_PROJECT_SECONDS", 100.0), \
+                mock.patch.object(MAIN, "update_status"), \
+                mock.patch.object(MAIN, "get_job_queue", return_value=queue), \
+                mock.patch.object(MAIN, "JOB_WORKER_ENABLED", True):
+            results = MAIN.run_analysis_batch(mock.MagicMock(), items, max_concurrency=1, time_budget_seconds=150.0)
+            self.assertEqual([r["status"] for r in results], ["completed", "completed"])
+
+            with mock.patch.object(MAIN, "BATCH_ESTIMATED_PROJECT_SECONDS", 200.0):
+                results = MAIN.run_analysis_batch(mock.MagicMock(), items, max_concurrency=8, time_budget_seconds=150.0)
+            self.assertEqual([r["status"] for r in results], ["queued", "queued"])
+            self.assertEqual(queue.claim("w")["payload"]["video_url"], "u1")
+
+            with mock.patch.object(MAIN, "BATCH_ESTIMATED_PROJECT_SECONDS", 200.0), \
+                    mock.patch.object(MAIN, "JOB_WORKER_ENABLED", False):
+                results = MAIN.run_analysis_batch(mock.MagicMock(), items[:1], time_budget_seconds=150.0)
+            self.assertEqual(results[0]["status"], "skipped")
+        self.assertEqual(run.call_count, 2)
+
+    def test_shared_client_is_built_once(self):
+        factory = mock.Mock(side_effect=lambda: object())
+        with mock.patch.dict(MAIN._shared_clients, clear=True):
+            first = MAIN._shared_client("test", factory)
+            self.assertIs(MAIN._shared_client("test", factory), first)
+        self.assertEqual(factory.call_count, 1)
+
+
+class _FakeOperation:
+    def __init__(self, polls_until_done, result=None, error=None, percents=()):
+        self.polls_until_done = polls_until_done
+        self.polls = 0
+        self._result = result
+        self._error = error
+        self._percents = list(percents)
+
+    def done(self):
+        self.polls += 1
+        return self.polls > self.polls_until_done
+
+    def result(self):
+        if self._error:
+            raise self._error
+        return self._result
+
+    @property
+    def metadata(self):
+        percent = self._percents[min(self.polls, len(self._percents)) - 1] if self._percents else None
+        return types.SimpleNamespace(progress_percent=percent)
+
+
+class OperationsManagerTests(unittest.TestCase):
+    def test_polls_many_operations_on_one_thread(self):
+        progress_seen = []
+        done_seen = []
+        with mock.patch.object(MAIN, "OPERATIONS_POLL_MIN_SECONDS", 0.01):
+            manager = MAIN.OperationsManager(max_interval=0.02)
+            slow = manager.track(
+                _FakeOperation(3, result="vi-result", percents=[10, 50, 90]),
+                "vi",
+                on_progress=lambda percent, _elapsed: progress_seen.append(percent),
+                on_done=lambda result, error: done_seen.append((result, error)),
+            )
+            failing = manager.track(_FakeOperation(1, error=RuntimeError("quota")), "stt")
+            self.assertEqual(slow.result(timeout=5), "vi-result")
+            with self.assertRaises(RuntimeError):
+                failing.result(timeout=5)
+
+        self.assertEqual(progress_seen, [10.0, 50.0, 90.0])
+        self.assertEqual(done_seen, [("vi-result", None)])
+        self.assertEqual(manager.progress()["in_flight"], 0)
+
+    def test_times_out_pending_operation(self):
+        with mock.patch.object(MAIN, "OPERATIONS_POLL_MIN_SECONDS", 0.01):
+            manager = MAIN.OperationsManager(max_interval=0.01)
+            future = manager.track(_FakeOperation(10_000), "vi", label="vi:op", timeout=0.05)
+            with self.assertRaises(TimeoutError):
+                future.result(timeout=5)
+
+
+class _SpeechStubs:
+    """Stub google.cloud.speech_v2 / storage / api_core so transcribe_with_speech_to_text can run."""
+
+    def __init__(self):
+        factory = lambda **kwargs: types.SimpleNamespace(**kwargs)  # noqa: E731
+        cloud_speech = types.SimpleNamespace(**{
+            name: factory for name in (
+                "RecognitionConfig", "AutoDetectDecodingConfig", "RecognitionFeatures",
+                "SpeakerDiarizationConfig", "RecognizeRequest", "BatchRecognizeFileMetadata",
+                "BatchRecognizeRequest", "RecognitionOutputConfig", "InlineOutputConfig",
+            )
+        })
+        speech_v2 = types.ModuleType("google.cloud.speech_v2")
+        speech_v2.SpeechClient = object
+        speech_types = types.ModuleType("google.cloud.speech_v2.types")
+        speech_types.cloud_speech = cloud_speech
+        client_options = types.ModuleType("google.api_core.client_options")
+        client_options.ClientOptions = factory
+        storage = types.ModuleType("google.cloud.storage")
+        storage.Client = object
+        self.modules = {
+            "google.cloud.speech_v2": speech_v2,
+            "google.cloud.speech_v2.types": speech_types,
+            "google.api_core": types.ModuleType("google.api_core"),
+            "google.api_core.client_options": client_options,
+            "google.cloud.storage": storage,
+        }
+        self.speech_client = mock.MagicMock()
+        self.storage_client = mock.MagicMock()
+        google_cloud = sys.modules["google.cloud"]
+        self._patches = [
+            mock.patch.dict(sys.modules, self.modules),
+            mock.patch.object(google_cloud, "storage", storage, create=True),
+            mock.patch.object(MAIN, "GCP_PROJECT_ID", "proj"),
+            mock.patch.object(
+                MAIN,
+                "_shared_client",
+                side_effect=lambda key, _factory: self.speech_client if key.startswith("speech") else self.storage_client,
+            ),
+        ]
+
+    def batch_words(self, words):
+        """Make batch_recognize (through the operations manager) return `words`."""
+        class _AnyUri(dict):
+            def __missing__(self, _key):
+                return types.SimpleNamespace(transcript=types.SimpleNamespace(results=words))
+
+        manager = mock.MagicMock()
+        manager.track.return_value.result.return_value = types.SimpleNamespace(results=_AnyUri())
+        return mock.patch.object(MAIN, "get_operations_manager", return_value=manager)
+
+    def __enter__(self):
+        for patcher in self._patches:
+            patcher.start()
+        return self
+
+    def __exit__(self, *_exc):
+        for patcher in reversed(self._patches):
+            patcher.stop()
+        return False
+
+
+class ChunkedSpeechTests(unittest.TestCase):
+    def test_plan_audio_chunks_cuts_at_silences_under_limit(self):
+        silences = [(20.0, 21.0), (50.0, 51.0), (70.0, 70.4), (130.0, 131.0)]
+        chunks = MAIN.plan_audio_chunks(150.0, silences, max_chunk_seconds=55.0)
+        self.assertEqual(chunks, [(0.0, 50.5), (50.5, 70.2), (70.2, 125.2), (125.2, 150.0)])
+        self.assertTrue(all(end - start <= 55.0 for start, end in chunks))
+
+    def test_detect_silences_parses_ffmpeg_output(self):
+        stderr = (
+            "[silencedetect @ 0x1] silence_start: 1.5\n"
+            "[silencedetect @ 0x1] silence_end: 2.25 | silence_duration: 0.75\n"
+            "[silencedetect @ 0x1] silence_start: 9\n"
+        )
+        completed = types.SimpleNamespace(returncode=0, stderr=stderr, stdout="")
+        with mock.patch.object(MAIN, "_ensure_ffmpeg"), \
+                mock.patch.object(MAIN.subprocess, "run", return_value=completed):
+            self.assertEqual(MAIN.detect_silences("audio.wav"), [(1.5, 2.25)])
+
+    def test_reconcile_speakers_and_shift_raw_offsets(self):
+        chunks = [
+            [{"word": "hi", "speaker": "Speaker 1"}, {"word": "there", "speaker": "Speaker 2"}],
+            [{"word": "yes", "speaker": "Speaker 1"}, {"word": "ok", "speaker": "Speaker 2"}],
+        ]
+        stitched = MAIN._reconcile_chunk_speakers(chunks)
+        self.assertEqual([w["speaker"] for w in stitched], ["Speaker 1", "Speaker 2", "Speaker 2", "Speaker 1"])
+
+        raw = {"results": [{"alternatives": [{"words": [{"word": "yes", "end_offset": "0.5s"}]}]}]}
+        MAIN._remap_raw_word_offsets(raw, lambda seconds: seconds + 60.0)
+        self.assertEqual(MAIN._extract_words_from_stt_raw_response(raw)[0]["start_time"], 60.0)
+        self.assertEqual(MAIN._extract_words_from_stt_raw_response(raw)[0]["end_time"], 60.5)
+
+    def test_failed_chunk_falls_back_to_batch_recognize(self):
+        batch_words = [{"word": "hello", "start_time": 61.0, "end_time": 61.5, "speaker": None}]
+        cut = mock.Mock(side_effect=RuntimeError("ffmpeg cut failed"))
+        with _SpeechStubs() as stubs, stubs.batch_words(batch_words), \
+                mock.patch.object(MAIN, "VAD_ENABLED", False), \
+                mock.patch.object(MAIN, "STT_LONG_AUDIO_MODE", "chunked"), \
+                mock.patch.object(MAIN, "STT_CHUNK_RETRIES", 1), \
+                mock.patch.object(MAIN, "detect_silences", return_value=[(30.0, 31.0)]), \
+                mock.patch.object(MAIN, "_cut_audio_chunk", cut), \
+                mock.patch.object(MAIN, "encode_audio_for_stt", side_effect=lambda path, **_kw: path), \
+                mock.patch.object(MAIN, "_extract_words_from_v2_results", side_effect=lambda results: list(results)):
+            segments, _raw, words = MAIN.transcribe_with_speech_to_text("/tmp/audio.wav", 70.0)
+
+        self.assertEqual(cut.call_count, 4)  # two chunks, each tried twice
+        stubs.speech_client.batch_recognize.assert_called_once()
+        stubs.speech_client.recognize.assert_not_called()
+        self.assertEqual([w["word"] for w in words], ["hello"])
+        self.assertTrue(segments)
+
+    def test_encode_audio_for_stt_selects_codec(self):
+        completed = types.SimpleNamespace(returncode=0, stderr="", stdout="")
+        with mock.patch.object(MAIN.subprocess, "run", return_value=completed) as run, \
+                mock.patch.object(MAIN.os.path, "getsize", return_value=1024):
+            self.assertEqual(MAIN.encode_audio_for_stt("/tmp/x/audio.wav", "wav"), "/tmp/x/audio.wav")
+            run.assert_not_called()
+            self.assertEqual(MAIN.encode_audio_for_stt("/tmp/x/audio.wav", "flac"), "/tmp/x/audio.flac")
+            self.assertIn("flac", run.call_args.args[0])
+            self.assertEqual(MAIN.encode_audio_for_stt("/tmp/x/audio.wav", "opus"), "/tmp/x/audio.ogg")
+            self.assertIn("libopus", run.call_args.args[0])
+
+        failed = types.SimpleNamespace(returncode=1, stderr="Unknown encoder", stdout="")
+        with mock.patch.object(MAIN.subprocess, "run", return_value=failed):
+            self.assertEqual(MAIN.encode_audio_for_stt("/tmp/x/audio.wav", "opus"), "/tmp/x/audio.wav")
+
+
+class VoiceActivityTests(unittest.TestCase):
+    def _write_wav(self, signal, rate=16000):
+        import wave
+
+        import numpy as np
+
+        handle = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+        handle.close()
+        self.addCleanup(pathlib.Path(handle.name).unlink)
+        with wave.open(handle.name, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(rate)
+            out.writeframes((np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes())
+        return handle.name
+
+    def test_detects_modulated_speech_and_ignores_steady_music(self):
+        np = __import__("numpy")
+        rate = 16000
+        rng = np.random.default_rng(0)
+        t = np.arange(rate * 10) / rate
+        signal = rng.normal(0, 0.0005, t.size)
+        speech = (t >= 2) & (t < 4)
+        # Voiced tone with a 4 Hz syllabic envelope, then a steady tone bed.
+        signal[speech] += 0.3 * np.sin(2 * np.pi * 180 * t[speech]) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t[speech]))
+        music = t >= 6
+        signal[music] += 0.3 * np.sin(2 * np.pi * 440 * t[music])
+        path = self._write_wav(signal, rate)
+
+        regions, stats = MAIN.detect_speech_regions(path)
+        self.assertEqual(len(regions), 1)
+        start, end = regions[0]
+        self.assertAlmostEqual(start, 2.0 - MAIN.VAD_PADDING_SECONDS, delta=0.2)
+        self.assertAlmostEqual(end, 4.0 + MAIN.VAD_PADDING_SECONDS, delta=0.2)
+        self.assertAlmostEqual(stats["duration_seconds"], 10.0, places=2)
+
+        silent = self._write_wav(np.zeros(rate * 2))
+        self.assertEqual(MAIN.detect_speech_regions(silent)[0], [])
+
+    def test_voice_over_on_music_bed_falls_back_to_full_audio(self):
+        np = __import__("numpy")
+        rate = 16000
+        t = np.arange(rate * 10) / rate
+        # A steady tone bed for the whole spot sets the noise floor; the voice-over stays under the margin.
+        signal = 0.3 * np.sin(2 * np.pi * 220 * t)
+        speech = (t >= 2) & (t < 6)
+        signal[speech] += 0.08 * np.sin(2 * np.pi * 180 * t[speech]) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t[speech]))
+        path = self._write_wav(signal, rate)
+        self.assertEqual(MAIN.detect_speech_regions(path)[0], [])
+
+        with _SpeechStubs() as stubs, \
+                mock.patch.object(MAIN, "VAD_ENABLED", True), \
+                mock.patch.object(MAIN, "encode_audio_for_stt", side_effect=lambda p, **_kw: p), \
+                mock.patch.object(MAIN, "_extract_words_from_v2_results", return_value=[
+                    {"word": "hello", "start_time": 2.1, "end_time": 2.4, "speaker": None},
+                ]):
+            _segments, raw, words = MAIN.transcribe_with_speech_to_text(path, 10.0)
+
+        stubs.speech_client.recognize.assert_called_once()
+        request = stubs.speech_client.recognize.call_args.kwargs["request"]
+        self.assertEqual(request.content, pathlib.Path(path).read_bytes())
+        self.assertEqual(raw["vad"]["fallback"], "full_audio")
+        self.assertEqual([w["word"] for w in words], ["hello"])
+
+    def test_speech_only_audio_maps_times_back(self):
+        np = __import__("numpy")
+        path = self._write_wav(np.zeros(16000 * 10))
+        output = path + ".speech.wav"
+        self.addCleanup(lambda: pathlib.Path(output).unlink(missing_ok=True))
+        duration, time_map = MAIN.build_speech_only_audio(path, [(1.0, 2.0), (5.0, 7.0)], output)
+
+        self.assertAlmostEqual(duration, 3.0 + MAIN.VAD_JOIN_SILENCE_SECONDS)
+        self.assertAlmostEqual(time_map(0.5), 1.5)
+        self.assertAlmostEqual(time_map(1.0 + MAIN.VAD_JOIN_SILENCE_SECONDS + 0.5), 5.5)
+        # A time inside the joining silence snaps to the end of the previous region.
+        self.assertAlmostEqual(time_map(1.1), 2.0)
+
+
+class _FakeRangeResponse:
+    def __init__(self, body: bytes, status_code: int, headers: dict, fail_after: int | None = None):
+        self.body = body
+        self.status_code = status_code
+        self.headers = headers
+        self.fail_after = fail_after
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.body), chunk_size):
+            if self.fail_after is not None and start >= self.fail_after:
+                raise ConnectionError("connection reset")
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class _FakeRangeServer:
+    def __init__(self, payload: bytes, ranges: bool = True, content_type: str = "video/mp4"):
+        self.payload = payload
+        self.ranges = ranges
+        self.content_type = content_type
+        self.requests = []
+        self.failed_once = False
+        self.lock = threading.Lock()
+
+    def __call__(self, method, url, headers=None, **kwargs):
+        header = (headers or {}).get("Range")
+        with self.lock:
+            self.requests.append(header)
+        if not header or not self.ranges:
+            return _FakeRangeResponse(self.payload, 200, {
+                "Content-Type": self.content_type,
+                "Content-Length": str(len(self.payload)),
+            })
+        start, end = (int(part) for part in header.split("=")[1].split("-"))
+        body = self.payload[start:end + 1]
+        fail_after = None
+        with self.lock:
+            if start == 1000 and not self.failed_once:
+                self.failed_once = True
+                fail_after = 3
+        return _FakeRangeResponse(body, 206, {
+            "Content-Type": self.content_type,
+            "Content-Range": f"bytes {start}-{end}/{len(self.payload)}",
+        }, fail_after=fail_after)
+
+
+class RangeDownloadTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        noise = bytes(random.Random(7).getrandbits(8) for _ in range(5000))
+        self.payload = b"\x00\x00\x00\x18ftypmp42" + noise[12:]
+        for name, value in {
+            "DOWNLOAD_SNIFF_BYTES": 1000,
+            "DOWNLOAD_RANGE_CHUNK_MB": 1,
+            "DOWNLOAD_PARALLEL_MIN_MB": 0,
+            "DOWNLOAD_BUFFER_KB": 1,
+            "HTTP_RETRY_BACKOFF_SECONDS": 0.0,
+        }.items():
+            patcher = mock.patch.object(MAIN, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_plan_byte_ranges_covers_file(self):
+        self.assertEqual(MAIN.plan_byte_ranges(10, 4), [(0, 3), (4, 7), (8, 9)])
+        self.assertEqual(MAIN.plan_byte_ranges(10, 4, start=3), [(3, 6), (7, 9)])
+
+    def test_parallel_download_resumes_failed_range(self):
+        server = _FakeRangeServer(self.payload)
+        with mock.patch.object(MAIN, "http_request", server), \
+                mock.patch.object(MAIN, "plan_byte_ranges", return_value=[(1000, 2999), (3000, 4999)]):
+            path = MAIN.download_video(
+                "https://cdn.example/video.mp4",
+                self.tmp.name,
+                debug_logger=lambda *a, **k: None,
+                expected_size_bytes=len(self.payload),
+            )
+        self.assertEqual(pathlib.Path(path).read_bytes(), self.payload)
+        self.assertEqual(server.requests[0], "bytes=0-999")
+        # Resumed from the first byte the dropped connection had not delivered.
+        self.assertIn("bytes=2024-2999", server.requests)
+
+    def test_falls_back_to_single_stream_without_ranges(self):
+        server = _FakeRangeServer(self.payload, ranges=False)
+        with mock.patch.object(MAIN, "http_request", server):
+            path = MAIN.download_video("https://cdn.example/video.mp4", self.tmp.name, debug_logger=lambda *a, **k: None)
+        self.assertEqual(pathlib.Path(path).read_bytes(), self.payload)
+        self.assertEqual(server.requests, ["bytes=0-999"])
+
+    def test_rejects_bad_downloads_from_first_bytes(self):
+        html = b"<!DOCTYPE html><html>Link expired</html>" + b" " * 5000
+        for server, message in (
+            (_FakeRangeServer(html, content_type="text/html"), "expired temporary URL"),
+            (_FakeRangeServer(b"\x89PNG\r\n\x1a\n" + self.payload[8:], content_type="image/png"), "container"),
+            (_FakeRangeServer(self.payload, content_type="application/json"), "valid media file"),
+            (_FakeRangeServer(self.payload[:4] + b"junk" + self.payload[8:]), "container"),
+        ):
+            with mock.patch.object(MAIN, "http_request", server), self.assertRaisesRegex(ValueError, message):
+                MAIN.download_video("https://cdn.example/video.mp4", self.tmp.name)
+            self.assertEqual(len(server.requests), 1)
+
+        server = _FakeRangeServer(self.payload)
+        with mock.patch.object(MAIN, "http_request", server), self.assertRaisesRegex(ValueError, "Frame.io"):
+            MAIN.download_video("https://cdn.example/video.mp4", self.tmp.name, expected_size_bytes=90_000)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_accepts_media_served_with_application_types(self):
+        for content_type in ("application/mp4", "application/x-mxf", "binary/octet-stream"):
+            server = _FakeRangeServer(self.payload, ranges=False, content_type=content_type)
+            with mock.patch.object(MAIN, "http_request", server):
+                path = MAIN.download_video("https://cdn.example/video.mp4", self.tmp.name)
+            self.assertEqual(pathlib.Path(path).read_bytes(), self.payload)
+
+    def test_single_stream_retry_after_range_failure_is_validated(self):
+        server = _FakeRangeServer(self.payload)
+        html = b"<html>AccessDenied</html>" + b" " * 5000
+
+        def flaky(method, url, headers=None, **kwargs):
+            header = (headers or {}).get("Range")
+            if header is None:
+                server.requests.append(None)
+                return _FakeRangeResponse(html, 200, {"Content-Type": "text/html", "Content-Length": str(len(html))})
+            if header != "bytes=0-999":
+                server.requests.append(header)
+                return _FakeRangeResponse(b"", 503, {})
+            return server(method, url, headers=headers, **kwargs)
+
+        with mock.patch.object(MAIN, "http_request", flaky), \
+                mock.patch.object(MAIN, "DOWNLOAD_RANGE_RETRIES", 0), \
+                self.assertRaisesRegex(ValueError, "expired temporary URL"):
+            MAIN.download_video("https://cdn.example/video.mp4", self.tmp.name, debug_logger=lambda *a, **k: None)
+        self.assertIsNone(server.requests[-1])
+
+    def test_sniff_media_container(self):
+        self.assertEqual(MAIN.sniff_media_container(b"\x00\x00\x00\x14ftypqt  "), "mov")
+        self.assertEqual(MAIN.sniff_media_container(b"\x1aE\xdf\xa3\x01\x00"), "mkv")
+        self.assertEqual(MAIN.sniff_media_container(b"\x00" * 32 + bytes.fromhex("060e2b34020501010d01020101020400")), "mxf")
+        self.assertIsNone(MAIN.sniff_media_container(b"GIF89a......"))
+
+
+class FrameRenditionTests(unittest.TestCase):
+    def test_picks_narrowest_rendition_meeting_ocr_width(self):
+        media_links = {
+            "original": {"download_url": "https://cdn.example/original.mov"},
+            "high_quality": {"download_url": "https://cdn.example/hq.mp4"},
+            "efficient": {"download_url": "https://cdn.example/eff.mp4", "width": 960},
+            "video_h264_180": {"url": "https://cdn.example/180.mp4"},
+        }
+        renditions = MAIN.pick_video_renditions(media_links)
+        self.assertEqual([r["key"] for r in renditions], ["video_h264_180", "efficient", "high_quality"])
+        self.assertIsNone(renditions[2]["width"])
+        # Unknown widths are never guessed: without a probe they are skipped.
+        self.assertIsNone(MAIN.pick_ocr_rendition(renditions, min_width=1280))
+        self.assertEqual(MAIN.pick_ocr_rendition(renditions, min_width=640)["key"], "efficient")
+
+        probed = {"https://cdn.example/180.mp4": (320, 180), "https://cdn.example/hq.mp4": (1920, 1080)}
+        picked = MAIN.pick_ocr_rendition(renditions, min_width=1280, probe_dimensions=probed.get)
+        self.assertEqual((picked["key"], picked["width"]), ("high_quality", 1920))
+        self.assertIsNone(MAIN.pick_ocr_rendition(renditions, min_width=3840, probe_dimensions=probed.get))
+
+    def test_vertical_master_accepts_rendition_at_proxy_width(self):
+        media_links = {
+            "efficient": {"download_url": "https://cdn.example/eff.mp4"},
+            "high_quality": {"download_url": "https://cdn.example/hq.mp4"},
+        }
+        probed = {"https://cdn.example/eff.mp4": (720, 1280), "https://cdn.example/hq.mp4": (1080, 1920)}
+        target = MAIN.ocr_proxy_target_width(1080)
+        self.assertEqual(target, 1080)
+        self.assertEqual(MAIN.ocr_proxy_target_width(None), MAIN.OCR_PROXY_MAX_WIDTH)
+        self.assertEqual(MAIN.ocr_proxy_target_width(3840), MAIN.OCR_PROXY_MAX_WIDTH)
+        picked = MAIN.pick_ocr_rendition(MAIN.pick_video_renditions(media_links), target, probed.get)
+        self.assertEqual((picked["key"], picked["width"], picked["height"]), ("high_quality", 1080, 1920))
+
+        rendition = {"key": "high_quality", "url": "https://cdn.example/hq.mp4", "width": 1080}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = pathlib.Path(tmp_dir, "rendition_high_quality.mp4")
+            path.write_bytes(b"x")
+            with mock.patch.object(MAIN, "download_video", return_value=str(path)), \
+                    mock.patch.object(MAIN, "probe_media_streams", return_value={"width": 1080, "height": 1920, "has_audio": True}):
+                self.assertEqual(MAIN.fetch_ocr_rendition(rendition, tmp_dir, min_width=target), (str(path), True))
+
+    def test_reads_displayed_dimensions_from_header(self):
+        landscape = _tiny_mp4(1000, 1000, tkhd=_tkhd(1920, 1080))
+        read_at = lambda offset, size: landscape[offset:offset + size]
+        self.assertEqual(MAIN.find_mp4_video_dimensions(read_at), (1920, 1080))
+
+        rotated = _tiny_mp4(1000, 1000, tkhd=_tkhd(1920, 1080, rotated=True))
+        server = _FakeRangeServer(rotated)
+        with mock.patch.object(MAIN, "http_request", server):
+            self.assertEqual(MAIN.probe_remote_mp4_dimensions("https://cdn.example/v.mp4"), (1080, 1920))
+        self.assertTrue(all(request.startswith("bytes=") for request in server.requests))
+        self.assertIsNone(MAIN.find_mp4_video_dimensions(lambda offset, size: _tiny_mp4(1000, 1000)[offset:offset + size]))
+
+    def test_fetch_rejects_rendition_below_ocr_width(self):
+        rendition = {"key": "efficient", "url": "https://cdn.example/eff.mp4", "width": 1280}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = pathlib.Path(tmp_dir, "rendition_efficient.mp4")
+            path.write_bytes(b"x")
+            with mock.patch.object(MAIN, "download_video", return_value=str(path)), \
+                    mock.patch.object(MAIN, "probe_media_streams", return_value={"width": 1280, "height": 720, "has_audio": True}):
+                self.assertEqual(MAIN.fetch_ocr_rendition(rendition, tmp_dir), (str(path), True))
+            with mock.patch.object(MAIN, "download_video", return_value=str(path)), \
+                    mock.patch.object(MAIN, "probe_media_streams", return_value={"width": 640, "height": 360, "has_audio": True}):
+                self.assertEqual(MAIN.fetch_ocr_rendition(rendition, tmp_dir), (None, False))
+            self.assertFalse(path.exists())
+
+
+def _mp4_box(box_type: bytes, body: bytes) -> bytes:
+    return (len(body) + 8).to_bytes(4, "big") + box_type + body
+
+
+def _tkhd(width: int, height: int, rotated: bool = False) -> bytes:
+    one, zero, minus_one = (1 << 16).to_bytes(4, "big"), bytes(4), (-(1 << 16)).to_bytes(4, "big", signed=True)
+    matrix = (zero + one + zero + minus_one + zero + zero) if rotated else (one + zero + zero + zero + one + zero)
+    matrix += zero + zero + (1 << 30).to_bytes(4, "big")
+    return _mp4_box(b"tkhd", bytes(40) + matrix + (width << 16).to_bytes(4, "big") + (height << 16).to_bytes(4, "big"))
+
+
+def _tiny_mp4(duration_units: int, timescale: int, mdat_bytes: int = 3000, tkhd: bytes = b"") -> bytes:
+    mvhd = _mp4_box(b"mvhd", bytes(4) + bytes(8) + timescale.to_bytes(4, "big") + duration_units.to_bytes(4, "big") + bytes(80))
+    audio_trak = _mp4_box(b"trak", _mp4_box(b"tkhd", bytes(84)))
+    return (
+        _mp4_box(b"ftyp", b"isom" + bytes(4) + b"isommp42")
+        + _mp4_box(b"mdat", bytes(mdat_bytes))
+        + _mp4_box(b"moov", mvhd + audio_trak + (_mp4_box(b"trak", tkhd) if tkhd else _mp4_box(b"trak", bytes(16))))
+    )
+
+
+class VideoDurationTests(unittest.TestCase):
+    def test_finds_duration_when_moov_follows_mdat(self):
+        payload = _tiny_mp4(12_500, 1000)
+        reads = []
+
+        def read_at(offset, size):
+            reads.append(offset)
+            return payload[offset:offset + size]
+
+        self.assertAlmostEqual(MAIN.find_mp4_duration(read_at), 12.5)
+        self.assertLessEqual(len(reads), 4)
+
+    def test_remote_probe_uses_range_reads(self):
+        server = _FakeRangeServer(_tiny_mp4(90_000, 600))
+        server.failed_once = True
+        with mock.patch.object(MAIN, "http_request", server):
+            self.assertAlmostEqual(MAIN.probe_remote_mp4_duration("https://cdn.example/v.mp4"), 150.0)
+        self.assertTrue(all(request.startswith("bytes=") for request in server.requests))
+
+    def test_resolver_prefers_metadata_then_header_then_ffprobe(self):
+        self.assertEqual(MAIN.resolve_video_duration("https://x", 42.0), (42.0, "frame_io"))
+        with mock.patch.object(MAIN, "probe_remote_mp4_duration", return_value=7.5):
+            self.assertEqual(MAIN.resolve_video_duration("https://x", None), (7.5, "container_header"))
+        with mock.patch.object(MAIN, "probe_remote_mp4_duration", side_effect=RuntimeError("no ranges")), \
+                mock.patch.object(MAIN, "ffprobe_duration", return_value=9.0):
+            self.assertEqual(MAIN.resolve_video_duration("https://x", None, video_path="v.mp4"), (9.0, "ffprobe"))
+            self.assertEqual(MAIN.resolve_video_duration("https://x", None), (0.0, "unknown"))
+
+
+class FrameIoCacheTests(unittest.TestCase):
+    def setUp(self):
+        MAIN._frame_io_cache.clear()
+        self.addCleanup(MAIN._frame_io_cache.clear)
+        self.calls = []
+        patcher = mock.patch.object(MAIN.requests, "utils", types.SimpleNamespace(quote=lambda value, safe="": value), create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fake_get(self, expires_in: float):
+        def frame_v4_get(path, token):
+            self.calls.append((path.split("?")[0], token))
+            if path == "/accounts":
+                return {"data": [{"id": f"acct-{token}"}]}
+            expires = int(MAIN.time.time() + expires_in)
+            return {"data": {
+                "name": "cut.mp4",
+                "media_links": {"original": {"download_url": f"https://cdn.example/cut.mp4?Expires={expires}&Signature=x"}},
+            }}
+        return frame_v4_get
+
+    def test_repeat_resolution_hits_cache_per_token(self):
+        with mock.patch.object(MAIN, "frame_v4_get", side_effect=self._fake_get(3600)):
+            first = MAIN.fetch_video_from_frame_io("https://next.frame.io/player/asset1", token="t1")
+            second = MAIN.fetch_video_from_frame_io("https://next.frame.io/player/asset1", token="t1")
+            MAIN.fetch_video_from_frame_io("https://next.frame.io/player/asset1", token="t2")
+        self.assertEqual(first, second)
+        self.assertEqual(first["account_id"], "acct-t1")
+        self.assertEqual(len([c for c in self.calls if c[1] == "t1"]), 2)
+        self.assertEqual(len([c for c in self.calls if c[1] == "t2"]), 2)
+        self.assertEqual(MAIN._frame_io_key_locks, {})
+
+    def test_links_near_expiry_are_not_cached(self):
+        with mock.patch.object(MAIN, "frame_v4_get", side_effect=self._fake_get(60)):
+            MAIN.fetch_video_from_frame_io("https://next.frame.io/player/asset1", token="t1")
+            MAIN.fetch_video_from_frame_io("https://next.frame.io/player/asset1", token="t1")
+        # The account is cached, the asset (link expiring inside the margin) is not.
+        self.assertEqual([c[0] for c in self.calls], ["/accounts", "/accounts/acct-t1/files/asset1", "/accounts/acct-t1/files/asset1"])
+
+    def test_key_locks_are_dropped_after_concurrent_loads(self):
+        started = threading.Event()
+        release = threading.Event()
+        loads = []
+
+        def slow_loader():
+            loads.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(MAIN._frame_io_cached(("k",), slow_loader, lambda _v: 60)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        self.assertEqual(len(MAIN._frame_io_key_locks), 1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, ["value"] * 3)
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(MAIN._frame_io_key_locks, {})
+
+    def test_signed_url_expiry_formats(self):
+        self.assertEqual(MAIN.signed_url_expiry("https://x/a.mp4?Expires=1700000000&Signature=s"), 1700000000.0)
+        self.assertEqual(
+            MAIN.signed_url_expiry("https://x/a.mp4?X-Amz-Date=20240101T000000Z&X-Amz-Expires=3600"),
+            MAIN.datetime(2024, 1, 1, 1, tzinfo=MAIN.timezone.utc).timestamp(),
+        )
+        self.assertIsNone(MAIN.signed_url_expiry("https://x/a.mp4"))
+
+
+class SttRawWordsTests(unittest.TestCase):
+    @staticmethod
+    def _results(*words):
+        return [{"alternatives": [{"words": [
+            {"word": word, "start_offset": f"{start}s", "end_offset": f"{start + 0.4}s", "speaker_label": "1"}
+            for word, start in words
+        ]}]}]
+
+    def test_batch_shape_reads_inline_transcript_once(self):
+        transcript = {"results": self._results(("hello", 0.0), ("world", 0.5))}
+        raw = {"results": {"gs://b/a.flac": {"inline_result": {"transcript": transcript}, "transcript": transcript}}}
+        with mock.patch.object(MAIN, "_to_float", side_effect=AssertionError("dedupe path used")):
+            words = MAIN._extract_words_from_stt_raw_response(raw)
+        self.assertEqual([w["word"] for w in words], ["hello", "world"])
+        self.assertEqual(words[0]["speaker"], "1")
+
+    def test_chunked_shape_and_out_of_order_words(self):
+        raw = {"chunked": True, "vad": {"regions": 1}, "chunks": [
+            {"offset_seconds": 0, "response": {"results": self._results(("b", 2.0), ("a", 1.0))}},
+            {"offset_seconds": 55, "response": {}},
+        ]}
+        self.assertEqual([w["word"] for w in MAIN._extract_words_from_stt_raw_response(raw)], ["a", "b"])
+
+    def test_unknown_shape_uses_recursive_fallback(self):
+        raw = {"wrapped": {"payload": self._results(("x", 1.0), ("x", 1.0), ("y", 0.0))}}
+        self.assertEqual([w["word"] for w in MAIN._extract_words_from_stt_raw_response(raw)], ["y", "x"])
+
+
+class WordIndexTests(unittest.TestCase):
+    def test_round_trip_matches_built_windows(self):
+        words = [
+            {"word": "Hello,", "start_time": 0.25, "end_time": 0.5},
+            {"word": "world's", "start_time": 0.5, "end_time": 1.125},
+            {"word": "año", "start_time": 3600.0, "end_time": 3600.75},
+        ]
+        windows = MAIN._build_transcription_word_windows([], words)
+        decoded = MAIN.decode_word_index(MAIN.encode_word_index(windows))
+        self.assertEqual(decoded, windows)
+        self.assertEqual(MAIN.decode_word_index(MAIN.encode_word_index([])), [])
+
+        mixed = [{"token": "hola", "raw": "Hola", "start_time": 1.0, "end_time": 2.0}]
+        self.assertEqual(MAIN.decode_word_index(MAIN.encode_word_index(mixed)), mixed)
+
+    def test_index_from_another_normalizer_counts_as_missing(self):
+        windows = [{"token": "twenty", "raw": "twenty", "start_time": 1.0, "end_time": 2.0}]
+        encoded = MAIN.encode_word_index(windows)
+        with mock.patch.dict(MAIN._NUMBER_WORDS, {"dozen": "12"}):
+            with self.assertRaises(ValueError):
+                MAIN.decode_word_index(encoded)
+            response = mock.Mock(status_code=200, content=encoded)
+            with mock.patch.object(MAIN, "SUPABASE_URL", "https://example.supabase.co"), \
+                    mock.patch.object(MAIN, "SUPABASE_SERVICE_KEY", "key"), \
+                    mock.patch.object(MAIN, "http_get", return_value=response):
+                self.assertEqual(MAIN.load_transcription_word_index("p1", "projects/p1/word_index.bin"), [])
+        self.assertEqual(MAIN.decode_word_index(encoded), windows)
+
+    def test_sync_report_uses_precomputed_windows(self):
+        subtitles = [{"text": "hello world", "start_time": 0.0, "end_time": 1.0}]
+        windows = MAIN._build_transcription_word_windows([], [
+            {"word": "hello", "start_time": 0.1, "end_time": 0.4},
+            {"word": "world", "start_time": 0.5, "end_time": 0.9},
+        ])
+        with mock.patch.object(MAIN, "_build_transcription_word_windows", side_effect=AssertionError("rebuilt")):
+            report = MAIN.build_sync_report_window_containment(subtitles, [], word_windows=windows)
+        self.assertEqual(report["summary"]["synced"], 1)
+
+
+class ClassifyCacheTests(unittest.TestCase):
+    def setUp(self):
+        MAIN._classify_cache.clear()
+        MAIN.classify_heuristics_version()  # fingerprint the real pipeline before it is patched
+        self.real_run = MAIN.run_classify_ocr_payload
+        self.calls = []
+        self.spelling_unchecked = 0
+
+        def fake_run(supabase, project_id, payload):
+            self.calls.append(payload)
+            counts = {"total": len(self.calls), "spelling_unchecked": self.spelling_unchecked, "spelling_failed": 0}
+            return {"status": "ok", "mode": "classify_ocr_payload", "counts": counts}
+
+        patcher = mock.patch.object(MAIN, "run_classify_ocr_payload", side_effect=fake_run)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(MAIN._classify_cache.clear)
+
+    def test_second_call_is_served_from_memory(self):
+        payload = {"raw_response": {"annotation_results": []}, "b": 1}
+        first = MAIN.classify_ocr_payload_cached(None, None, payload)
+        second = MAIN.classify_ocr_payload_cached(None, None, {"b": 1, "raw_response": {"annotation_results": []}})
+        self.assertFalse(first["cache"]["hit"])
+        self.assertTrue(second["cache"]["hit"])
+        self.assertEqual(second["cache"]["source"], "memory")
+        self.assertEqual(second["counts"], first["counts"])
+        self.assertEqual(len(self.calls), 1)
+
+        bypass = MAIN.classify_ocr_payload_cached(None, None, payload, use_cache=False)
+        self.assertFalse(bypass["cache"]["hit"])
+        self.assertEqual(len(self.calls), 2)
+
+    def test_heuristic_change_invalidates(self):
+        payload = {"raw_response": {}}
+        before = MAIN.classify_heuristics_version()
+        MAIN.classify_ocr_payload_cached(None, None, payload)
+        with mock.patch.object(MAIN, "MIN_SUBTITLE_CONFIDENCE", MAIN.MIN_SUBTITLE_CONFIDENCE + 0.05):
+            self.assertNotEqual(MAIN.classify_heuristics_version(), before)
+            result = MAIN.classify_ocr_payload_cached(None, None, payload)
+        self.assertFalse(result["cache"]["hit"])
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(MAIN.classify_heuristics_version(), before)
+
+    def test_incomplete_spellcheck_is_not_cached(self):
+        payload = {"raw_response": {}}
+        self.spelling_unchecked = 2
+        with mock.patch.object(MAIN, "CLASSIFY_CACHE_PERSISTENT", True), \
+                mock.patch.object(MAIN, "SUPABASE_URL", "https://example.supabase.co"), \
+                mock.patch.object(MAIN, "SUPABASE_SERVICE_KEY", "key"), \
+                mock.patch.object(MAIN, "_classify_project_state", return_value="state"), \
+                mock.patch.object(MAIN, "_load_persisted_classify_result", return_value=None), \
+                mock.patch.object(MAIN, "_persist_classify_result") as persist:
+            first = MAIN.classify_ocr_payload_cached(None, "p1", payload)
+            second = MAIN.classify_ocr_payload_cached(None, "p1", payload)
+        self.assertFalse(first["cache"]["stored"])
+        self.assertFalse(second["cache"]["hit"])
+        self.assertEqual(len(self.calls), 2)
+        persist.assert_not_called()
+
+    def test_entries_expire(self):
+        payload = {"raw_response": {}}
+        with mock.patch.object(MAIN, "CLASSIFY_CACHE_TTL_SECONDS", 0):
+            MAIN.classify_ocr_payload_cached(None, None, payload)
+            self.assertFalse(MAIN.classify_ocr_payload_cached(None, None, payload)["cache"]["hit"])
+        self.assertEqual(len(self.calls), 2)
+
+        stored = mock.Mock(status_code=200)
+        stored.json.return_value = {"key": "key", "generated_at": "2020-01-01T00:00:00Z", "result": {"status": "ok"}}
+        deleted = mock.Mock(status_code=200)
+        with mock.patch.object(MAIN, "SUPABASE_URL", "https://example.supabase.co"), \
+                mock.patch.object(MAIN, "http_get", return_value=stored), \
+                mock.patch.object(MAIN, "http_request", return_value=deleted) as delete:
+            self.assertIsNone(MAIN._load_persisted_classify_result("p1", "hash", "key"))
+            self.assertEqual(delete.call_args.args[0], "DELETE")
+            self.assertEqual(delete.call_args.kwargs["json"], {"prefixes": ["projects/p1/ocr-raw/classify-cache/hash.json"]})
+            delete.reset_mock()
+
+            stored.json.return_value["generated_at"] = MAIN._utc_timestamp_iso()
+            self.assertEqual(MAIN._load_persisted_classify_result("p1", "hash", "key"), {"status": "ok"})
+            # An entry written for other heuristics or project state is a miss, left to be overwritten.
+            self.assertIsNone(MAIN._load_persisted_classify_result("p1", "hash", "other-key"))
+            delete.assert_not_called()
+
+    def test_storage_keeps_one_object_per_payload(self):
+        payload = {"raw_response": {}}
+        with mock.patch.object(MAIN, "CLASSIFY_CACHE_PERSISTENT", True), \
+                mock.patch.object(MAIN, "SUPABASE_URL", "https://example.supabase.co"), \
+                mock.patch.object(MAIN, "SUPABASE_SERVICE_KEY", "key"), \
+                mock.patch.object(MAIN, "_load_persisted_classify_result", return_value=None), \
+                mock.patch.object(MAIN, "_persist_classify_result") as persist:
+            with mock.patch.object(MAIN, "_classify_project_state", return_value="run-1"):
+                MAIN.classify_ocr_payload_cached(None, "p1", payload)
+            with mock.patch.object(MAIN, "_classify_project_state", return_value="run-2"):
+                MAIN.classify_ocr_payload_cached(None, "p1", payload)
+        (first_hash, first_key), (second_hash, second_key) = [c.args[1:3] for c in persist.call_args_list]
+        self.assertEqual(first_hash, second_hash)
+        self.assertNotEqual(first_key, second_key)
+
+    def test_run_gc_deletes_stored_results(self):
+        listing = mock.Mock(status_code=200)
+        listing.json.return_value = [{"name": "abc.json"}, {"name": "def.json"}, {"name": ".emptyFolderPlaceholder"}]
+        with mock.patch.object(MAIN, "SUPABASE_URL", "https://example.supabase.co"), \
+                mock.patch.object(MAIN, "SUPABASE_SERVICE_KEY", "key"), \
+                mock.patch.object(MAIN, "http_post", return_value=listing) as list_call, \
+                mock.patch.object(MAIN, "http_request", return_value=mock.Mock(status_code=200)) as delete:
+            MAIN.garbage_collect_runs(mock.MagicMock(), "p1", "run-2", "2026-01-01T00:00:00Z")
+        self.assertEqual(list_call.call_args.kwargs["json"]["prefix"], "projects/p1/ocr-raw/classify-cache/")
+        self.assertEqual(delete.call_args.kwargs["json"]["prefixes"], [
+            "projects/p1/ocr-raw/classify-cache/abc.json",
+            "projects/p1/ocr-raw/classify-cache/def.json",
+        ])
+
+    def test_version_covers_classes_set_constants_and_dictionary(self):
+        before = MAIN.classify_heuristics_version()
+        with mock.patch.object(MAIN, "_CONTRACTION_SUFFIXES", MAIN._CONTRACTION_SUFFIXES | {"nt"}):
+            self.assertNotEqual(MAIN.classify_heuristics_version(), before)
+
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as handle:
+            handle.write("hello 10\n")
+        self.addCleanup(os.unlink, handle.name)
+        with mock.patch.object(MAIN, "SPELLCHECK_DICTIONARY_PATH", handle.name):
+            self.assertNotEqual(MAIN.classify_heuristics_version(), before)
+
+        with mock.patch.object(MAIN, "run_classify_ocr_payload", self.real_run), \
+                mock.patch.dict(MAIN._behaviour_code_fingerprints, clear=True):
+            self.assertEqual(MAIN.classify_heuristics_version(), before)
+            MAIN._behaviour_code_fingerprints.clear()
+            with mock.patch.object(MAIN.LocalSpellChecker, "prefix_length", 6):
+                self.assertNotEqual(MAIN.classify_heuristics_version(), before)
+
+
+class LocalSpellCheckerTests(unittest.TestCase):
+    def setUp(self):
+        MAIN._spellcheck_memory_cache.clear()
+        self.index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.index_dir.cleanup)
+        patcher = mock.patch.object(MAIN, "SPELLCHECK_LOCAL_INDEX_DIR", self.index_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.checker = MAIN.LocalSpellChecker(
+            {"the": 100, "tech": 5, "receive": 40, "relieve": 30, "end": 50, "i": 90, "do": 80, "they": 70, "world": 60},
+            max_edit_distance=2,
+            source_id="test",
+        )
+
+    def test_from_file_merges_overrides(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            base = pathlib.Path(tmp_dir, "dictionary.txt")
+            base.write_text("the 100\nvqa 3\n")
+            overrides = pathlib.Path(tmp_dir, "overrides.txt")
+            overrides.write_text("# comment 12\nvqa 500\nfoley 20\n")
+            checker = MAIN.LocalSpellChecker.from_file(str(base), overrides_path=str(overrides))
+            self.assertEqual(checker.word_counts, {"the": 100, "vqa": 500, "foley": 20})
+            missing = MAIN.LocalSpellChecker.from_file(str(base), overrides_path=str(pathlib.Path(tmp_dir, "none.txt")))
+            self.assertEqual(missing.word_counts, {"the": 100, "vqa": 3})
+
+    def test_bundled_dictionary_is_the_upstream_file(self):
+        self.assertEqual(
+            MAIN._data_file_digest(MAIN.SPELLCHECK_DICTIONARY_PATH),
+            "68e9dc81c7e73bd7310b57e516ecaea0d8b6387ff71344a57c04174650a407a7",
+        )
+        checker = MAIN.LocalSpellChecker.from_file(
+            MAIN.SPELLCHECK_DICTIONARY_PATH, overrides_path=MAIN.SPELLCHECK_DICTIONARY_OVERRIDES_PATH,
+        )
+        self.assertIn("the", checker.word_counts)
+
+    def test_suspicious_tokens_accepts_contractions_and_numbers(self):
+        self.assertEqual(self.checker.suspicious_tokens("I've do don't they're 50 teh"), ["teh"])
+
+    def test_suggest_prefers_distance_then_frequency(self):
+        self.assertEqual(self.checker.suggest("teh"), "the")
+        self.assertEqual(self.checker.suggest("Recieve"), "Receive")
+        self.assertEqual(self.checker.suggest("wrold"), "world")
+        self.assertIsNone(self.checker.suggest("zzzzzz"))
+
+    def test_check_spelling_skips_api_for_known_lines_and_runs_offline(self):
+        fetch = mock.Mock(return_value=([], {}))
+        texts = [
+            {"detection_id": "det_0000", "text": "The end.", "start_time": 0.0},
+            {"detection_id": "det_0001", "text": "teh end", "start_time": 1.0},
+        ]
+        stats = {}
+        with mock.patch.object(MAIN, "SPELLCHECK_API_KEY", "key"), \
+                mock.patch.object(MAIN, "get_local_spellchecker", return_value=self.checker), \
+                mock.patch.object(MAIN, "_fetch_spellcheck_corrections", fetch):
+            MAIN.check_spelling(texts, stats=stats)
+            self.assertEqual([c.args[0] for c in fetch.call_args_list], ["teh end"])
+            self.assertEqual(stats["local_resolved"], 1)
+
+            with mock.patch.object(MAIN, "SPELLCHECK_PROVIDER", "local"), \
+                    mock.patch.object(MAIN, "SPELLCHECK_API_KEY", None):
+                errors = MAIN.check_spelling(texts)
+
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0]["detection_id"], "det_0001")
+        self.assertEqual(errors[0]["suggested_text"], "the")
+        self.assertEqual(errors[0]["rule_id"], "LOCAL_SPELLCHECK")
+        self.assertTrue(errors[0]["has_replacement"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,6 @@
 import { NextResponse } from "next/server";
 import { createClient } from "@/lib/supabase/server";
-import { parseFrameIoUrl, resolveFrameIoMetadata } from "@/lib/frame-io";
+import { parseFrameIoUrl, resolveFrameIoMetadata, type FrameIoRendition } from "@/lib/frame-io";
 import { FrameAuthError, getValidFrameToken } from "@/lib/frame-io-auth";
 import { getGcpIdentityToken } from "@/lib/gcp-auth";
 import { persistProjectThumbnail } from "@/lib/project-thumbnail";
@@ -29,6 +29,8 @@ export async function POST(request: Request) {
 
   const cloudFunctionUrl = process.env.CLOUD_FUNCTION_ANALYZE_URL;
   const cloudFunctionSecret = process.env.CLOUD_FUNCTION_SECRET;
+  // Queue mode: the CF records a job and returns; workers run the pipeline.
+  const useQueue = process.env.CLOUD_FUNCTION_ANALYZE_QUEUE === "true";
 
   if (!cloudFunctionUrl) {
     return NextResponse.json(
@@ -40,6 +42,8 @@ export async function POST(request: Request) {
   try {
     // Always re-resolve Frame.io URLs — download URLs are signed and expire.
     let resolvedVideoUrl: string | null = null;
+    let expectedSizeBytes: number | null = null;
+    let renditions: FrameIoRendition[] = [];
 
     if (project.frame_io_url) {
       const assetId = parseFrameIoUrl(project.frame_io_url);
@@ -50,6 +54,8 @@ export async function POST(request: Request) {
       const token = await getValidFrameToken();
       const metadata = await resolveFrameIoMetadata(assetId, token);
       resolvedVideoUrl = metadata.video_url;
+      expectedSizeBytes = metadata.file_size;
+      renditions = metadata.renditions;
       const persistedThumbnailUrl = await persistProjectThumbnail(
         project_id,
         metadata.thumbnail_url,
@@ -83,7 +89,11 @@ export async function POST(request: Request) {
     // Set status BEFORE calling CF — the CF will update status from here on.
     await supabase
       .from("projects")
-      .update({ status: "fetching_video", progress: 5, error_message: null })
+      .update({
+        status: useQueue ? "pending" : "fetching_video",
+        progress: useQueue ? 0 : 5,
+        error_message: null,
+      })
       .eq("id", project_id);
 
     // Trigger the Cloud Function with GCP Identity Token for IAM auth.
@@ -102,9 +112,12 @@ export async function POST(request: Request) {
           ...(cloudFunctionSecret ? { "X-Function-Secret": cloudFunctionSecret } : {}),
         },
         body: JSON.stringify({
+          ...(useQueue ? { mode: "enqueue" } : {}),
           project_id: project.id,
           video_url: resolvedVideoUrl,
           frame_io_url: project.frame_io_url,
+          ...(expectedSizeBytes ? { expected_size_bytes: expectedSizeBytes } : {}),
+          ...(renditions.length ? { renditions } : {}),
         }),
         signal: controller.signal,
       });
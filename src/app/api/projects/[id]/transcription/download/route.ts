@@ -1,5 +1,6 @@
 import { NextResponse } from "next/server";
 import { createClient } from "@/lib/supabase/server";
+import { scopeToActiveRun } from "@/lib/supabase/runs";
 
 interface RouteContext {
   params: Promise<{ id: string }>;
@@ -19,7 +20,7 @@ export async function GET(_request: Request, context: RouteContext) {
 
   const { data: project, error: projectError } = await supabase
     .from("projects")
-    .select("id, user_id, name")
+    .select("id, user_id, name, active_run_id")
     .eq("id", projectId)
     .eq("user_id", user.id)
     .single();
@@ -35,11 +36,13 @@ export async function GET(_request: Request, context: RouteContext) {
     return NextResponse.json({ error: "Project not found" }, { status: 404 });
   }
 
-  const { data: transcriptions, error: transcriptionError } = await supabase
-    .from("transcriptions")
-    .select("id, text, start_time, end_time, speaker, confidence, created_at")
-    .eq("project_id", projectId)
-    .order("start_time");
+  const { data: transcriptions, error: transcriptionError } = await scopeToActiveRun(
+    supabase
+      .from("transcriptions")
+      .select("id, text, start_time, end_time, speaker, confidence, created_at")
+      .eq("project_id", projectId),
+    project.active_run_id
+  ).order("start_time");
 
   if (transcriptionError) {
     return NextResponse.json(
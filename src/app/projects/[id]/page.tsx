@@ -4,6 +4,7 @@ import { useEffect, useState, useCallback, useMemo } from "react";
 import { useParams } from "next/navigation";
 import Link from "next/link";
 import { createClient } from "@/lib/supabase/client";
+import { scopeToActiveRun } from "@/lib/supabase/runs";
 import type { Project, TextDetection, Transcription, SpellingError, Mismatch } from "@/types/database";
 import { useRealtimeProgress } from "@/hooks/useRealtimeProgress";
 
@@ -69,6 +70,8 @@ export default function ProjectDetailPage() {
       .eq("id", projectId)
       .single();
 
+    const activeRunId = (proj as Project | null)?.active_run_id ?? null;
+
     if (proj) {
       const p = proj as Project;
       setProject(p);
@@ -79,10 +82,10 @@ export default function ProjectDetailPage() {
     }
 
     // Fetch text detections
-    const { data: detections } = await supabase
-      .from("text_detections")
-      .select("*")
-      .eq("project_id", projectId)
+    const { data: detections } = await scopeToActiveRun(
+      supabase.from("text_detections").select("*").eq("project_id", projectId),
+      activeRunId
+    )
       .order("start_time")
       .order("end_time")
       .order("bbox_top");
@@ -133,19 +136,19 @@ export default function ProjectDetailPage() {
     }
 
     // Fetch transcriptions
-    const { data: trans } = await supabase
-      .from("transcriptions")
-      .select("*")
-      .eq("project_id", projectId)
+    const { data: trans } = await scopeToActiveRun(
+      supabase.from("transcriptions").select("*").eq("project_id", projectId),
+      activeRunId
+    )
       .order("start_time");
 
     if (trans) setTranscriptions(trans as Transcription[]);
 
     // Fetch spelling errors
-    const { data: errors } = await supabase
-      .from("spelling_errors")
-      .select("*")
-      .eq("project_id", projectId)
+    const { data: errors } = await scopeToActiveRun(
+      supabase.from("spelling_errors").select("*").eq("project_id", projectId),
+      activeRunId
+    )
       .order("timestamp");
 
     if (errors) {
@@ -157,10 +160,10 @@ export default function ProjectDetailPage() {
     }
 
     // Fetch mismatches
-    const { data: mm } = await supabase
-      .from("mismatches")
-      .select("*")
-      .eq("project_id", projectId)
+    const { data: mm } = await scopeToActiveRun(
+      supabase.from("mismatches").select("*").eq("project_id", projectId),
+      activeRunId
+    )
       .order("start_time");
 
     if (mm) {
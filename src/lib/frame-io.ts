@@ -9,6 +9,9 @@ const FRAME_MEDIA_LINK_INCLUDES = [
   "media_links.efficient",
   "media_links.scrub_sheet",
 ].join(",");
+// Frame.io transcodes, narrowest first. Their media links rarely carry
+// dimensions; the Cloud Function reads those from the MP4 header.
+const FRAME_RENDITION_KEYS = ["video_h264_180", "efficient", "high_quality"];
 const VIDEO_EXT_RE = /\.(mp4|mov|m4v|webm|avi|mkv|mxf)(\?|$)/i;
 const IMAGE_EXT_RE = /\.(jpg|jpeg|png|webp|gif|svg|avif)(\?|$)/i;
 const POSITIVE_URL_HINTS = ["video", "download", "source", "original", "proxy", "stream", "transcode", "playback"];
@@ -23,6 +26,16 @@ export interface FrameIoMetadata {
   duration: number | null;
   thumbnail_url: string | null;
   video_url: string | null;
+  // Size of video_url in bytes when it is the original upload (null for transcodes).
+  file_size: number | null;
+  renditions: FrameIoRendition[];
+}
+
+export interface FrameIoRendition {
+  key: string;
+  url: string;
+  width: number | null;
+  height: number | null;
 }
 
 export class FrameIoV4Error extends Error {
@@ -156,6 +169,8 @@ export async function resolveFrameIoMetadata(assetId: string, token: string): Pr
     duration: metadata.duration,
     thumbnail_url: metadata.thumbnail_url,
     video_url: metadata.video_url,
+    file_size: metadata.file_size,
+    renditions: metadata.renditions,
   };
 }
 
@@ -221,6 +236,8 @@ function extractMetadataFromFileLike(fileLike: JsonRecord): {
   duration: number | null;
   thumbnail_url: string | null;
   video_url: string | null;
+  file_size: number | null;
+  renditions: FrameIoRendition[];
 } {
   const mediaLinks = isRecord(fileLike["media_links"]) ? fileLike["media_links"] : null;
   const videoUrl =
@@ -238,14 +255,48 @@ function extractMetadataFromFileLike(fileLike: JsonRecord): {
     });
   }
 
+  // Frame.io reports the size of the original upload, so it only describes
+  // the download when the picked link is the original rather than a transcode.
+  const isOriginal =
+    Boolean(videoUrl) &&
+    (videoUrl === pickMediaLink(mediaLinks, "original") || videoUrl === pickTopLevelVideoLink(fileLike));
+
   return {
     name: readString(fileLike["name"]) || null,
     duration: pickDuration(fileLike),
     thumbnail_url: thumbnailUrl,
     video_url: videoUrl,
+    file_size: isOriginal ? pickFileSize(fileLike) : null,
+    renditions: pickVideoRenditions(mediaLinks),
   };
 }
 
+function pickVideoRenditions(mediaLinks: JsonRecord | null): FrameIoRendition[] {
+  if (!mediaLinks) return [];
+
+  const renditions: FrameIoRendition[] = [];
+  for (const key of FRAME_RENDITION_KEYS) {
+    const value = mediaLinks[key];
+    const url = mediaLinkToUrl(value);
+    if (!url || isFrameIoViewUrl(url)) continue;
+
+    const resolution = isRecord(value) && isRecord(value["resolution"]) ? value["resolution"] : null;
+    const readDimension = (name: string) =>
+      (isRecord(value) ? readNumber(value[name]) : null) ?? (resolution ? readNumber(resolution[name]) : null) ?? null;
+    renditions.push({ key, url, width: readDimension("width"), height: readDimension("height") });
+  }
+
+  return renditions;
+}
+
+function pickFileSize(fileLike: JsonRecord): number | null {
+  for (const key of ["file_size", "filesize", "size"]) {
+    const value = readNumber(fileLike[key]);
+    if (value) return Math.trunc(value);
+  }
+  return null;
+}
+
 function pickDuration(fileLike: JsonRecord): number | null {
   const direct = readNumber(fileLike["duration"]);
   if (direct !== null) return direct;
@@ -0,0 +1,13 @@
+interface RunScopedQuery<Q> {
+  eq(column: string, value: string): Q;
+  is(column: string, value: null): Q;
+}
+
+// Analysis result rows are versioned per run; readers only see the project's
+// active run (or the legacy unversioned rows when no run has been activated yet).
+export function scopeToActiveRun<Q extends RunScopedQuery<Q>>(
+  query: Q,
+  activeRunId: string | null | undefined
+): Q {
+  return activeRunId ? query.eq("run_id", activeRunId) : query.is("run_id", null);
+}
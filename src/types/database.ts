@@ -28,6 +28,10 @@ export interface Project {
   transcription_raw_storage_path?: string | null;
   transcription_raw_generated_at?: string | null;
   transcription_raw_size_bytes?: number | null;
+  transcription_word_index_path?: string | null;
+  active_run_id?: string | null;
+  active_run_coverage?: Record<string, unknown> | null;
+  active_run_started_at?: string | null;
   created_at: string;
   updated_at: string;
 }
@@ -35,6 +39,7 @@ export interface Project {
 export interface TextDetection {
   id: string;
   project_id: string;
+  run_id?: string | null;
   text: string;
   start_time: number;
   end_time: number;
@@ -53,6 +58,7 @@ export interface TextDetection {
 export interface Transcription {
   id: string;
   project_id: string;
+  run_id?: string | null;
   text: string;
   start_time: number;
   end_time: number;
@@ -64,6 +70,7 @@ export interface Transcription {
 export interface SpellingError {
   id: string;
   project_id: string;
+  run_id?: string | null;
   source: "subtitle" | "transcription";
   original_text: string;
   suggested_text: string;
@@ -77,6 +84,7 @@ export interface SpellingError {
 export interface Mismatch {
   id: string;
   project_id: string;
+  run_id?: string | null;
   subtitle_text: string;
   transcription_text: string;
   start_time: number;
@@ -0,0 +1,11 @@
+CREATE TABLE spellcheck_cache (
+  cache_key TEXT PRIMARY KEY,
+  provider TEXT NOT NULL,
+  request_text TEXT NOT NULL,
+  corrections JSONB NOT NULL DEFAULT '[]'::jsonb,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+ALTER TABLE spellcheck_cache ENABLE ROW LEVEL SECURITY;
+
+-- No policies on purpose: only the analysis Cloud Function (service role) reads/writes this cache.
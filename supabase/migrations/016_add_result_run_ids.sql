@@ -0,0 +1,16 @@
+-- Each analysis run writes its rows under a new run_id; readers follow
+-- projects.active_run_id, which the run switches to once it has finished.
+-- Rows with a NULL run_id predate versioning and stay visible until the first
+-- versioned run of the project is activated.
+ALTER TABLE projects
+  ADD COLUMN IF NOT EXISTS active_run_id UUID;
+
+ALTER TABLE text_detections ADD COLUMN IF NOT EXISTS run_id UUID;
+ALTER TABLE transcriptions ADD COLUMN IF NOT EXISTS run_id UUID;
+ALTER TABLE spelling_errors ADD COLUMN IF NOT EXISTS run_id UUID;
+ALTER TABLE mismatches ADD COLUMN IF NOT EXISTS run_id UUID;
+
+CREATE INDEX IF NOT EXISTS idx_text_detections_run ON text_detections(project_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_transcriptions_run ON transcriptions(project_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_spelling_errors_run ON spelling_errors(project_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_mismatches_run ON mismatches(project_id, run_id);
@@ -0,0 +1,58 @@
+CREATE TABLE analysis_jobs (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+  payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+  status TEXT NOT NULL DEFAULT 'queued'
+    CHECK (status IN ('queued', 'running', 'completed', 'failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 3,
+  lease_owner TEXT,
+  lease_expires_at TIMESTAMPTZ,
+  available_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  last_error TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX idx_analysis_jobs_available ON analysis_jobs(status, available_at);
+-- At most one pending/running job per project.
+CREATE UNIQUE INDEX idx_analysis_jobs_active_project
+  ON analysis_jobs(project_id)
+  WHERE status IN ('queued', 'running');
+
+ALTER TABLE analysis_jobs ENABLE ROW LEVEL SECURITY;
+
+-- No policies on purpose: only the analysis Cloud Function (service role) reads/writes jobs.
+
+-- Hands the oldest available job (queued and due, or running with an expired
+-- lease) to one worker. SKIP LOCKED keeps concurrent workers from blocking on
+-- or double-claiming the same row. Expired jobs with no attempts left fail.
+CREATE OR REPLACE FUNCTION claim_analysis_job(p_worker_id TEXT, p_lease_seconds INTEGER)
+RETURNS SETOF analysis_jobs
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  UPDATE analysis_jobs
+  SET status = 'failed', last_error = 'lease expired', updated_at = now()
+  WHERE status = 'running'
+    AND lease_expires_at < now()
+    AND attempts >= max_attempts;
+
+  RETURN QUERY
+  UPDATE analysis_jobs AS j
+  SET status = 'running',
+      attempts = j.attempts + 1,
+      lease_owner = p_worker_id,
+      lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+      updated_at = now()
+  WHERE j.id = (
+    SELECT id FROM analysis_jobs
+    WHERE (status = 'queued' AND available_at <= now())
+       OR (status = 'running' AND lease_expires_at < now())
+    ORDER BY available_at, created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING j.*;
+END;
+$$;
@@ -0,0 +1,7 @@
+ALTER TABLE projects
+  ADD COLUMN IF NOT EXISTS transcription_word_index_path TEXT;
+
+-- The word index is a compact binary stored next to transcription-raw/latest.json.
+UPDATE storage.buckets
+SET allowed_mime_types = ARRAY['application/json', 'application/octet-stream']
+WHERE id = 'transcription-raw';
@@ -0,0 +1,5 @@
+-- Lines the active run could not check (spellcheck budget, throttled or failed
+-- requests, mismatch budget). Incremental runs only carry rows forward for
+-- lines that are not listed here, and re-check everything when it is NULL.
+ALTER TABLE projects
+  ADD COLUMN IF NOT EXISTS active_run_coverage JSONB;
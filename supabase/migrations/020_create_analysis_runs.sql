@@ -0,0 +1,60 @@
+-- Every analysis run registers its start time. Activation and garbage
+-- collection order runs by it, so concurrent runs of one project cannot
+-- delete each other's in-flight rows or roll the active run back.
+CREATE TABLE analysis_runs (
+  id UUID PRIMARY KEY,
+  project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+  started_at TIMESTAMPTZ NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX idx_analysis_runs_project_started ON analysis_runs(project_id, started_at);
+
+ALTER TABLE analysis_runs ENABLE ROW LEVEL SECURITY;
+
+-- No policies on purpose: only the analysis Cloud Function (service role) reads/writes runs.
+
+ALTER TABLE projects
+  ADD COLUMN IF NOT EXISTS active_run_started_at TIMESTAMPTZ;
+
+-- Register runs written before this migration so the next run can collect them.
+INSERT INTO analysis_runs (id, project_id, started_at)
+SELECT run_id, project_id, COALESCE(min(created_at), now())
+FROM (
+  SELECT run_id, project_id, created_at FROM text_detections WHERE run_id IS NOT NULL
+  UNION ALL
+  SELECT run_id, project_id, created_at FROM transcriptions WHERE run_id IS NOT NULL
+  UNION ALL
+  SELECT run_id, project_id, created_at FROM spelling_errors WHERE run_id IS NOT NULL
+  UNION ALL
+  SELECT run_id, project_id, created_at FROM mismatches WHERE run_id IS NOT NULL
+) AS result_rows
+GROUP BY run_id, project_id
+ON CONFLICT (id) DO NOTHING;
+
+UPDATE projects AS p
+SET active_run_started_at = r.started_at
+FROM analysis_runs AS r
+WHERE r.id = p.active_run_id;
+
+-- Switches the project to a finished run only when no run that started later
+-- is already active. Returns false when the run was superseded.
+CREATE OR REPLACE FUNCTION activate_analysis_run(
+  p_project_id UUID,
+  p_run_id UUID,
+  p_started_at TIMESTAMPTZ,
+  p_coverage JSONB
+)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  UPDATE projects
+  SET active_run_id = p_run_id,
+      active_run_started_at = p_started_at,
+      active_run_coverage = p_coverage
+  WHERE id = p_project_id
+    AND (active_run_started_at IS NULL OR active_run_started_at < p_started_at);
+  RETURN FOUND;
+END;
+$$;
@@ -0,0 +1,49 @@
+-- A job whose lease expires on its last attempt (typically a worker killed at
+-- the function timeout) used to fail silently, leaving its project stuck at
+-- the last progress value. The project is now marked as errored in the same
+-- transaction that fails the job.
+CREATE OR REPLACE FUNCTION claim_analysis_job(p_worker_id TEXT, p_lease_seconds INTEGER)
+RETURNS SETOF analysis_jobs
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  WITH expired AS (
+    UPDATE analysis_jobs
+    SET status = 'failed', last_error = 'lease expired', updated_at = now()
+    WHERE status = 'running'
+      AND lease_expires_at < now()
+      AND attempts >= max_attempts
+    RETURNING id, project_id, attempts, max_attempts
+  )
+  UPDATE projects AS p
+  SET status = 'error',
+      progress = 0,
+      error_message = concat_ws(
+        E'\n',
+        p.error_message,
+        format(
+          'Analysis job %s failed: lease expired on attempt %s/%s (worker timed out or was killed)',
+          expired.id, expired.attempts, expired.max_attempts
+        )
+      )
+  FROM expired
+  WHERE p.id = expired.project_id;
+
+  RETURN QUERY
+  UPDATE analysis_jobs AS j
+  SET status = 'running',
+      attempts = j.attempts + 1,
+      lease_owner = p_worker_id,
+      lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+      updated_at = now()
+  WHERE j.id = (
+    SELECT id FROM analysis_jobs
+    WHERE (status = 'queued' AND available_at <= now())
+       OR (status = 'running' AND lease_expires_at < now())
+    ORDER BY available_at, created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING j.*;
+END;
+$$;
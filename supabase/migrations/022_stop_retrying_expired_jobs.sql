@@ -0,0 +1,52 @@
+-- A lease only expires when the worker died, almost always at the 540 s
+-- function timeout. Re-claiming such a job reran a pipeline that would time
+-- out again, up to max_attempts times. Expired jobs now fail on the first
+-- expiry (their project goes to error); only errors raised inside the
+-- pipeline are retried, through the worker's explicit fail().
+CREATE OR REPLACE FUNCTION claim_analysis_job(p_worker_id TEXT, p_lease_seconds INTEGER)
+RETURNS SETOF analysis_jobs
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  WITH expired AS (
+    UPDATE analysis_jobs
+    SET status = 'failed',
+        last_error = 'lease expired',
+        lease_owner = NULL,
+        lease_expires_at = NULL,
+        updated_at = now()
+    WHERE status = 'running'
+      AND lease_expires_at < now()
+    RETURNING id, project_id, attempts, max_attempts
+  )
+  UPDATE projects AS p
+  SET status = 'error',
+      progress = 0,
+      error_message = concat_ws(
+        E'\n',
+        p.error_message,
+        format(
+          'Analysis job %s failed: lease expired on attempt %s/%s (worker timed out or was killed; not retried)',
+          expired.id, expired.attempts, expired.max_attempts
+        )
+      )
+  FROM expired
+  WHERE p.id = expired.project_id;
+
+  RETURN QUERY
+  UPDATE analysis_jobs AS j
+  SET status = 'running',
+      attempts = j.attempts + 1,
+      lease_owner = p_worker_id,
+      lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+      updated_at = now()
+  WHERE j.id = (
+    SELECT id FROM analysis_jobs
+    WHERE status = 'queued' AND available_at <= now()
+    ORDER BY available_at, created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING j.*;
+END;
+$$;